@@ -0,0 +1,293 @@
+"""Headless HTTP API for bots and IDE plugins.
+
+Runs beside the Streamlit app as its own process and writes to the same
+stores, so reports submitted here show up in the UI, the search index and
+the near-duplicate flags:
+
+    python api.py --port 8502
+
+    POST /reports   {"username": ..., "team": ..., "report": ...}  or  {"reports": [{...}, ...]}
+    POST /doubts    {"name": ..., "phone": ..., "doubt": ...}      or  {"doubts": [{...}, ...]}
+    GET  /reports?username=&team=&limit=50&offset=0
+    GET  /health
+    GET  /metrics   request timings in the Prometheus text format
+
+With a tenants.toml (see tenants.py) every request may name its college
+or cohort with "?tenant=<id>" or an "X-Tenant: <id>" header; without one it
+goes to the default tenant.
+
+A report from a user who already submitted that day is rejected, exactly
+as in the form, and so is a team the tenant does not have (a report
+without a team is stored as "Not Specified"). A single submission answers
+201/409/400; a batch answers 200 with one result per item, written in one
+group commit. When `api_token` is set in .streamlit/secrets.toml every
+request must send "Authorization: Bearer <token>". GET /reports returns
+everyone's reports and admin comments, so it answers 403 until a token is
+set.
+"""
+import argparse
+import hmac
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from config import (
+    Settings, build_doubt_store, build_duplicate_index, build_report_store, build_search_index, configure_metrics,
+    load_secrets, tenant_config,
+)
+from metrics import REGISTRY
+from notifications import NotificationQueue, Notifier, build_sinks
+from storage import DEFAULT_TEAM, DuplicateReportError
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+MAX_PAGE_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _TenantStores:
+    """The report and doubt stores of one tenant, wired like the UI's"""
+
+    def __init__(self, tenant, settings, notifier):
+        search = build_search_index(tenant)
+        self.reports = build_report_store(tenant, settings, search, build_duplicate_index(tenant, settings), notifier)
+        self.doubts = build_doubt_store(tenant, search, notifier)
+
+
+class StandupApi:
+    """Request handling on top of the shared stores, independent of HTTP.
+
+    Stores are opened on a tenant's first request and kept per data
+    directory, so one process serves every tenant.
+    """
+
+    def __init__(self, secrets):
+        self.settings = Settings(secrets)
+        self.token = self.settings.api_token
+        self.notifier = Notifier(NotificationQueue(build_sinks(self.settings.notifications)))
+        self.tenants = tenant_config(self.settings)
+        self._stores = {}
+        self._stores_lock = threading.Lock()
+        self.stores()  # open the default tenant up front
+
+    def stores(self, tenant_id=None):
+        """The stores of tenant `tenant_id` (the default tenant if None)"""
+        if tenant_id and tenant_id not in self.tenants.tenants():
+            raise ApiError(404, f"unknown tenant '{tenant_id}'")
+        tenant = self.tenants.get(tenant_id)
+        with self._stores_lock:
+            stores = self._stores.get(tenant.data_dir)
+            if stores is None:
+                stores = self._stores[tenant.data_dir] = _TenantStores(tenant, self.settings, self.notifier)
+        return stores
+
+    def authorized(self, header):
+        if not self.token:
+            return True
+        # compare_digest only takes ASCII str, and headers can carry any byte
+        return hmac.compare_digest((header or '').encode('utf-8'), f"Bearer {self.token}".encode('utf-8'))
+
+    def require_token(self):
+        """Refuse reads of other people's reports on an API anyone can call"""
+        if not self.token:
+            raise ApiError(403, "reading reports requires api_token to be set")
+
+    @staticmethod
+    def _fields(item, required, optional=()):
+        if not isinstance(item, dict):
+            raise ValueError("expected a JSON object")
+        values = []
+        for name in required:
+            value = item.get(name)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"'{name}' is required")
+            values.append(value.strip())
+        for name, default in optional:
+            value = item.get(name)
+            values.append(value.strip() if isinstance(value, str) and value.strip() else default)
+        return values
+
+    @staticmethod
+    def _batch(body, key):
+        """(items, is_batch) from either a single object or {key: [...]}"""
+        if isinstance(body, dict) and key in body:
+            if not isinstance(body[key], list) or not body[key]:
+                raise ApiError(400, f"'{key}' must be a non-empty list")
+            return body[key], True
+        return [body], False
+
+    @staticmethod
+    def _respond(results, is_batch):
+        if is_batch:
+            created = sum(result['status'] == 'created' for result in results)
+            return 200, {'created': created, 'rejected': len(results) - created, 'results': results}
+        result = results[0]
+        status = {'created': 201, 'duplicate': 409}.get(result['status'], 400)
+        return status, result
+
+    def submit_reports(self, body, tenant_id=None):
+        reports = self.stores(tenant_id).reports
+        teams = self.tenants.get(tenant_id).teams
+        items, is_batch = self._batch(body, 'reports')
+        results, valid = [None] * len(items), []
+        for position, item in enumerate(items):
+            try:
+                fields = self._fields(item, ['username', 'report'], [('team', DEFAULT_TEAM)])
+                if fields[2] != DEFAULT_TEAM and fields[2] not in teams:
+                    raise ValueError(f"unknown team {fields[2]!r}")
+                valid.append((position, fields))
+            except ValueError as e:
+                results[position] = {'status': 'invalid', 'error': str(e)}
+        stored = reports.add_reports([(username, team, report) for _, (username, report, team) in valid])
+        for (position, _), outcome in zip(valid, stored):
+            if isinstance(outcome, DuplicateReportError):
+                results[position] = {'status': 'duplicate', 'error': str(outcome)}
+            else:
+                results[position] = {'status': 'created', 'id': int(outcome['ID']), 'date': outcome['Date']}
+        return self._respond(results, is_batch)
+
+    def submit_doubts(self, body, tenant_id=None):
+        doubts = self.stores(tenant_id).doubts
+        items, is_batch = self._batch(body, 'doubts')
+        results, valid = [None] * len(items), []
+        for position, item in enumerate(items):
+            try:
+                valid.append((position, self._fields(item, ['name', 'phone', 'doubt'])))
+            except ValueError as e:
+                results[position] = {'status': 'invalid', 'error': str(e)}
+        stored = doubts.add_doubts([fields for _, fields in valid]) if valid else []
+        for (position, _), row in zip(valid, stored):
+            results[position] = {'status': 'created', 'id': int(row['ID'])}
+        return self._respond(results, is_batch)
+
+    def list_reports(self, query, tenant_id=None):
+        self.require_token()
+        reports = self.stores(tenant_id).reports
+        params = {name: values[-1] for name, values in parse_qs(query).items()}
+        try:
+            limit, offset = int(params.get('limit', 50)), int(params.get('offset', 0))
+            if limit < 1 or offset < 0:
+                raise ValueError
+        except ValueError:
+            raise ApiError(400, "'limit' must be a positive integer and 'offset' a non-negative integer")
+        limit = min(limit, MAX_PAGE_SIZE)
+        username, team = params.get('username') or None, params.get('team') or None
+        page = reports.query_reports(username=username, team=team, limit=limit, offset=offset)
+        return 200, {
+            'total': reports.count_reports(username=username, team=team),
+            'reports': [
+                {name: (int(value) if name == 'ID' else value) for name, value in row.items()}
+                for row in page.to_dict('records')
+            ],
+        }
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def _send(self, status, payload):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # rfile.read(-1) would block until the client closes the connection
+            raise ApiError(400, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "request body too large")
+        data = self.rfile.read(length)
+        self._body_read = True
+        try:
+            return json.loads(data or b'null')
+        except ValueError:
+            raise ApiError(400, "request body is not valid JSON")
+
+    def _tenant(self, url):
+        tenant_ids = parse_qs(url.query).get('tenant')
+        return tenant_ids[-1] if tenant_ids else self.headers.get('X-Tenant')
+
+    def _dispatch(self, routes):
+        api = self.server.api
+        url = urlsplit(self.path)
+        self._body_read = False
+        try:
+            if not api.authorized(self.headers.get('Authorization')):
+                raise ApiError(401, "missing or invalid API token")
+            route = url.path.rstrip('/') or '/'
+            handler = routes.get(route)
+            if handler is None:
+                raise ApiError(404, f"no route for {self.command} {url.path}")
+            with REGISTRY.timer(f"api_{self.command.lower()}_{route.strip('/')}"):
+                status, payload = handler(api, url)
+        except ApiError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception:
+            logger.exception("%s %s failed", self.command, self.path)
+            status, payload = 500, {'error': "internal error"}
+        if self.headers.get('Content-Length') and not self._body_read:
+            # The unread body would be parsed as the next request on this connection
+            self.close_connection = True
+        self._send(status, payload)
+
+    def do_GET(self):
+        self._dispatch({
+            '/health': lambda api, url: (200, {'status': 'ok'}),
+            '/metrics': lambda api, url: (200, REGISTRY.prometheus()),
+            '/reports': lambda api, url: api.list_reports(url.query, self._tenant(url)),
+        })
+
+    def do_POST(self):
+        self._dispatch({
+            '/reports': lambda api, url: api.submit_reports(self._read_json(), self._tenant(url)),
+            '/doubts': lambda api, url: api.submit_doubts(self._read_json(), self._tenant(url)),
+        })
+
+    def log_message(self, format, *args):
+        # Per-request stderr lines would dominate the cost of small requests
+        logger.debug(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    server.daemon_threads = True
+    server.api = StandupApi(load_secrets())
+    configure_metrics(server.api.settings)
+    logger.info("Standup API listening on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+import pandas as pd
+
+from exports import EXPORT_FORMATS, available_formats, write_reports
+from storage import (
+    REPORT_COLUMNS, DuplicateReportError, ReportStore, atomic_write, file_lock, filter_reports, normalize_username,
+)
+
+_PARTITION = re.compile(r'^reports-(\d{4}-\d{2})\.(parquet|csv\.gz)$')
+
+
+def _read_partition(path, columns=None):
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, usecols=columns, compression='gzip')
+    df['ID'] = df['ID'].astype('int64')
+    return df
+
+
+class PartitionArchive:
+    """Cold tier: one compressed file per month in `directory`/live.
+
+    Partitions are Parquet when pyarrow is installed (columnar, so summaries
+    only read the columns they need) and gzipped CSV otherwise. Every write
+    replaces a whole partition atomically; readers cache partitions by file
+    identity. A small per-partition summary (ID range and report counts per
+    team and user) lets queries skip partitions without opening them.
+
+    Writers hold lock(); clear-and-rotate moves the live directory to
+    `directory`/rotated/<timestamp> so nothing is ever deleted.
+    """
+
+    def __init__(self, directory, cached_partitions=4):
+        self.directory = directory
+        self.live_dir = os.path.join(directory, 'live')
+        self.fmt = 'parquet' if 'parquet' in available_formats() else 'csv.gz'
+        os.makedirs(self.live_dir, exist_ok=True)
+        self._cached_partitions = cached_partitions
+        self._frames = OrderedDict()
+        self._summaries = {}
+        self._cache_lock = threading.Lock()
+
+    def lock(self):
+        return file_lock(os.path.join(self.directory, 'archive'))
+
+    def partitions(self):
+        """{"YYYY-MM": path} of the live partitions, oldest first"""
+        found = {}
+        for name in sorted(os.listdir(self.live_dir)):
+            match = _PARTITION.match(name)
+            if match:
+                found[match.group(1)] = os.path.join(self.live_dir, name)
+        return found
+
+    def months(self, start_date=None, end_date=None):
+        """Live partitions overlapping the inclusive "%Y-%m-%d" range, oldest first"""
+        return {
+            month: path for month, path in self.partitions().items()
+            if (not start_date or month >= start_date[:7]) and (not end_date or month <= end_date[:7])
+        }
+
+    @staticmethod
+    def _identity(path):
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def summary(self, path):
+        """(min ID, max ID, Counter of (team, username key)) for one partition"""
+        identity = self._identity(path)
+        with self._cache_lock:
+            cached = self._summaries.get(path)
+        if cached and cached[0] == identity:
+            return cached[1]
+        df = _read_partition(path, ['ID', 'Team', 'GitLab Username'])
+        counts = Counter(zip(df['Team'], df['GitLab Username'].map(normalize_username)))
+        summary = (int(df['ID'].min()), int(df['ID'].max()), counts) if len(df) else (0, 0, counts)
+        with self._cache_lock:
+            self._summaries[path] = (identity, summary)
+        return summary
+
+    def frame(self, path):
+        """The whole partition indexed by ID; shared, treat as read-only"""
+        identity = self._identity(path)
+        with self._cache_lock:
+            cached = self._frames.get(path)
+            if cached and cached[0] == identity:
+                self._frames.move_to_end(path)
+                return cached[1]
+        df = _read_partition(path)
+        df.index = pd.Index(df['ID'].to_numpy())
+        with self._cache_lock:
+            self._frames[path] = (identity, df)
+            self._frames.move_to_end(path)
+            while len(self._frames) > self._cached_partitions:
+                self._frames.popitem(last=False)
+        return df
+
+    def _write(self, month, df):
+        path = os.path.join(self.live_dir, f"reports-{month}.{EXPORT_FORMATS[self.fmt][2]}")
+        atomic_write(path, lambda file: write_reports([df[REPORT_COLUMNS]], self.fmt, file), mode='wb')
+        return path
+
+    def merge(self, rows):
+        """Add report rows to their month partitions; caller holds lock().
+
+        Re-adding an ID replaces the archived row, so repeating a merge is harmless.
+        """
+        partitions = self.partitions()
+        for month, new_rows in rows.groupby(rows['Date'].str[:7]):
+            old_path = partitions.get(month)
+            if old_path:
+                new_rows = pd.concat([_read_partition(old_path), new_rows])
+            new_rows = new_rows.drop_duplicates('ID', keep='last').sort_values(['Timestamp', 'ID'])
+            path = self._write(month, new_rows)
+            if old_path and old_path != path:
+                os.remove(old_path)
+
+    def update_comments(self, comments):
+        """Apply {report ID: comment} to archived reports; caller holds lock()"""
+        comments = {int(report_id): comment for report_id, comment in comments.items()}
+        for month, path in self.partitions().items():
+            low, high, _ = self.summary(path)
+            if not any(low <= report_id <= high for report_id in comments):
+                continue
+            df = _read_partition(path)
+            matched = df['ID'].isin(comments.keys())
+            if matched.any():
+                df.loc[matched, 'Comment'] = df.loc[matched, 'ID'].map(comments)
+                self._write(month, df)
+
+    def rotate(self):
+        """Move the live partitions aside; caller holds lock(). Returns the new location or None"""
+        if not self.partitions():
+            return None
+        target = os.path.join(self.directory, 'rotated', datetime.now().strftime('%Y%m%d_%H%M%S_%f'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self.live_dir, target)
+        os.makedirs(self.live_dir, exist_ok=True)
+        return target
+
+
+class TieredReportStore(ReportStore):
+    """A hot ReportStore for the current month in front of a PartitionArchive.
+
+    Reports from earlier months are compacted into the archive when the
+    store opens and when the month rolls over. Reads start at the hot tier
+    and only open the archive partitions a query can reach, so the usual
+    today/this-week traffic never touches old history. clear() archives the
+    hot rows and rotates the archive instead of deleting anything.
+
+    Listeners attach here rather than to `hot`. Archived reports are older
+    than every hot one, which keeps cross-tier paging in timestamp order.
+    """
+
+    def __init__(self, hot, archive):
+        self.hot = hot
+        self.archive = archive
+        self._hot_since = None
+        self.compact()
+
+    @property
+    def _loader_stats(self):
+        return self.hot._loader_stats
+
+    def compact(self):
+        """Move reports dated before the current month into the archive"""
+        cutoff = datetime.now().strftime('%Y-%m-01')
+        with self.archive.lock():
+            moved = self.hot.evict(cutoff, self.archive.merge)
+        self._hot_since = cutoff
+        return moved
+
+    def _cold_count(self, path, username=None, team=None):
+        key = normalize_username(username) if username else None
+        return sum(
+            count for (row_team, user), count in self.archive.summary(path)[2].items()
+            if (not team or row_team == team) and (not key or key in user)
+        )
+
+    def _archived_submission(self, username, date):
+        if date >= self._hot_since:
+            return False
+        path = self.archive.partitions().get(date[:7])
+        key = normalize_username(username)
+        if path is None or not any(user == key for _, user in self.archive.summary(path)[2]):
+            return False
+        df = self.archive.frame(path)
+        return bool(((df['Date'] == date) & (df['GitLab Username'].map(normalize_username) == key)).any())
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def _check_rollover(self):
+        if datetime.now().strftime('%Y-%m-01') != self._hot_since:
+            self.compact()
+
+    def _archived_duplicate(self, row):
+        if self._archived_submission(row['GitLab Username'], row['Date']):
+            return DuplicateReportError(f"{row['GitLab Username']} already submitted a report for {row['Date']}")
+        return None
+
+    def _append(self, row):
+        self._check_rollover()
+        error = self._archived_duplicate(row)
+        if error is not None:
+            raise error
+        return self.hot._append(row)
+
+    def _append_many(self, rows):
+        self._check_rollover()
+        errors = [self._archived_duplicate(row) for row in rows]
+        fresh = iter(self.hot._append_many([row for row, error in zip(rows, errors) if error is None]))
+        return [error if error is not None else next(fresh) for error in errors]
+
+    def _update_comments(self, comments):
+        # Compaction moves rows between the tiers under the archive lock, so
+        # hold it while splitting. A CSV hot tier rewrites its whole file (and
+        # bumps data_version) on every update, so it is left alone unless one
+        # of its own reports changed.
+        with self.archive.lock():
+            hot = {report_id: comment for report_id, comment in comments.items()
+                   if self.hot.get_report(report_id) is not None}
+            cold = {report_id: comment for report_id, comment in comments.items() if report_id not in hot}
+            if cold:
+                self.archive.update_comments(cold)
+            if hot:
+                self.hot._update_comments(hot)
+
+    def _clear(self):
+        with self.archive.lock():
+            self.hot.evict(None, self.archive.merge)
+            self.archive.rotate()
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def load_reports(self):
+        """Every report across both tiers; reads the whole archive"""
+        frames = [self.archive.frame(path) for path in self.archive.partitions().values()]
+        frames = [df for df in frames + [self.hot.load_reports()] if not df.empty]
+        return pd.concat(frames) if frames else pd.DataFrame(columns=REPORT_COLUMNS)
+
+    def has_submitted(self, username, date):
+        return self.hot.has_submitted(username, date) or self._archived_submission(username, date)
+
+    def user_reports(self, username):
+        key = normalize_username(username)
+        frames = [self.hot.user_reports(username)]
+        for path in reversed(self.archive.partitions().values()):
+            if any(user == key for _, user in self.archive.summary(path)[2]):
+                df = self.archive.frame(path)
+                frames.append(
+                    df[df['GitLab Username'].map(normalize_username) == key].sort_values('Timestamp', ascending=False)
+                )
+        frames = [df for df in frames if not df.empty]
+        return pd.concat(frames) if frames else pd.DataFrame(columns=REPORT_COLUMNS)
+
+    def reports_since(self, report_id):
+        frames = []
+        for path in self.archive.partitions().values():
+            if self.archive.summary(path)[1] > report_id:
+                df = self.archive.frame(path)
+                frames.append(df[df['ID'] > report_id])
+        frames = [df for df in frames + [self.hot.reports_since(report_id)] if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        return pd.concat(frames).sort_values('ID', kind='stable')
+
+    def data_version(self):
+        # Compaction and rotation both remove hot rows, which moves the hot generation
+        return self.hot.data_version()
+
+    def get_report(self, report_id):
+        row = self.hot.get_report(report_id)
+        if row is not None:
+            return row
+        for path in self.archive.partitions().values():
+            low, high, _ = self.archive.summary(path)
+            if low <= report_id <= high:
+                df = self.archive.frame(path)
+                if report_id in df.index:
+                    return df.loc[report_id].to_dict()
+        return None
+
+    def query_reports(self, username=None, team=None, newest_first=True, limit=None, offset=0):
+        tiers = [None] + list(reversed(self.archive.partitions().values()))
+        if not newest_first:
+            tiers.reverse()
+        end = None if limit is None else offset + limit
+        pages, position = [], 0
+        for path in tiers:
+            if end is not None and position >= end:
+                break
+            count = self.hot.count_reports(username, team) if path is None else self._cold_count(path, username, team)
+            start, stop = max(offset - position, 0), count if end is None else min(end - position, count)
+            position += count
+            if stop <= start:
+                continue
+            if path is None:
+                pages.append(self.hot.query_reports(username, team, newest_first, stop - start, start))
+            else:
+                df = filter_reports(self.archive.frame(path), username, team)
+                pages.append(df.sort_values('Timestamp', ascending=not newest_first, kind='stable').iloc[start:stop])
+        pages = [df for df in pages if not df.empty]
+        return pd.concat(pages) if pages else pd.DataFrame(columns=REPORT_COLUMNS)
+
+    def count_reports(self, username=None, team=None):
+        return self.hot.count_reports(username, team) + sum(
+            self._cold_count(path, username, team) for path in self.archive.partitions().values()
+        )
+
+    def team_counts(self):
+        counts = Counter(self.hot.team_counts().to_dict())
+        for path in self.archive.partitions().values():
+            for (team, _), count in self.archive.summary(path)[2].items():
+                counts[team] += count
+        return pd.Series(dict(counts.most_common()), name='count', dtype='int64')
+
+    def iter_reports(self, start_date=None, end_date=None, team=None, username=None, chunk_size=5000):
+        for path in self.archive.months(start_date, end_date).values():
+            df = filter_reports(self.archive.frame(path), username, team, start_date, end_date)
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+        if not end_date or end_date >= self._hot_since:
+            yield from self.hot.iter_reports(start_date, end_date, team, username, chunk_size)
@@ -0,0 +1,164 @@
+"""Admin accounts and signed admin sessions.
+
+Passwords are stored as salted PBKDF2 hashes; print one for tenants.toml
+or secrets.toml with:
+
+    python auth.py
+
+A successful login returns a session token signed with HMAC-SHA256, so
+later reruns and pages of the session check a signature instead of a
+password.
+"""
+import base64
+import getpass
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+HASH_SCHEME = 'pbkdf2_sha256'
+HASH_ITERATIONS = 600_000
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def hash_password(password, iterations=HASH_ITERATIONS):
+    """"pbkdf2_sha256$<iterations>$<salt>$<hash>" for `password` with a fresh random salt"""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f"{HASH_SCHEME}${iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def is_password_hash(value):
+    parts = value.split('$') if isinstance(value, str) else []
+    return len(parts) == 4 and parts[0] == HASH_SCHEME and parts[1].isdigit()
+
+
+def verify_password(password, stored):
+    """True if `password` matches a hash_password() string; compares in constant time"""
+    if not is_password_hash(stored):
+        return False
+    _, iterations, salt, expected = stored.split('$')
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), _b64decode(salt), int(iterations))
+    return hmac.compare_digest(digest, _b64decode(expected))
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    """Checked against when the account does not exist"""
+    return hash_password(secrets.token_hex(8))
+
+
+def check_login(tenant, username, password):
+    """The admin name if the credentials are valid for `tenant`, else None.
+
+    Tenants with accounts (`admins`) check the salted hash of that account.
+    Tenants without accounts fall back to the shared plaintext
+    admin_password, logged in as "admin"; an empty password never matches.
+    """
+    if not password:
+        return None
+    if tenant.admins:
+        stored = tenant.admins.get(username.strip())
+        # Hash anyway for unknown users, so timing does not reveal account names
+        ok = verify_password(password, stored or _dummy_hash())
+        return username.strip() if stored and ok else None
+    if tenant.admin_password and hmac.compare_digest(password.encode('utf-8'), tenant.admin_password.encode('utf-8')):
+        return 'admin'
+    return None
+
+
+class SessionSigner:
+    """Issues and checks signed admin session tokens.
+
+    A token is "<payload>.<signature>", where the payload names the admin,
+    the tenant and the expiry time. Checking needs no server-side state
+    except logged-out tokens, which are remembered until they would have
+    expired anyway. Without a configured `secret` a random one is made, and
+    sessions end when the process restarts.
+    """
+
+    def __init__(self, secret=None, ttl=12 * 3600):
+        if not secret:
+            logger.info("No session_secret configured; admin sessions end when the app restarts")
+            secret = secrets.token_bytes(32)
+        self._key = secret.encode('utf-8') if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self._revoked = {}  # token -> expiry
+        self._lock = threading.Lock()
+        # Signature checks repeat on every rerun; cache them per signer
+        self._payload = lru_cache(maxsize=4096)(self._payload)
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self._key, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def issue(self, username, tenant_id):
+        payload = _b64encode(json.dumps(
+            {'u': username, 't': tenant_id, 'exp': int(time.time() + self.ttl)}, separators=(',', ':')
+        ).encode('utf-8'))
+        return f"{payload}.{self._sign(payload)}"
+
+    def _payload(self, token):
+        """The decoded payload of a correctly signed token, else None"""
+        payload, _, signature = token.partition('.')
+        if not signature or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        try:
+            data = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def verify(self, token, tenant_id):
+        """The admin name of a valid, unexpired, not logged-out token for `tenant_id`, else None"""
+        if not isinstance(token, str) or not token.isascii() or not 0 < len(token) <= 1024:
+            return None
+        data = self._payload(token)
+        if data is None or data.get('t') != tenant_id or data.get('exp', 0) < time.time():
+            return None
+        with self._lock:
+            if token in self._revoked:
+                return None
+        return data.get('u')
+
+    def revoke(self, token):
+        """Log a token out before it expires"""
+        data = self._payload(token) if isinstance(token, str) and token.isascii() else None
+        if data is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._revoked = {t: exp for t, exp in self._revoked.items() if exp >= now}
+            self._revoked[token] = data.get('exp', now)
+
+
+_signers = {}
+_signers_lock = threading.Lock()
+
+
+def session_signer(secret=None, ttl=12 * 3600):
+    """The process-wide signer for `secret`, so every page accepts the tokens the others issued"""
+    with _signers_lock:
+        signer = _signers.get((secret, ttl))
+        if signer is None:
+            signer = _signers[(secret, ttl)] = SessionSigner(secret, ttl)
+        return signer
+
+
+if __name__ == '__main__':
+    first = getpass.getpass("Password: ")
+    if first != getpass.getpass("Repeat: "):
+        raise SystemExit("Passwords do not match")
+    print(hash_password(first))
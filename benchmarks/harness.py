@@ -0,0 +1,126 @@
+"""Shared pieces of the benchmark scripts: synthetic data, timing and JSON results."""
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import DEFAULT_COMMENT, migrate_doubts_csv, migrate_reports_csv  # noqa: E402
+
+TEAMS = [f"Team {i}" for i in range(1, 11)]
+METRICS = ('runs', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms', 'reruns_per_s', 'error')
+
+
+def dataset_shape(rows, max_days=100):
+    """(users, days) for a grid of `rows` reports, at most one per user and day"""
+    days = max(1, min(max_days, rows // 50))
+    return -(-rows // days), days
+
+
+def generate_reports(path, rows, today=None):
+    """Write a report CSV of `rows` reports on the days before `today`, oldest first.
+
+    Every user reports once a day, so the files stay valid for the one-per-day
+    rule; about half of the reports already carry an admin comment.
+    """
+    today = pd.Timestamp(today or date.today())
+    users, days = dataset_shape(rows)
+    position = pd.Series(range(rows))
+    user = position % users
+    dates = (today - pd.to_timedelta(days - position // users, unit='D')).dt.strftime('%Y-%m-%d')
+    df = pd.DataFrame({
+        'ID': position + 1,
+        'Timestamp': dates + ' 09:' + (user % 60).astype(str).str.zfill(2) + ':00',
+        'Date': dates,
+        'Team': [TEAMS[u % len(TEAMS)] for u in user],
+        'GitLab Username': 'intern' + user.astype(str),
+        'Standup Report': 'Yesterday: worked on ticket #' + position.astype(str) + '\nToday: reviews, tests\nBlockers: none',
+        'Comment': [DEFAULT_COMMENT if i % 2 else 'Reviewed ✅' for i in range(rows)],
+    })
+    df.to_csv(path, index=False)
+    migrate_reports_csv(path)
+    return users
+
+
+def generate_doubts(path, resolved_path, rows, active_share=0.1):
+    """Write doubt CSVs with `rows` doubts in total, `active_share` of them unresolved"""
+    active = max(1, int(rows * active_share))
+    position = pd.Series(range(rows))
+    df = pd.DataFrame({
+        'Timestamp': '2030-01-01 10:' + (position % 60).astype(str).str.zfill(2) + ':00',
+        'Name': 'intern' + (position % 997).astype(str),
+        'Phone': '98765' + position.astype(str).str.zfill(5).str[-5:],
+        'Doubt': 'How do I fix merge conflict number ' + position.astype(str) + '?',
+    })
+    df.iloc[:active].to_csv(path, index=False)
+    df.iloc[active:].to_csv(resolved_path, index=False)
+    migrate_doubts_csv(path, resolved_path)
+    return active
+
+
+def summarize(samples):
+    ms = sorted(sample * 1000 for sample in samples)
+    return {
+        'runs': len(ms),
+        'mean_ms': round(sum(ms) / len(ms), 3),
+        'p50_ms': round(ms[len(ms) // 2], 3),
+        'p95_ms': round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        'max_ms': round(ms[-1], 3),
+    }
+
+
+def measure(fn, repeat, setup=None):
+    """Time `repeat` calls of fn(*setup()); setup time is not counted"""
+    samples = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        started = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def _key(result):
+    return tuple(sorted((name, value) for name, value in result.items() if name not in METRICS))
+
+
+def write_results(path, benchmark, results, **settings):
+    payload = {
+        'benchmark': benchmark,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': settings,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(payload, file, indent=2)
+
+
+def find_regressions(results, baseline_path, tolerance):
+    """Results whose p50 is more than `tolerance` (0.25 = 25%) slower than in the baseline file"""
+    with open(baseline_path, encoding='utf-8') as file:
+        baseline = {_key(result): result for result in json.load(file)['results']}
+    regressions = []
+    for result in results:
+        before = baseline.get(_key(result))
+        if not before or 'p50_ms' not in before:
+            continue
+        if 'p50_ms' not in result or result['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+            regressions.append((result, before))
+    return regressions
+
+
+def report_regressions(results, baseline_path, tolerance):
+    """Print regressions against `baseline_path`; returns the process exit code"""
+    regressions = find_regressions(results, baseline_path, tolerance)
+    for result, before in regressions:
+        label = ' '.join(f"{name}={value}" for name, value in _key(result))
+        print(f"REGRESSION {label}: p50 {before['p50_ms']}ms -> {result.get('p50_ms', result.get('error'))}")
+    print(f"{len(regressions)} regressions against {baseline_path}")
+    return 1 if regressions else 0
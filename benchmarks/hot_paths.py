@@ -0,0 +1,119 @@
+"""Time the storage hot paths behind main.py and pages/doubts.py on synthetic data.
+
+For every backend and data size a fresh data set is generated and opened
+the same way the app opens it (tiered report store, search index, history
+cache and rollup as listeners). Then each request-path operation is timed.
+Results go to a JSON file; pass a previous file as --baseline to fail on
+regressions.
+
+    python benchmarks/hot_paths.py --rows 1000 10000 100000 --backend sqlite csv
+    python benchmarks/hot_paths.py --rows 10000 --baseline bench_hot_paths.json
+"""
+import argparse
+import itertools
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+from harness import generate_doubts, generate_reports, measure, report_regressions, write_results
+
+from archive import PartitionArchive, TieredReportStore  # noqa: E402 (path set up by harness)
+from duplicates import DuplicateIndex  # noqa: E402
+from history import UserHistoryCache  # noqa: E402
+from rollups import ReportRollup  # noqa: E402
+from search import SearchIndex  # noqa: E402
+from storage import SqliteDoubtStore, open_report_store  # noqa: E402
+
+
+def _open_reports(directory, backend):
+    hot = open_report_store(backend, os.path.join(directory, 'standup_reports.csv'), os.path.join(directory, 'standup.db'))
+    return TieredReportStore(hot, PartitionArchive(os.path.join(directory, 'archive')))
+
+
+def run_backend(args, backend, rows):
+    directory = os.path.join(args.dir, f"{backend}-{rows}")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    users = generate_reports(os.path.join(directory, 'standup_reports.csv'), rows)
+    active_doubts = generate_doubts(os.path.join(directory, 'doubts.csv'), os.path.join(directory, 'resolved_doubts.csv'), rows)
+
+    store = _open_reports(directory, backend)
+    store.add_listener(SearchIndex(os.path.join(directory, 'search.db'))).sync_reports(store)
+    duplicates = store.add_listener(DuplicateIndex(os.path.join(directory, 'duplicates.db')))
+    duplicates.sync_reports(store)
+    history = store.add_listener(UserHistoryCache())
+    store.add_listener(ReportRollup(store))
+    doubts = SqliteDoubtStore(os.path.join(directory, 'doubts.db'), os.path.join(directory, 'doubts.csv'),
+                              os.path.join(directory, 'resolved_doubts.csv'))
+    store.load_reports()
+
+    rng = random.Random(args.seed)
+    today = datetime.now().strftime('%Y-%m-%d')
+    user = lambda: (f"intern{rng.randrange(users)}",)  # noqa: E731
+    report_ids = store.query_reports(limit=200)['ID'].tolist()
+    fresh_users = (f"newcomer{i}" for i in itertools.count())
+    doubt_ids = iter(doubts.load_doubts()['ID'].tolist())
+    cold = min(args.repeat, args.cold_repeat)
+
+    operations = [
+        ('load_reports', lambda: store.load_reports(), None, args.repeat),
+        ('load_reports_cold', lambda s: s.load_reports(), lambda: (_open_reports(directory, backend),), cold),
+        ('has_submitted_today', lambda name: store.has_submitted(name, today), user, args.repeat),
+        ('get_user_reports', lambda name: store.user_reports(name), user, args.repeat),
+        ('get_user_reports_cached', lambda name: history.reports(store, name), lambda: ('intern0',), args.repeat),
+        ('admin_page', lambda: (store.count_reports(), store.query_reports(limit=25)), None, args.repeat),
+        ('team_counts', lambda: store.team_counts(), None, args.repeat),
+        ('similar_page', lambda: duplicates.matches(report_ids[:25]), None, args.repeat),
+        ('save_comment', lambda report_id: store.set_comment(report_id, 'Benchmarked 👍'),
+         lambda: (rng.choice(report_ids),), args.repeat),
+        ('save_report', lambda name: store.add_report(name, 'Team 1', 'benchmark report'),
+         lambda: (next(fresh_users),), args.repeat),
+        ('load_doubts', lambda: doubts.load_doubts(), None, args.repeat),
+        ('doubts_page', lambda: (doubts.count_doubts('resolved'), doubts.query_doubts('resolved', limit=20)),
+         None, args.repeat),
+        ('resolve_doubt', lambda doubt_id: doubts.resolve(doubt_id), lambda: (next(doubt_ids),),
+         min(args.repeat, active_doubts)),
+    ]
+    results = []
+    for name, fn, setup, repeat in operations:
+        stats = measure(fn, repeat, setup)
+        results.append({'name': name, 'backend': backend, 'rows': rows, **stats})
+        print(f"{backend:6} rows={rows:<8} {name:24} p50={stats['p50_ms']:>10.3f}ms p95={stats['p95_ms']:>10.3f}ms")
+    if not args.keep:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--backend', nargs='+', choices=['csv', 'sqlite'], default=['sqlite', 'csv'])
+    parser.add_argument('--repeat', type=int, default=20, help='timed calls per operation')
+    parser.add_argument('--cold-repeat', type=int, default=3, help='timed calls for cold loads')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--dir', help='data directory (default: a fresh temp dir)')
+    parser.add_argument('--keep', action='store_true', help='keep the generated data')
+    parser.add_argument('--output', default='bench_hot_paths.json')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown vs. baseline')
+    args = parser.parse_args()
+    if args.dir is None:
+        args.dir = tempfile.mkdtemp(prefix='standup-bench-')
+
+    results = []
+    for rows in args.rows:
+        for backend in args.backend:
+            results.extend(run_backend(args, backend, rows))
+    write_results(args.output, 'hot_paths', results, rows=args.rows, backends=args.backend,
+                  repeat=args.repeat, seed=args.seed)
+    print(f"wrote {args.output}")
+    if args.baseline:
+        return report_regressions(results, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Full page reruns of main.py and pages/doubts.py through Streamlit's AppTest.
+
+For every data size a synthetic data set is generated, then N simulated
+sessions run concurrently. Each session is its own process, because AppTest
+drives a process-wide Streamlit runtime. Each session opens its page,
+performs the scenario's interaction and reruns it --reruns times. Every
+rerun is timed, and the results go to a JSON file (see --baseline).
+
+Scenarios:
+    user    main.py with a GitLab username entered (own history)
+    admin   main.py logged in as admin (filters, stats, first page)
+    doubts  pages/doubts.py with the admin panel unlocked
+
+    python benchmarks/page_reruns.py --rows 1000 10000 --sessions 1 4 16
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from harness import generate_doubts, generate_reports, report_regressions, summarize, write_results
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_PASSWORD = 'bench'
+
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+
+def _open(script, timeout):
+    return AppTest.from_file(os.path.join(ROOT, script), default_timeout=timeout)
+
+
+def _user(app, session):
+    app.run()
+    _widget(app.text_input, "GitLab Username *").input(f"intern{session}")
+
+
+def _admin(app, session):
+    app.run()
+    app.sidebar.text_input[0].input(ADMIN_PASSWORD)
+    app.sidebar.button[0].click()
+
+
+def _doubts(app, session):
+    app.run()
+    _widget(app.text_input, "Enter Admin Password").input(ADMIN_PASSWORD)
+    _widget(app.button, "🔓 Login").click()
+
+
+SCENARIOS = {
+    'user': ('main.py', _user),
+    'admin': ('main.py', _admin),
+    'doubts': ('pages/doubts.py', _doubts),
+}
+
+
+def _warm_up(args):
+    _open('main.py', args.timeout).run()
+
+
+def run_session(args, scenario, session):
+    script, prepare = SCENARIOS[scenario]
+    app = _open(script, args.timeout)
+    prepare(app, session)
+    samples = []
+    for _ in range(args.reruns):
+        started = time.perf_counter()
+        app.run()
+        samples.append(time.perf_counter() - started)
+        if app.exception:
+            raise RuntimeError(f"{scenario} page raised: {app.exception[0].value}")
+    return samples
+
+
+def run_size(args, rows):
+    directory = os.path.join(args.dir, f"pages-{rows}")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    generate_reports(os.path.join(directory, 'standup_reports.csv'), rows)
+    generate_doubts(os.path.join(directory, 'doubts.csv'), os.path.join(directory, 'resolved_doubts.csv'), rows)
+    os.makedirs(os.path.join(directory, '.streamlit'))
+    with open(os.path.join(directory, '.streamlit', 'secrets.toml'), 'w', encoding='utf-8') as file:
+        file.write(f'admin_password = "{ADMIN_PASSWORD}"\nstorage_backend = "{args.backend}"\n')
+
+    # The pages use relative paths
+    previous_cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        # First run builds the stores and indexes (in a child: AppTest replaces __main__)
+        with multiprocessing.Pool(1) as pool:
+            pool.apply(_warm_up, (args,))
+
+        results = []
+        for scenario in args.scenario:
+            for sessions in args.sessions:
+                started = time.perf_counter()
+                try:
+                    with multiprocessing.Pool(sessions) as pool:
+                        runs = pool.starmap(run_session, [(args, scenario, session) for session in range(sessions)])
+                except Exception as e:
+                    # e.g. a rerun over --timeout; record it and carry on with the other runs
+                    results.append({'name': f"rerun_{scenario}", 'rows': rows, 'sessions': sessions, 'error': str(e)})
+                    print(f"rows={rows:<8} {scenario:7} sessions={sessions:<3} FAILED: {e}")
+                    continue
+                elapsed = time.perf_counter() - started
+                stats = summarize([sample for samples in runs for sample in samples])
+                result = {'name': f"rerun_{scenario}", 'rows': rows, 'sessions': sessions, **stats,
+                          'reruns_per_s': round(stats['runs'] / elapsed, 2)}
+                results.append(result)
+                print(f"rows={rows:<8} {scenario:7} sessions={sessions:<3} p50={stats['p50_ms']:>9.1f}ms "
+                      f"p95={stats['p95_ms']:>9.1f}ms {result['reruns_per_s']:>7.1f} reruns/s")
+    finally:
+        os.chdir(previous_cwd)
+    if not args.keep:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--scenario', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='sqlite')
+    parser.add_argument('--reruns', type=int, default=5, help='timed reruns per session')
+    parser.add_argument('--timeout', type=float, default=120, help='seconds allowed per rerun')
+    parser.add_argument('--dir', help='data directory (default: a fresh temp dir)')
+    parser.add_argument('--keep', action='store_true', help='keep the generated data')
+    parser.add_argument('--output', default='bench_page_reruns.json')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown vs. baseline')
+    args = parser.parse_args()
+    args.output = os.path.abspath(args.output)
+    args.baseline = args.baseline and os.path.abspath(args.baseline)
+    if args.dir is None:
+        args.dir = tempfile.mkdtemp(prefix='standup-pages-')
+
+    results = []
+    for rows in args.rows:
+        results.extend(run_size(args, rows))
+    write_results(args.output, 'page_reruns', results, backend=args.backend, rows=args.rows, sessions=args.sessions,
+                  scenarios=args.scenario, reruns=args.reruns)
+    print(f"wrote {args.output}")
+    if args.baseline:
+        return report_regressions(results, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Concurrent-writer stress test for the storage layer.
+
+Fires N submitter processes (each with several threads) at one store while
+an extra process saves comments, then checks that every report landed
+exactly once, that no comment was lost, and that duplicate submissions
+for the same user and day were rejected. A second phase has every process
+submit the same --race-users names for one day at once: exactly one
+submission per name may win, whichever process it came from.
+
+    python benchmarks/stress_writes.py --backend csv --processes 8 --threads 8 --reports 25
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import DuplicateReportError, SqliteDoubtStore, open_report_store  # noqa: E402
+
+DATE = '2030-01-01'
+RACE_DATE = '2030-01-02'
+
+
+def _open(args):
+    return open_report_store(args.backend, os.path.join(args.dir, 'reports.csv'), os.path.join(args.dir, 'reports.db'))
+
+
+def _submitter(args, worker):
+    store = _open(args)
+
+    def submit(thread):
+        duplicates = 0
+        for i in range(args.reports):
+            username = f"user-{worker}-{thread}-{i}"
+            timestamp = f"{DATE} 09:30:{i % 60:02d}"
+            store.add_report(username, 'Team 1', f"report with, commas\nand \"quotes\" {i}", timestamp)
+            try:
+                store.add_report(username.upper(), 'Team 1', 'second attempt', timestamp)
+            except DuplicateReportError:
+                duplicates += 1
+        return duplicates
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        return sum(pool.map(submit, range(args.threads)))
+
+
+def _racer(args, worker):
+    """Submit the same names as every other racer; returns how many this process got in"""
+    store = _open(args)
+    accepted = 0
+    for i in range(args.race_users):
+        try:
+            store.add_report(f"racer-{i}", 'Team 1', f"from process {worker}", f"{RACE_DATE} 09:00:00")
+            accepted += 1
+        except DuplicateReportError:
+            pass
+    return accepted
+
+
+def _commenter(args, stop):
+    store = _open(args)
+    saved = set()
+    while not stop.is_set():
+        df = store.load_reports()
+        for report_id in df['ID'].head(5):
+            store.set_comment(report_id, f"reviewed {report_id}")
+            saved.add(int(report_id))
+        time.sleep(0.01)
+    return saved
+
+
+def _doubt_worker(args, worker):
+    store = SqliteDoubtStore(os.path.join(args.dir, 'doubts.db'))
+    for i in range(args.reports):
+        store.add_doubt(f"intern-{worker}-{i}", '9876543210', f"doubt {i}")
+        df = store.load_doubts()
+        if not df.empty:
+            store.resolve(df['ID'].iloc[0])
+
+
+def run(args):
+    expected = args.processes * args.threads * args.reports
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.processes + 1) as pool:
+        stop = multiprocessing.Manager().Event()
+        commenter = pool.apply_async(_commenter, (args, stop))
+        duplicates = sum(pool.starmap(_submitter, [(args, w) for w in range(args.processes)]))
+        stop.set()
+        commented = commenter.get()
+        pool.starmap(_doubt_worker, [(args, w) for w in range(args.processes)])
+        race_accepted = sum(pool.starmap(_racer, [(args, w) for w in range(args.processes)]))
+    elapsed = time.perf_counter() - started
+
+    df = _open(args).load_reports()
+    raced = df[df['Date'] == RACE_DATE]
+    df = df[df['Date'] == DATE]
+    keys = df['GitLab Username'].str.lower() + '|' + df['Date']
+    lost = expected - keys.nunique()
+    duplicated = len(df) - keys.nunique()
+    comments_lost = sum(1 for report_id in commented if df.loc[report_id, 'Comment'] != f"reviewed {report_id}")
+    ids_unique = df['ID'].is_unique
+    doubt_rows = SqliteDoubtStore(os.path.join(args.dir, 'doubts.db')).count_doubts()
+    doubts_expected = args.processes * args.reports
+
+    print(f"backend={args.backend} reports={len(df)}/{expected} in {elapsed:.2f}s "
+          f"({expected / elapsed:.0f} submits/s)")
+    print(f"lost={lost} duplicated={duplicated} rejected_duplicates={duplicates} "
+          f"comments_lost={comments_lost} doubts={doubt_rows}/{doubts_expected} unique_ids={ids_unique}")
+    ok = lost == 0 and duplicated == 0 and duplicates == expected and comments_lost == 0 \
+        and doubt_rows == doubts_expected and ids_unique
+    print(f"race: stored={len(raced)} accepted={race_accepted} expected={args.race_users} "
+          f"from {args.processes} processes")
+    ok = ok and len(raced) == race_accepted == args.race_users and raced['GitLab Username'].is_unique
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--reports', type=int, default=20, help='reports per thread')
+    parser.add_argument('--race-users', type=int, default=30, help='names every process submits in the race phase')
+    parser.add_argument('--dir', help='data directory (default: a fresh temp dir)')
+    args = parser.parse_args()
+    if args.dir is None:
+        args.dir = tempfile.mkdtemp(prefix='standup-stress-')
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
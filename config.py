@@ -0,0 +1,89 @@
+"""Settings, data file names and store wiring shared by the Streamlit pages and api.py."""
+import os
+import tomllib
+
+from archive import PartitionArchive, TieredReportStore
+from duplicates import DuplicateIndex
+from metrics import REGISTRY
+from search import SearchIndex
+from storage import SqliteDoubtStore, open_report_store
+from tenants import DEFAULT_TEAMS, TenantConfig
+
+# Files inside each tenant's data directory
+CSV_FILE = "standup_reports.csv"
+DB_FILE = "standup.db"
+SEARCH_DB_FILE = "search.db"
+DUPLICATES_DB_FILE = "duplicates.db"
+ARCHIVE_DIR = "archive"  # monthly partitions of reports older than the current month
+DOUBTS_DB_FILE = "doubts.db"
+DOUBTS_FILE = "doubts.csv"  # legacy CSVs, imported into DOUBTS_DB_FILE once
+RESOLVED_DOUBTS_FILE = "resolved_doubts.csv"
+
+SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
+
+
+def load_secrets(path=SECRETS_FILE):
+    """secrets.toml as a dict, for processes outside Streamlit (which reads st.secrets)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'rb') as file:
+        return tomllib.load(file)
+
+
+class Settings:
+    """The app's options from secrets.toml (a dict or st.secrets), with their defaults"""
+
+    def __init__(self, secrets):
+        self.storage_backend = secrets.get("storage_backend", "sqlite")  # "sqlite" or "csv"
+        self.admin_password = secrets.get("admin_password", "admin123")  # Default password for demo
+        self.admins = dict(secrets.get("admins", {}))  # admin name -> password hash from `python auth.py`
+        self.session_secret = secrets.get("session_secret")  # signs admin sessions; random per process if unset
+        self.session_hours = secrets.get("session_hours", 12)
+        self.tenants_file = secrets.get("tenants_file", "tenants.toml")  # colleges/cohorts; optional
+        self.notifications = secrets.get("notifications", {})  # sinks: "log" (default), "smtp", "webhook"
+        self.duplicate_threshold = secrets.get("duplicate_threshold", 0.8)  # similarity flagged in admin review
+        self.performance = secrets.get("performance", {})  # slow-operation thresholds, Prometheus metrics file
+        self.api_token = secrets.get("api_token")  # required by api.py when set
+
+
+def configure_metrics(settings):
+    REGISTRY.configure(
+        slow_ms=settings.performance.get("slow_operation_ms"),
+        slow_rerun_ms=settings.performance.get("slow_rerun_ms"),
+        metrics_file=settings.performance.get("metrics_file"),
+    )
+
+
+def tenant_config(settings):
+    return TenantConfig(settings.tenants_file, {
+        "name": "Matrusri", "teams": DEFAULT_TEAMS, "admins": settings.admins, "admin_password": settings.admin_password
+    })
+
+
+# -----------------------------
+# Stores of one tenant
+# -----------------------------
+def build_search_index(tenant):
+    return SearchIndex(tenant.path(SEARCH_DB_FILE))
+
+
+def build_duplicate_index(tenant, settings):
+    return DuplicateIndex(tenant.path(DUPLICATES_DB_FILE), settings.duplicate_threshold)
+
+
+def build_report_store(tenant, settings, search, duplicates, notifier):
+    """The tenant's tiered report store with its indexes brought up to date"""
+    hot = open_report_store(settings.storage_backend, tenant.path(CSV_FILE), tenant.path(DB_FILE))
+    store = TieredReportStore(hot, PartitionArchive(tenant.path(ARCHIVE_DIR)))
+    store.add_listener(search).sync_reports(store)
+    store.add_listener(duplicates).sync_reports(store)
+    store.add_listener(notifier)
+    return store
+
+
+def build_doubt_store(tenant, search, notifier):
+    """The tenant's doubt store (importing the legacy CSVs once) with the search index up to date"""
+    store = SqliteDoubtStore(tenant.path(DOUBTS_DB_FILE), tenant.path(DOUBTS_FILE), tenant.path(RESOLVED_DOUBTS_FILE))
+    store.add_listener(search).sync_doubts(store)
+    store.add_listener(notifier)
+    return store
@@ -0,0 +1,212 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from storage import StoreListener, connect_sqlite, normalize_username
+
+# Bumped when the layout or the hashing changes; an older index is dropped and rebuilt.
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    docid INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    username TEXT NOT NULL,
+    username_key TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+-- One row per band of each signature; `bucket` hashes the band number and its rows
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    bucket INTEGER NOT NULL,
+    docid INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (bucket, docid);
+-- Best earlier match of a report by the same user ('self') and by anyone else ('other')
+CREATE TABLE IF NOT EXISTS matches (
+    docid INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    match_docid INTEGER NOT NULL,
+    similarity REAL NOT NULL,
+    PRIMARY KEY (docid, kind)
+);
+"""
+
+SHINGLE_WORDS = 3
+NUM_HASHES = 64
+BANDS = 16  # 16 bands of 4 rows: pairs around 0.5 Jaccard or more usually share a bucket
+_ROWS = NUM_HASHES // BANDS
+# Newest reports compared per bucket, so boilerplate everyone posts ("no blockers") stays cheap
+BUCKET_CANDIDATES = 200
+_PRIME = (1 << 31) - 1
+
+# Fixed coefficients, so signatures stay comparable across processes and restarts
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, NUM_HASHES, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_HASHES, dtype=np.uint64)
+# Odd multipliers mixing each band's rows (and the band number) into one 64-bit bucket key
+_MIX = _rng.integers(1, 1 << 63, _ROWS + 1, dtype=np.uint64) | np.uint64(1)
+_BAND_NUMBERS = np.arange(BANDS, dtype=np.uint64)
+
+_WORD = re.compile(r'\w+')
+
+
+def shingles(text):
+    """The set of SHINGLE_WORDS-word sequences of the lowercased text (the whole text if shorter)"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text):
+    """MinHash signature (NUM_HASHES uint32 values) of the text's shingles, or None for empty text.
+
+    The share of equal positions in two signatures estimates the Jaccard
+    similarity of the two shingle sets.
+    """
+    found = shingles(text)
+    if not found:
+        return None
+    base = np.fromiter((zlib.crc32(shingle.encode('utf-8')) % _PRIME for shingle in found),
+                       dtype=np.uint64, count=len(found))
+    return ((np.outer(base, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def _band_keys(signature):
+    # uint64 arithmetic wraps around, which is what a multiplicative hash wants
+    bands = signature.reshape(BANDS, _ROWS).astype(np.uint64)
+    keys = (bands * _MIX[:_ROWS]).sum(axis=1, dtype=np.uint64) + _BAND_NUMBERS * _MIX[_ROWS]
+    return keys.view(np.int64).tolist()
+
+
+class DuplicateIndex(StoreListener):
+    """Near-duplicate detection for reports with MinHash signatures and an LSH index (SQLite).
+
+    Attached to the report store as a listener: every new report gets a
+    signature, its LSH buckets pull up the earlier reports it may resemble,
+    and the closest one by the same user and by anyone else is recorded when
+    its estimated similarity reaches `threshold`. That costs a few indexed
+    lookups per report instead of comparing it with the whole history.
+    """
+
+    def __init__(self, path, threshold=0.8):
+        self.path = path
+        self.threshold = threshold
+        self._local = threading.local()
+        conn = self._conn()
+        if conn.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA_VERSION:
+            conn.executescript(
+                'DROP TABLE IF EXISTS signatures; DROP TABLE IF EXISTS lsh_buckets; DROP TABLE IF EXISTS matches;'
+            )
+        conn.executescript(_SCHEMA + f'PRAGMA user_version = {_SCHEMA_VERSION};')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect_sqlite(self.path)
+        return conn
+
+    def _best_matches(self, conn, report_id, user_key, signature, keys):
+        per_bucket = 'SELECT docid FROM (SELECT docid FROM lsh_buckets WHERE bucket = ? AND docid < ? ORDER BY docid DESC LIMIT ?)'
+        candidates = conn.execute(
+            f'SELECT docid, username_key, signature FROM signatures WHERE docid IN ({" UNION ".join([per_bucket] * len(keys))}) '
+            'ORDER BY docid DESC',  # ties go to the most recent report
+            [value for key in keys for value in (key, report_id, BUCKET_CANDIDATES)],
+        ).fetchall()
+        if not candidates:
+            return []
+        signatures = np.frombuffer(b''.join(row[2] for row in candidates), dtype=np.uint32).reshape(-1, NUM_HASHES)
+        similarities = (signatures == signature).mean(axis=1)
+        best = {}
+        for (docid, candidate_key, _), similarity in zip(candidates, similarities):
+            kind = 'self' if candidate_key == user_key else 'other'
+            if similarity >= self.threshold and (kind not in best or similarity > best[kind][1]):
+                best[kind] = (docid, float(similarity))
+        return [(report_id, kind, docid, similarity) for kind, (docid, similarity) in best.items()]
+
+    def _index_reports(self, conn, rows):
+        for row in rows:
+            report_id = int(row['ID'])
+            user_key = normalize_username(row['GitLab Username'])
+            signature = minhash(row['Standup Report'])
+            if signature is None:
+                # No words to compare ("🚀🚀 ---"); still recorded, so sync_reports() counts it as indexed
+                conn.execute(
+                    'INSERT OR REPLACE INTO signatures (docid, timestamp, username, username_key, signature) '
+                    "VALUES (?, ?, ?, ?, x'')",
+                    (report_id, row['Timestamp'], row['GitLab Username'], user_key),
+                )
+                continue
+            keys = _band_keys(signature)
+            conn.executemany(
+                'INSERT OR REPLACE INTO matches (docid, kind, match_docid, similarity) VALUES (?, ?, ?, ?)',
+                self._best_matches(conn, report_id, user_key, signature, keys),
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO signatures (docid, timestamp, username, username_key, signature) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (report_id, row['Timestamp'], row['GitLab Username'], user_key, signature.tobytes()),
+            )
+            conn.executemany(
+                'INSERT INTO lsh_buckets (bucket, docid) VALUES (?, ?)', [(bucket, report_id) for bucket in keys]
+            )
+
+    # -----------------------------
+    # Store hooks
+    # -----------------------------
+    def reports_added(self, store, rows):
+        with self._conn() as conn:
+            self._index_reports(conn, rows)
+
+    @staticmethod
+    def _clear(conn):
+        conn.execute('DELETE FROM signatures')
+        conn.execute('DELETE FROM lsh_buckets')
+        conn.execute('DELETE FROM matches')
+
+    def reports_cleared(self, store):
+        with self._conn() as conn:
+            self._clear(conn)
+
+    def sync_reports(self, store):
+        """Rebuild the index if it is out of step with `store` (first run, external edits)"""
+        if self._conn().execute('SELECT COUNT(*) FROM signatures').fetchone()[0] == store.count_reports():
+            return False
+        with self._conn() as conn:
+            # One transaction: readers never see a half-built index, and a
+            # process starting alongside waits here and then finds it in step
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute('SELECT COUNT(*) FROM signatures').fetchone()[0] == store.count_reports():
+                return False
+            self._clear(conn)
+            # Oldest first, so every report is compared with the ones before it
+            for chunk in store.iter_reports():
+                self._index_reports(conn, chunk.sort_values('ID').to_dict('records'))
+        return True
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def matches(self, report_ids):
+        """{report ID: [match, ...]} for the given reports that resemble an earlier one.
+
+        Each match is a dict with kind ('self' or 'other'), the matched
+        report's ID, username and timestamp, and the estimated similarity.
+        """
+        report_ids = [int(report_id) for report_id in report_ids]
+        if not report_ids:
+            return {}
+        rows = self._conn().execute(
+            'SELECT m.docid, m.kind, m.match_docid, m.similarity, s.username, s.timestamp FROM matches m '
+            'LEFT JOIN signatures s ON s.docid = m.match_docid '
+            f'WHERE m.docid IN ({", ".join("?" * len(report_ids))}) ORDER BY m.similarity DESC',
+            report_ids,
+        ).fetchall()
+        found = {}
+        for docid, kind, match_id, similarity, username, timestamp in rows:
+            found.setdefault(docid, []).append({
+                'kind': kind, 'id': match_id, 'similarity': similarity, 'username': username, 'timestamp': timestamp,
+            })
+        return found
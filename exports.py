@@ -0,0 +1,71 @@
+import gzip
+import io
+
+from storage import REPORT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+# format key -> (label, mime type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'text/csv', 'csv'),
+    'csv.gz': ('CSV (gzip)', 'application/gzip', 'csv.gz'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet', 'parquet'),
+}
+
+def available_formats():
+    """Export formats usable with the installed packages"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pq is not None]
+
+
+def _write_csv(chunks, file):
+    text = io.TextIOWrapper(file, encoding='utf-8', newline='', write_through=True)
+    text.write(','.join(REPORT_COLUMNS) + '\n')
+    for chunk in chunks:
+        chunk.to_csv(text, header=False, index=False)
+    text.flush()
+    text.detach()
+
+
+def _write_csv_gz(chunks, file):
+    with gzip.GzipFile(fileobj=file, mode='wb') as compressed:
+        _write_csv(chunks, compressed)
+
+
+def _write_parquet(chunks, file):
+    schema = pa.schema([('ID', pa.int64())] + [(column, pa.string()) for column in REPORT_COLUMNS[1:]])
+    with pq.ParquetWriter(file, schema) as writer:
+        for chunk in chunks:
+            # One row group per chunk
+            writer.write_table(pa.Table.from_pandas(chunk.astype({'ID': 'int64'}), schema=schema, preserve_index=False))
+
+
+_WRITERS = {'csv': _write_csv, 'csv.gz': _write_csv_gz, 'parquet': _write_parquet}
+
+
+def write_reports(chunks, fmt, file):
+    """Encode an iterable of report DataFrames as `fmt` into the binary `file`"""
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}")
+    _WRITERS[fmt](chunks, file)
+
+
+def export_reports(store, fmt='csv', start_date=None, end_date=None, team=None, username=None, chunk_size=5000):
+    """Write the matching reports in `fmt` and return the file contents as bytes.
+
+    Rows are pulled from store.iter_reports() one chunk at a time, so only
+    one chunk of rows is held at once, but the encoded export is built in
+    memory: st.download_button keeps whatever it serves in memory anyway.
+    Meant to be passed (via functools.partial) as a download button's
+    `data` so nothing runs until the admin clicks.
+    """
+    file = io.BytesIO()
+    write_reports(store.iter_reports(start_date, end_date, team, username, chunk_size), fmt, file)
+    return file.getvalue()
+
+
+def export_file_name(prefix, fmt, now):
+    return f"{prefix}_{now.strftime('%Y%m%d_%H%M%S')}.{EXPORT_FORMATS[fmt][2]}"
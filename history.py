@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+from storage import StoreListener, normalize_username
+
+
+class UserHistoryCache(StoreListener):
+    """Per-user report history, newest first, kept until that user's data changes.
+
+    An entry is dropped when its user submits (reports_added) or an admin
+    comments on one of their reports (comments_changed). Appends made by
+    other processes are picked up by ID in refresh(); a rewrite or removal
+    in the store drops every entry. At most `max_users` histories are kept,
+    least recently viewed first out.
+    """
+
+    def __init__(self, max_users=1000):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # username key -> DataFrame
+        self._owners = {}  # report ID -> username key, for cached entries only
+        self._epoch = 0  # bumped on every invalidation
+        self._version = None
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _forget(self, user_key):
+        df = self._entries.pop(user_key, None)
+        if df is not None:
+            for report_id in df['ID']:
+                self._owners.pop(int(report_id), None)
+
+    def _invalidate(self, user_keys):
+        with self._lock:
+            self._epoch += 1
+            for user_key in user_keys:
+                self._forget(user_key)
+
+    def _invalidate_all(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._owners.clear()
+
+    # -----------------------------
+    # Store hooks
+    # -----------------------------
+    def reports_added(self, store, rows):
+        self._invalidate({normalize_username(row['GitLab Username']) for row in rows})
+
+    def comments_changed(self, store, comments):
+        with self._lock:
+            owners = {self._owners.get(int(report_id)) for report_id in comments}
+        self._invalidate(owners - {None})
+
+    def reports_cleared(self, store):
+        self._invalidate_all()
+
+    def refresh(self, store):
+        """Catch up with reports other processes appended or removed"""
+        version = store.data_version()
+        with self._lock:
+            previous, self._version = self._version, version
+        if previous is None or version == previous:
+            return
+        if version[0] != previous[0]:
+            self._invalidate_all()
+        else:
+            new_rows = store.reports_since(previous[1])
+            self._invalidate({normalize_username(username) for username in new_rows['GitLab Username']})
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def reports(self, store, username):
+        """All of the user's reports, newest first; shared, treat as read-only"""
+        self.refresh(store)
+        user_key = normalize_username(username)
+        with self._lock:
+            df = self._entries.get(user_key)
+            if df is not None:
+                self._entries.move_to_end(user_key)
+                self.stats['hits'] += 1
+                return df
+            self.stats['misses'] += 1
+            epoch = self._epoch
+        df = store.user_reports(username)
+        with self._lock:
+            # Skip caching if an invalidation raced with the read
+            if epoch == self._epoch:
+                self._entries[user_key] = df
+                self._owners.update(dict.fromkeys((int(report_id) for report_id in df['ID']), user_key))
+                while len(self._entries) > self.max_users:
+                    self._forget(next(iter(self._entries)))
+        return df
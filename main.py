@@ -1,151 +1,166 @@
 import streamlit as st
 import pandas as pd
-import csv
 from datetime import datetime
-import os
+import sqlite3
+from functools import partial
+
+from config import ARCHIVE_DIR, configure_metrics
+from exports import EXPORT_FORMATS, available_formats, export_file_name, export_reports
+from history import UserHistoryCache
+from metrics import REGISTRY
+from rollups import ReportRollup
+from storage import REPORT_COLUMNS, DuplicateReportError
+from ui import (
+    BY_DATA_DIR, current_admin, current_tenant, get_settings, log_in, log_out, open_duplicates, open_search_index,
+    open_store, tenant_selector,
+)
 
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
+REGISTRY.begin_rerun()
+
+SETTINGS = get_settings()
+configure_metrics(SETTINGS)
+
+# Reports shown per "Load more" step in "Your Previous Reports"
+HISTORY_PAGE_SIZE = 5
+
+# Comments offered for bulk-apply in the admin batch review mode
+CANNED_COMMENTS = [
+    "Reviewed ✅",
+    "Great progress, keep it up! 👍",
+    "Please add more detail about your blockers.",
+    "Please list concrete tasks for today.",
+]
+
+# The college/cohort this session works in, picked with ?tenant=<id>
+TENANT = current_tenant()
+TEAMS = TENANT.teams
+
 st.set_page_config(
-    page_title="Matrusri Daily Standup Reports",
+    page_title=f"{TENANT.title} Daily Standup Reports",
     page_icon="📝",
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
-CSV_FILE = "standup_reports.csv"
-DOUBTS_FILE = "doubts.csv"
-ADMIN_PASSWORD = st.secrets.get("admin_password", "admin123")  # Default password for demo
-
-# Team options
-TEAMS = [
-    "Team 1",
-    "Team 2", 
-    "Team 3",
-    "Team 4",
-    "Team 5",
-    "Team 6",
-    "Team 7",
-    "Team 8",
-    "Team 9",
-    "Team 10"
-]
-
 # -----------------------------
-# CSV Initialization
+# Storage
 # -----------------------------
+@st.cache_resource(hash_funcs=BY_DATA_DIR)
+def open_rollup(tenant):
+    store = open_store(tenant)
+    return store.add_listener(ReportRollup(store))
+
+@st.cache_resource(hash_funcs=BY_DATA_DIR)
+def open_history(tenant):
+    return open_store(tenant).add_listener(UserHistoryCache())
+
+def get_search_index():
+    return open_search_index(TENANT)
+
+def get_store():
+    return open_store(TENANT)
+
+def get_duplicates():
+    return open_duplicates(TENANT)
+
+def get_rollup():
+    return open_rollup(TENANT)
+
+def get_history():
+    return open_history(TENANT)
+
 def init_csv():
-    if not os.path.exists(CSV_FILE):
-        with open(CSV_FILE, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(['Timestamp', 'Date', 'Team', 'GitLab Username', 'Standup Report', 'Comment'])
-    else:
-        # Add Team and Comment columns if missing
-        df = pd.read_csv(CSV_FILE)
-        if 'Team' not in df.columns:
-            df.insert(2, 'Team', 'Not Specified')  # Insert Team column after Date
-            df.to_csv(CSV_FILE, index=False)
-        if 'Comment' not in df.columns:
-            df['Comment'] = 'Check back later to view comment 📝'
-            df.to_csv(CSV_FILE, index=False)
-    
-    # Doubts file
-    if not os.path.exists(DOUBTS_FILE):
-        with open(DOUBTS_FILE, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(['Timestamp', 'Name', 'Phone', 'Doubt'])
-
-def load_reports():
-    if os.path.exists(CSV_FILE):
-        df = pd.read_csv(CSV_FILE)
-        # Handle backward compatibility - add Date/Team/Comment columns if missing
-        if 'Date' not in df.columns:
-            try:
-                df['Date'] = pd.to_datetime(df['Timestamp']).dt.strftime('%Y-%m-%d')
-                df.to_csv(CSV_FILE, index=False)
-            except Exception as e:
-                df['Date'] = datetime.now().strftime('%Y-%m-%d')
-                df.to_csv(CSV_FILE, index=False)
-        if 'Team' not in df.columns:
-            df.insert(2, 'Team', 'Not Specified')
-            df.to_csv(CSV_FILE, index=False)
-        if 'Comment' not in df.columns:
-            df['Comment'] = 'Check back later to view admins reply'
-            df.to_csv(CSV_FILE, index=False)
-        return df
-    return pd.DataFrame(columns=['Timestamp', 'Date', 'Team', 'GitLab Username', 'Standup Report', 'Comment'])
+    get_store()
 
+@REGISTRY.timed()
 def has_submitted_today(username):
     """Check if username has already submitted a report today"""
     try:
-        reports_df = load_reports()
-        if reports_df.empty:
-            return False
-        
         today_str = datetime.now().strftime("%Y-%m-%d")
-        
-        # Filter for this user and today
-        user_reports_today = reports_df[
-            (reports_df['GitLab Username'].str.strip().str.lower() == username.lower()) & 
-            (reports_df['Date'].astype(str).str.contains(today_str))
-        ]
-        
-        return not user_reports_today.empty
-        
+        return get_store().has_submitted(username, today_str)
     except Exception as e:
         st.error(f"Error checking submissions: {e}")
         # If there's any error, allow submission (fail safe)
         return False
 
+@REGISTRY.timed()
 def save_report(username, team, report):
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        date = datetime.now().strftime("%Y-%m-%d")
-        with open(CSV_FILE, 'a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow([timestamp, date, team, username, report, 'Check back later to view comment 📝'])
+        get_store().add_report(username, team, report)
         return True
+    except DuplicateReportError:
+        st.error("❌ You have already submitted a report today!")
+        return False
     except Exception as e:
         st.error(f"Error saving report: {e}")
         return False
 
-def save_comment(timestamp, comment):
+@REGISTRY.timed()
+def save_comment(report_id, comment):
     try:
-        df = pd.read_csv(CSV_FILE)
-        df.loc[df['Timestamp'] == timestamp, 'Comment'] = comment
-        df.to_csv(CSV_FILE, index=False)
+        get_store().set_comment(report_id, comment)
         return True
     except Exception as e:
         st.error(f"Error saving comment: {e}")
         return False
 
+@REGISTRY.timed()
+def save_comments(comments):
+    """Save several comments at once (one write, one reload)"""
+    try:
+        get_store().set_comments(comments)
+        return True
+    except Exception as e:
+        st.error(f"Error saving comments: {e}")
+        return False
+
+@REGISTRY.timed()
 def get_user_reports(username):
-    """Get all reports for a specific user"""
-    reports_df = load_reports()
-    if reports_df.empty:
-        return pd.DataFrame()
-    
-    user_reports = reports_df[
-        reports_df['GitLab Username'].str.strip().str.lower() == username.lower()
-    ].sort_values('Timestamp', ascending=False)
-    
-    return user_reports
+    """Get all reports for a specific user, newest first"""
+    return get_history().reports(get_store(), username)
+
+@REGISTRY.timed()
+def find_similar(report_ids):
+    """Near-duplicate matches of the shown reports: {report ID: [match, ...]}"""
+    return get_duplicates().matches(report_ids)
+
+def clear_batch_edits():
+    """Drop the batch review fields, so they are drawn again from the stored comments"""
+    for key in [key for key in st.session_state if key.startswith("batch_comment_")]:
+        del st.session_state[key]
+    st.session_state.pop("batch_rendered", None)
+
+def similarity_badge(matches):
+    """Expander label suffix for a report that closely matches an earlier one"""
+    if not matches:
+        return ""
+    best = matches[0]
+    who = "own earlier report" if best['kind'] == 'self' else f"{best['username']}'s report"
+    return f" · 🔁 {best['similarity']:.0%} like {who}"
+
+def show_similar(matches):
+    for match in matches:
+        who = "their own report" if match['kind'] == 'self' else f"**{match['username']}**'s report"
+        st.caption(f"🔁 {match['similarity']:.0%} similar to {who} #{match['id']} from {match['timestamp']}")
 
 # -----------------------------
 # Initialize
 # -----------------------------
 init_csv()
 
-# Initialize session state for admin access
-if 'is_admin' not in st.session_state:
-    st.session_state.is_admin = False
+# Admin access: the signed session token of this tenant, checked on every rerun
+ADMIN = current_admin(TENANT)
+st.session_state.is_admin = ADMIN is not None
 
 # -----------------------------
 # SIDEBAR
 # -----------------------------
 with st.sidebar:
     st.markdown("# 📝 **Standup App**")
+    tenant_selector(TENANT)
     st.markdown("---")
     
     # Navigation
@@ -158,62 +173,101 @@ with st.sidebar:
     st.markdown("## 🔐 **Admin Panel**")
     
     if not st.session_state.is_admin:
+        admin_user = st.text_input("Admin Username", key="admin_user") if TENANT.admins else ""
         admin_password = st.text_input("Admin Password", type="password", key="admin_login")
         if st.button("🔓 Login as Admin"):
-            if admin_password == ADMIN_PASSWORD:
-                st.session_state.is_admin = True
+            # The password is checked once here; later reruns only check the token
+            if log_in(TENANT, admin_user, admin_password):
                 st.success("✅ Admin access granted!")
                 st.rerun()
             else:
                 st.error("❌ Incorrect password")
     else:
-        st.success("🛡️ Admin Mode Active")
+        st.success(f"🛡️ Admin Mode Active ({ADMIN})")
         
         if st.button("🔒 Logout Admin"):
-            st.session_state.is_admin = False
+            log_out()
             st.rerun()
         
         st.markdown("---")
         
         # Admin features
-        reports_df = load_reports()
+        rollup = get_rollup()
+        rollup.refresh(get_store())
+        stats = rollup.summary(datetime.now().strftime('%Y-%m-%d'))
         
-        if not reports_df.empty:
-            # Download reports
-            csv_data = reports_df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv_data,
-                file_name=f"standup_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+        if stats['total_reports']:
+            # Download reports (generated in chunks only when the button is clicked)
+            with st.expander("📥 Export Reports"):
+                export_dates = st.date_input("Date range", value=(), key="export_dates")
+                export_team = st.selectbox("Team", ["All Teams"] + TEAMS, key="export_team")
+                export_user = st.text_input("GitLab Username contains", key="export_user")
+                export_format = st.selectbox(
+                    "Format", available_formats(),
+                    format_func=lambda fmt: EXPORT_FORMATS[fmt][0], key="export_format"
+                )
+                start_date = export_dates[0].strftime('%Y-%m-%d') if len(export_dates) > 0 else None
+                end_date = export_dates[-1].strftime('%Y-%m-%d') if len(export_dates) > 0 else None
+                st.download_button(
+                    label="📥 Download",
+                    data=partial(
+                        export_reports, get_store(), export_format,
+                        start_date=start_date, end_date=end_date,
+                        team=None if export_team == "All Teams" else export_team,
+                        username=export_user.strip() or None,
+                    ),
+                    file_name=export_file_name("standup_reports", export_format, datetime.now()),
+                    mime=EXPORT_FORMATS[export_format][1],
+                    on_click="ignore"
+                )
             
             # Quick stats
             st.markdown("### 📊 Quick Stats")
-            total_reports = len(reports_df)
-            today_reports = len(reports_df[reports_df['Date'] == datetime.now().strftime('%Y-%m-%d')])
-            unique_users = reports_df['GitLab Username'].nunique()
-            
-            st.metric("Total Reports", total_reports)
-            st.metric("Today's Reports", today_reports)
-            st.metric("Active Users", unique_users)
+            st.metric("Total Reports", stats['total_reports'])
+            st.metric("Today's Reports", stats['day_reports'])
+            st.metric("Active Users", stats['active_users'])
+            cache = get_store().cache_stats()
+            st.caption(f"Report cache: {cache['hits']} hits, {cache['tail_reads']} tail reads, {cache['misses']} misses")
             
             # Clear all reports
             st.markdown("---")
-            if st.button("🗑️ Clear All Reports", type="secondary"):
+            if st.button("🗑️ Clear All Reports", type="secondary", help=f"Reports are archived to {ARCHIVE_DIR}/rotated, not deleted"):
                 try:
-                    with open(CSV_FILE, 'w', newline='', encoding='utf-8') as file:
-                        writer = csv.writer(file)
-                        writer.writerow(['Timestamp', 'Date', 'Team', 'GitLab Username', 'Standup Report', 'Comment'])
-                    st.success("✅ All reports cleared!")
+                    get_store().clear()
+                    st.success("✅ All reports archived and cleared!")
                     st.rerun()
                 except Exception as e:
                     st.error(f"❌ Failed to clear: {e}")
 
+        # Timings of this server process (all sessions and pages)
+        with st.expander("⏱️ Performance"):
+            perf_df = pd.DataFrame(REGISTRY.snapshot())
+            if perf_df.empty:
+                st.caption("No operations timed yet.")
+            else:
+                st.caption(f"Percentiles over the last {REGISTRY.window // 60:.0f} minutes")
+                st.dataframe(
+                    perf_df[['operation', 'window_calls', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'calls', 'errors', 'slow']],
+                    hide_index=True
+                )
+            slow_ops = REGISTRY.slow_operations()
+            st.write(f"**Slow operations** (≥ {REGISTRY.slow_ms:.0f} ms, reruns ≥ {REGISTRY.slow_rerun_ms:.0f} ms):")
+            if slow_ops:
+                st.dataframe(pd.DataFrame(slow_ops), hide_index=True)
+            else:
+                st.caption("None so far.")
+            st.download_button(
+                label="📈 Prometheus metrics",
+                data=REGISTRY.prometheus,
+                file_name="standup_metrics.prom",
+                mime="text/plain",
+                on_click="ignore"
+            )
+
 # -----------------------------
 # MAIN CONTENT
 # -----------------------------
-st.title("📝 Matrusri Daily Standup Reports")
+st.title(f"📝 {TENANT.title} Daily Standup Reports")
 st.markdown("---")
 
 # Instructions
@@ -286,9 +340,14 @@ if not st.session_state.is_admin:
         user_reports = get_user_reports(username.strip())
         
         if not user_reports.empty:
-            st.info(f"📈 Showing {len(user_reports)} reports for {username}")
+            # Render only the latest reports; "Load more" extends the page
+            if st.session_state.get('history_user') != username.strip().lower():
+                st.session_state.history_user = username.strip().lower()
+                st.session_state.history_limit = HISTORY_PAGE_SIZE
+            shown = user_reports.head(st.session_state.history_limit)
+            st.info(f"📈 Showing {len(shown)} of {len(user_reports)} reports for {username}")
             
-            for _, row in user_reports.iterrows():
+            for _, row in shown.iterrows():
                 with st.container():
                     col1, col2 = st.columns([1, 4])
                     with col1:
@@ -302,6 +361,10 @@ if not st.session_state.is_admin:
                         else:
                             st.caption("⏳ Waiting for admin feedback...")
                 st.markdown("---")
+            if len(user_reports) > len(shown):
+                if st.button(f"⬇️ Load {min(HISTORY_PAGE_SIZE, len(user_reports) - len(shown))} more"):
+                    st.session_state.history_limit += HISTORY_PAGE_SIZE
+                    st.rerun()
         else:
             st.info("📭 No previous reports found. Submit your first report above!")
     else:
@@ -313,9 +376,9 @@ if not st.session_state.is_admin:
 elif st.session_state.is_admin:
     st.header("🛡️ Admin View - All Submitted Reports")
     
-    reports_df = load_reports()
+    total_reports = get_store().count_reports()
     
-    if not reports_df.empty:
+    if total_reports:
         # Filters for admin
         col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
         with col1:
@@ -325,67 +388,168 @@ elif st.session_state.is_admin:
         with col3:
             sort_order = st.selectbox("📅 Sort by", ["Newest First", "Oldest First"])
         with col4:
-            show_count = st.selectbox("📄 Show entries", [10, 25, 50, "All"])
+            page_size = st.selectbox("📄 Per page", [10, 25, 50, 100])
+
+        text_query = st.text_input(
+            "🔎 Search report text & comments",
+            placeholder='e.g. docker, "merge conflict", deploy*'
+        ).strip()
 
-        filtered_df = reports_df.copy()
+        team = None if team_filter == "All Teams" else team_filter
+        try:
+            if text_query:
+                matching_reports = get_search_index().count_reports(text_query, username=search_username.strip(), team=team)
+            else:
+                matching_reports = get_store().count_reports(username=search_username.strip(), team=team)
+        except sqlite3.OperationalError as e:
+            st.error(f"❌ Invalid search: {e}")
+            matching_reports = 0
+        total_pages = max(1, -(-matching_reports // page_size))
         
-        # Apply filters
-        if search_username:
-            filtered_df = filtered_df[filtered_df['GitLab Username'].str.contains(search_username, case=False, na=False)]
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1, step=1)
         
-        if team_filter != "All Teams":
-            filtered_df = filtered_df[filtered_df['Team'] == team_filter]
-
-        if sort_order == "Newest First":
-            filtered_df = filtered_df.sort_values('Timestamp', ascending=False)
+        # Only the visible page is fetched from storage
+        if not matching_reports:
+            filtered_df = pd.DataFrame(columns=REPORT_COLUMNS)
+        elif text_query:
+            # Ranked by relevance; the sort selector does not apply
+            with REGISTRY.timer("search_reports"):
+                filtered_df = get_search_index().search_reports(
+                    text_query,
+                    username=search_username.strip(),
+                    team=team,
+                    limit=page_size,
+                    offset=(page - 1) * page_size
+                )
         else:
-            filtered_df = filtered_df.sort_values('Timestamp', ascending=True)
-
-        if show_count != "All":
-            filtered_df = filtered_df.head(int(show_count))
-
-        st.info(f"📈 Showing {len(filtered_df)} of {len(reports_df)} total reports")
+            with REGISTRY.timer("query_reports"):
+                filtered_df = get_store().query_reports(
+                    username=search_username.strip(),
+                    team=team,
+                    newest_first=(sort_order == "Newest First"),
+                    limit=page_size,
+                    offset=(page - 1) * page_size
+                )
+        
+        with col2:
+            if len(filtered_df):
+                first = (page - 1) * page_size + 1
+                st.info(f"📈 Showing {first}–{first + len(filtered_df) - 1} of {matching_reports} matching reports ({total_reports} total)")
+            else:
+                st.info(f"📈 Showing 0 of {matching_reports} matching reports ({total_reports} total)")
 
         # Team Statistics
         st.subheader("📊 Team Statistics")
-        team_counts = reports_df['Team'].value_counts()
+        with REGISTRY.timer("team_counts"):
+            team_counts = get_store().team_counts()
         col1, col2 = st.columns([2, 1])
         with col1:
             st.bar_chart(team_counts)
         with col2:
             st.write("**Reports by Team:**")
-            for team, count in team_counts.items():
-                st.write(f"• {team}: {count}")
+            for team_name, count in team_counts.items():
+                st.write(f"• {team_name}: {count}")
+
+        # Participation dashboard (served from the rollup)
+        st.subheader("📈 Participation")
+        rollup = get_rollup()
+        rollup.refresh(get_store())
+        stats_day = st.date_input("Day", value=datetime.now().date()).strftime('%Y-%m-%d')
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            st.write("**Participation by Team:**")
+            st.dataframe(rollup.participation(stats_day), hide_index=True)
+        with col2:
+            missing_df = rollup.missing(stats_day)
+            st.write(f"**Missing Standup ({len(missing_df)}):**")
+            st.dataframe(missing_df, hide_index=True)
+        with col3:
+            st.write("**🔥 Current Streaks:**")
+            st.dataframe(rollup.streaks(stats_day), hide_index=True)
 
         st.markdown("---")
 
         # Display reports with comment functionality
         st.subheader("📝 Reports & Comments")
+        batch_mode = st.toggle("🗂️ Batch review mode", help="Edit many comments and save them together in one write")
+        similar = find_similar(filtered_df['ID'])
         
-        for _, row in filtered_df.iterrows():
-            with st.expander(f"👤 {row['GitLab Username']} ({row.get('Team', 'Not Specified')}) - {row['Timestamp']}"):
-                st.markdown("**Report:**")
-                st.write(row['Standup Report'])
+        if batch_mode:
+            # Bulk-apply a canned comment to everything currently shown
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                canned_comment = st.selectbox("Canned comment", CANNED_COMMENTS)
+            with col2:
+                st.write("")
+                apply_canned = st.button(f"📌 Apply to {len(filtered_df)} shown")
+            if apply_canned:
+                if save_comments({report_id: canned_comment for report_id in filtered_df['ID']}):
+                    clear_batch_edits()
+                    st.success(f"✅ Comment applied to {len(filtered_df)} reports!")
+                    st.rerun()
+            
+            # What each field showed when the form was last drawn; only fields
+            # whose submitted value differs from it were edited by the admin
+            rendered = st.session_state.get("batch_rendered", {})
+            shown = {}
+            with st.form("batch_review"):
+                edits = {}
+                for _, row in filtered_df.iterrows():
+                    matches = similar.get(row['ID'], [])
+                    with st.expander(f"👤 {row['GitLab Username']} ({row.get('Team', 'Not Specified')}) - {row['Timestamp']}{similarity_badge(matches)}"):
+                        st.write(row['Standup Report'])
+                        show_similar(matches)
+                        current_comment = row.get('Comment', '')
+                        if current_comment == 'Check back later to view comment 📝':
+                            current_comment = ''
+                        new_comment = st.text_area(
+                            "Add/Edit Comment",
+                            value=current_comment,
+                            key=f"batch_comment_{row['ID']}",
+                            height=100
+                        )
+                        if new_comment != rendered.get(row['ID'], new_comment):
+                            edits[row['ID']] = new_comment
+                        shown[row['ID']] = new_comment
+                save_all = st.form_submit_button("💾 Save All Comments", type="primary")
+            st.session_state.batch_rendered = shown
+            
+            if save_all:
+                if not edits:
+                    st.info("No comment changes to save.")
+                elif save_comments(edits):
+                    clear_batch_edits()
+                    st.success(f"✅ Saved {len(edits)} comments!")
+                    st.rerun()
+        else:
+            for _, row in filtered_df.iterrows():
+                matches = similar.get(row['ID'], [])
+                with st.expander(f"👤 {row['GitLab Username']} ({row.get('Team', 'Not Specified')}) - {row['Timestamp']}{similarity_badge(matches)}"):
+                    st.markdown("**Report:**")
+                    st.write(row['Standup Report'])
+                    show_similar(matches)
                 
-                st.markdown("**Admin Comment:**")
-                comment_key = f"comment_{row['Timestamp']}"
-                current_comment = row.get('Comment', '')
-                if current_comment == 'Check back later to view comment 📝':
-                    current_comment = ''
+                    st.markdown("**Admin Comment:**")
+                    comment_key = f"comment_{row['ID']}"
+                    current_comment = row.get('Comment', '')
+                    if current_comment == 'Check back later to view comment 📝':
+                        current_comment = ''
                 
-                new_comment = st.text_area(
-                    "Add/Edit Comment", 
-                    value=current_comment, 
-                    key=comment_key,
-                    height=100
-                )
+                    new_comment = st.text_area(
+                        "Add/Edit Comment", 
+                        value=current_comment, 
+                        key=comment_key,
+                        height=100
+                    )
                 
-                if st.button(f"💾 Save Comment", key=f"save_{row['Timestamp']}"):
-                    if save_comment(row['Timestamp'], new_comment):
-                        st.success("✅ Comment saved!")
-                        st.rerun()
-                    else:
-                        st.error("❌ Failed to save comment")
+                    if st.button(f"💾 Save Comment", key=f"save_{row['ID']}"):
+                        if save_comment(row['ID'], new_comment):
+                            st.success("✅ Comment saved!")
+                            st.rerun()
+                        else:
+                            st.error("❌ Failed to save comment")
     else:
         st.info("📭 No reports submitted yet.")
 
@@ -394,3 +558,5 @@ elif st.session_state.is_admin:
 # -----------------------------
 st.markdown("---")
 st.markdown("**From a MECS TechLead** | Built with ❤️ using Streamlit")
+
+REGISTRY.end_rerun("main")
@@ -0,0 +1,224 @@
+import functools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from storage import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _percentile(ordered, share):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class _Operation:
+    __slots__ = ('buckets', 'count', 'sum', 'errors', 'slow', 'recent')
+
+    def __init__(self, max_samples):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.slow = 0
+        self.recent = deque(maxlen=max_samples)  # (monotonic time, seconds)
+
+
+class Metrics:
+    """Timings of app operations and page reruns, shared by every session in the process.
+
+    Each operation keeps cumulative histogram buckets (for Prometheus) and
+    its most recent samples, from which snapshot() reports percentiles over
+    the last `window` seconds. An operation slower than `slow_ms` is logged
+    and kept in slow_operations(); a slow rerun is logged with the
+    operations it ran, slowest first, so the log says where the time went.
+
+    Reruns are traced per thread: Streamlit runs each session's script in
+    its own thread, and begin_rerun() / end_rerun() bracket one run.
+    """
+
+    def __init__(self, window=900, max_samples=2000, slow_ms=500, slow_rerun_ms=2000, max_slow=100):
+        self.window = window
+        self.max_samples = max_samples
+        self.slow_ms = slow_ms
+        self.slow_rerun_ms = slow_rerun_ms
+        self.metrics_file = None
+        self.export_interval = 15
+        self._operations = {}
+        self._slow = deque(maxlen=max_slow)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._exported = 0.0
+
+    def configure(self, slow_ms=None, slow_rerun_ms=None, metrics_file=None, export_interval=None):
+        """Apply settings from the `[performance]` secrets; None keeps the current value"""
+        if slow_ms is not None:
+            self.slow_ms = float(slow_ms)
+        if slow_rerun_ms is not None:
+            self.slow_rerun_ms = float(slow_rerun_ms)
+        if metrics_file is not None:
+            self.metrics_file = metrics_file or None
+        if export_interval is not None:
+            self.export_interval = float(export_interval)
+
+    # -----------------------------
+    # Recording
+    # -----------------------------
+    def observe(self, name, seconds, error=False, detail=None, threshold_ms=None):
+        threshold_ms = self.slow_ms if threshold_ms is None else threshold_ms
+        is_slow = seconds * 1000 >= threshold_ms
+        with self._lock:
+            operation = self._operations.get(name)
+            if operation is None:
+                operation = self._operations[name] = _Operation(self.max_samples)
+            for position, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    operation.buckets[position] += 1
+                    break
+            operation.count += 1
+            operation.sum += seconds
+            operation.errors += error
+            operation.slow += is_slow
+            operation.recent.append((time.monotonic(), seconds))
+            if is_slow:
+                self._slow.append({
+                    'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    'operation': name,
+                    'ms': round(seconds * 1000, 1),
+                    'detail': detail or '',
+                })
+        if is_slow:
+            logger.warning("Slow %s: %.0f ms%s", name, seconds * 1000, f" ({detail})" if detail else "")
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.append((name, seconds))
+
+    @contextmanager
+    def timer(self, name, detail=None):
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            # Streamlit stops a script run with exceptions; only real failures count as errors
+            self.observe(name, time.perf_counter() - started, error=isinstance(e, Exception), detail=detail)
+            raise
+        self.observe(name, time.perf_counter() - started, detail=detail)
+
+    def timed(self, name=None):
+        """Decorator timing every call of the function as operation `name` (default: its name)"""
+        def decorate(function):
+            operation = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(operation):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def begin_rerun(self):
+        """Start timing a script run on this thread; an unfinished earlier run is dropped"""
+        self._local.trace = []
+        self._local.started = time.perf_counter()
+
+    def end_rerun(self, page):
+        """Record the run started by begin_rerun() as operation "rerun_<page>"."""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return
+        seconds = time.perf_counter() - self._local.started
+        self._local.trace = None
+        spans = sorted(trace, key=lambda span: span[1], reverse=True)[:5]
+        detail = ', '.join(f"{name} {duration * 1000:.0f} ms" for name, duration in spans)
+        self.observe(f"rerun_{page}", seconds, detail=detail, threshold_ms=self.slow_rerun_ms)
+        self._maybe_export()
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def snapshot(self):
+        """One dict per operation: totals plus percentiles over the rolling window"""
+        cutoff = time.monotonic() - self.window
+        rows = []
+        with self._lock:
+            operations = sorted(self._operations.items())
+            recent = {name: [seconds for at, seconds in operation.recent if at >= cutoff] for name, operation in operations}
+        for name, operation in operations:
+            ms = sorted(seconds * 1000 for seconds in recent[name])
+            rows.append({
+                'operation': name,
+                'calls': operation.count,
+                'errors': operation.errors,
+                'slow': operation.slow,
+                'window_calls': len(ms),
+                'p50_ms': round(_percentile(ms, 0.5), 1) if ms else math.nan,
+                'p95_ms': round(_percentile(ms, 0.95), 1) if ms else math.nan,
+                'p99_ms': round(_percentile(ms, 0.99), 1) if ms else math.nan,
+                'max_ms': round(ms[-1], 1) if ms else math.nan,
+                'mean_ms': round(operation.sum * 1000 / operation.count, 1),
+            })
+        return rows
+
+    def slow_operations(self):
+        """Recent slow operations, newest first"""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def prometheus(self, prefix='standup'):
+        """All operations in the Prometheus text exposition format"""
+        with self._lock:
+            operations = sorted(
+                (name, list(op.buckets), op.count, op.sum, op.errors, op.slow) for name, op in self._operations.items()
+            )
+        lines = [
+            f"# HELP {prefix}_operation_seconds Time spent in app operations and page reruns.",
+            f"# TYPE {prefix}_operation_seconds histogram",
+        ]
+        for name, buckets, count, total, _, _ in operations:
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            cumulative = 0
+            for bound, in_bucket in zip(BUCKETS, buckets):
+                cumulative += in_bucket
+                lines.append(f'{prefix}_operation_seconds_bucket{{operation="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_operation_seconds_bucket{{operation="{label}",le="+Inf"}} {count}')
+            lines.append(f'{prefix}_operation_seconds_sum{{operation="{label}"}} {total:.6f}')
+            lines.append(f'{prefix}_operation_seconds_count{{operation="{label}"}} {count}')
+        for metric, position, help_text in (
+            ('operation_errors_total', 4, "Operations that raised."),
+            ('slow_operations_total', 5, "Operations slower than the configured threshold."),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for operation in operations:
+                label = operation[0].replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{prefix}_{metric}{{operation="{label}"}} {operation[position]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write prometheus() to `path` atomically (for node_exporter's textfile collector)"""
+        text = self.prometheus()
+        atomic_write(path, lambda file: file.write(text))
+
+    def _maybe_export(self):
+        if not self.metrics_file:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._exported < self.export_interval:
+                return
+            self._exported = now
+        try:
+            self.write_prometheus(self.metrics_file)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", self.metrics_file, e)
+
+
+# One registry per process, so every page and session reports into the same histograms
+REGISTRY = Metrics()
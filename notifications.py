@@ -0,0 +1,226 @@
+import json
+import logging
+import queue
+import smtplib
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from email.message import EmailMessage
+
+from storage import DEFAULT_COMMENT, StoreListener
+
+logger = logging.getLogger(__name__)
+
+# Recipient used for notifications meant for whoever answers doubts
+TECHLEADS = 'techleads'
+
+
+class Notification:
+    __slots__ = ('kind', 'recipient', 'subject', 'body', 'created')
+
+    def __init__(self, kind, recipient, subject, body):
+        self.kind = kind
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# -----------------------------
+# Sinks
+# -----------------------------
+class LogSink:
+    """Writes notifications to the application log"""
+
+    def send(self, batch):
+        for notification in batch:
+            logger.info("Notify %s (%s): %s", notification.recipient, notification.kind, notification.subject)
+
+
+class SmtpSink:
+    """Emails a batch over one SMTP connection.
+
+    GitLab usernames are mailed at "<username>@<email_domain>" (skipped when
+    no domain is set) and TECHLEADS at `techlead_emails`. Point it at a
+    local stand-in such as `python -m aiosmtpd -n` while developing.
+    """
+
+    def __init__(self, host='localhost', port=25, sender='standup@localhost', email_domain=None,
+                 techlead_emails=(), timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.email_domain = email_domain
+        self.techlead_emails = list(techlead_emails)
+        self.timeout = timeout
+
+    def _addresses(self, notification):
+        if notification.recipient == TECHLEADS:
+            return self.techlead_emails
+        return [f"{notification.recipient}@{self.email_domain}"] if self.email_domain else []
+
+    def send(self, batch):
+        messages = []
+        for notification in batch:
+            addresses = self._addresses(notification)
+            if not addresses:
+                continue
+            message = EmailMessage()
+            message['From'] = self.sender
+            message['To'] = ', '.join(addresses)
+            message['Subject'] = notification.subject
+            message.set_content(notification.body)
+            messages.append(message)
+        if not messages:
+            return
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            for message in messages:
+                smtp.send_message(message)
+
+
+class WebhookSink:
+    """POSTs a batch as {"notifications": [...]} JSON; any non-2xx response is a failure"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, batch):
+        payload = json.dumps({'notifications': [notification.to_dict() for notification in batch]}).encode('utf-8')
+        request = urllib.request.Request(self.url, data=payload, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def build_sinks(config):
+    """Sinks listed in config["sinks"] ("log", "smtp", "webhook"), set up from the same mapping"""
+    sinks = []
+    for name in config.get('sinks', ['log']):
+        if name == 'log':
+            sinks.append(LogSink())
+        elif name == 'smtp':
+            sinks.append(SmtpSink(
+                host=config.get('smtp_host', 'localhost'),
+                port=int(config.get('smtp_port', 25)),
+                sender=config.get('smtp_sender', 'standup@localhost'),
+                email_domain=config.get('email_domain'),
+                techlead_emails=config.get('techlead_emails', []),
+            ))
+        elif name == 'webhook':
+            sinks.append(WebhookSink(config['webhook_url']))
+        else:
+            raise ValueError(f"Unknown notification sink: {name}")
+    return sinks
+
+
+# -----------------------------
+# Delivery
+# -----------------------------
+class NotificationQueue:
+    """Delivers notifications from a background worker thread.
+
+    put() only enqueues, so a request never waits on a mail server. The
+    worker takes up to `max_batch` notifications at a time, waiting at most
+    `linger` seconds for a batch to fill, and hands it to every sink. A sink
+    that raises is retried with exponential backoff up to `max_attempts`
+    times before the batch is logged and dropped for that sink. Delivery is
+    at least once: a retried batch can repeat messages a sink already took.
+    """
+
+    def __init__(self, sinks, max_batch=50, linger=1.0, max_attempts=5, backoff=1.0, max_queued=10000):
+        self.sinks = list(sinks)
+        self._max_batch = max_batch
+        self._linger = linger
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._queue = queue.Queue(max_queued)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.stats = {'queued': 0, 'delivered': 0, 'failed': 0, 'dropped': 0}
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='notifications', daemon=True)
+                self._thread.start()
+
+    def put(self, notification):
+        try:
+            self._queue.put_nowait(notification)
+            self.stats['queued'] += 1
+        except queue.Full:
+            self.stats['dropped'] += 1
+            logger.warning("Notification queue full, dropping %s for %s", notification.kind, notification.recipient)
+            return
+        self._ensure_thread()
+
+    def join(self):
+        """Block until everything queued so far has been delivered or given up on"""
+        self._queue.join()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._linger
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, sink, batch):
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                sink.send(batch)
+                return True
+            except Exception as e:
+                if attempt == self._max_attempts:
+                    logger.exception("%s gave up on %d notifications", type(sink).__name__, len(batch))
+                    return False
+                logger.warning("%s failed (attempt %d), retrying: %s", type(sink).__name__, attempt, e)
+                time.sleep(self._backoff * 2 ** (attempt - 1))
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                for sink in self.sinks:
+                    self.stats['delivered' if self._deliver(sink, batch) else 'failed'] += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+class Notifier(StoreListener):
+    """Queues a notification when an admin comments on a report (for its author)
+    and when a doubt is submitted (for TECHLEADS)"""
+
+    def __init__(self, notifications):
+        self.notifications = notifications
+
+    def comments_changed(self, store, comments):
+        for report_id, comment in comments.items():
+            if not comment or comment == DEFAULT_COMMENT:
+                continue
+            report = store.get_report(report_id)
+            if report is None:
+                continue
+            self.notifications.put(Notification(
+                'feedback', report['GitLab Username'],
+                f"Feedback on your standup report for {report['Date']}",
+                f"{comment}\n\nYour report:\n{report['Standup Report']}",
+            ))
+
+    def doubt_added(self, store, row):
+        self.notifications.put(Notification(
+            'doubt', TECHLEADS,
+            f"New doubt from {row['Name']}",
+            f"{row['Doubt']}\n\nPhone: {row['Phone']}\nSubmitted: {row['Timestamp']}",
+        ))
@@ -1,72 +1,86 @@
 import streamlit as st
-import pandas as pd
-import csv
 from datetime import datetime
-import os
 
-DOUBTS_FILE = "doubts.csv"
-RESOLVED_DOUBTS_FILE = "resolved_doubts.csv"
-ADMIN_PASSWORD = st.secrets.get("admin_password", "")
+from config import configure_metrics
+from metrics import REGISTRY
+from storage import DOUBT_ACTIVE, DOUBT_RESOLVED
+from ui import current_admin, current_tenant, get_settings, log_in, open_doubt_store, open_search_index, tenant_selector
 
-# Initialize doubts CSV if not exists
+DOUBTS_PAGE_SIZE = 20
+
+REGISTRY.begin_rerun()
+configure_metrics(get_settings())
+
+# Same tenant selection (?tenant=<id>) and admin session as the main page
+TENANT = current_tenant()
+ADMIN = current_admin(TENANT)
+
+def get_search_index():
+    return open_search_index(TENANT)
+
+def get_doubt_store():
+    return open_doubt_store(TENANT)
+
+# Create the doubts database (importing the legacy CSVs) if not exists
 def init_doubts_csv():
-    if not os.path.exists(DOUBTS_FILE):
-        with open(DOUBTS_FILE, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(['Timestamp', 'Name', 'Phone', 'Doubt'])
-    if not os.path.exists(RESOLVED_DOUBTS_FILE):
-        with open(RESOLVED_DOUBTS_FILE, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(['Timestamp', 'Name', 'Phone', 'Doubt'])
+    get_doubt_store()
 
+@REGISTRY.timed()
 def save_doubt(name, phone, doubt):
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(DOUBTS_FILE, 'a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow([timestamp, name, phone, doubt])
+        get_doubt_store().add_doubt(name, phone, doubt)
         return True
     except Exception as e:
         st.error(f"Error saving doubt: {e}")
         return False
 
-def load_doubts():
-    if os.path.exists(DOUBTS_FILE):
-        return pd.read_csv(DOUBTS_FILE)
-    return pd.DataFrame(columns=['Timestamp', 'Name', 'Phone', 'Doubt'])
+@REGISTRY.timed()
+def load_doubts(offset=0):
+    """One page of active doubts, newest first"""
+    return get_doubt_store().query_doubts(DOUBT_ACTIVE, limit=DOUBTS_PAGE_SIZE, offset=offset)
 
-def load_resolved_doubts():
-    if os.path.exists(RESOLVED_DOUBTS_FILE):
-        return pd.read_csv(RESOLVED_DOUBTS_FILE)
-    return pd.DataFrame(columns=['Timestamp', 'Name', 'Phone', 'Doubt'])
+@REGISTRY.timed()
+def load_resolved_doubts(offset=0):
+    """One page of resolved doubts, newest first"""
+    return get_doubt_store().query_doubts(DOUBT_RESOLVED, limit=DOUBTS_PAGE_SIZE, offset=offset)
 
-def resolve_doubt(timestamp):
+@REGISTRY.timed()
+def assign_doubt(doubt_id, assignee):
     try:
-        doubts_df = load_doubts()
-        resolved_df = load_resolved_doubts()
-        doubt_row = doubts_df[doubts_df['Timestamp'] == timestamp]
-        if not doubt_row.empty:
-            # Append to resolved
-            resolved_df = pd.concat([resolved_df, doubt_row], ignore_index=True)
-            resolved_df.to_csv(RESOLVED_DOUBTS_FILE, index=False)
-            # Remove from active
-            doubts_df = doubts_df[doubts_df['Timestamp'] != timestamp]
-            doubts_df.to_csv(DOUBTS_FILE, index=False)
-            return True
+        return get_doubt_store().assign(doubt_id, assignee)
+    except Exception as e:
+        st.error(f"Error assigning doubt: {e}")
         return False
+
+@REGISTRY.timed()
+def resolve_doubt(doubt_id, assignee=None, note=""):
+    try:
+        return get_doubt_store().resolve(doubt_id, assignee=assignee, note=note)
     except Exception as e:
         st.error(f"Error resolving doubt: {e}")
         return False
 
+def page_offset(total, key):
+    """Page selector for `total` doubts (hidden for a single page); returns the first row of the chosen page"""
+    pages = max(1, -(-total // DOUBTS_PAGE_SIZE))
+    if pages == 1:
+        return 0
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=key)
+    return (page - 1) * DOUBTS_PAGE_SIZE
+
 init_doubts_csv()
 
 st.set_page_config(
-    page_title="Intern Doubts - Matrusri",
+    page_title=f"Intern Doubts - {TENANT.title}",
     page_icon="❓",
     layout="wide"
 )
 
+tenants = tenant_selector(TENANT)
+
 st.title("❓ Intern Doubts & Queries")
+if len(tenants) > 1:
+    st.caption(f"🏫 {TENANT.title}")
 st.markdown("---")
 
 st.header("🙋‍♂️ Submit Your Doubt/Query")
@@ -87,56 +101,91 @@ if submit:
 st.markdown("---")
 
 with st.expander("🔐 TechLead/Techead Panel (Restricted)", expanded=False):
-    admin_input = st.text_input("Enter Admin Password", type="password")
-    if admin_input == ADMIN_PASSWORD:
-        st.success("🛡️ Access granted. Viewing all submitted doubts.")
-        doubts_df = load_doubts()
-        resolved_df = load_resolved_doubts()
-        if not doubts_df.empty:
-            st.markdown("### 🟡 Active Doubts")
-            for _, row in doubts_df.sort_values('Timestamp', ascending=False).iterrows():
+    if ADMIN is None:
+        admin_user = st.text_input("Admin Username") if TENANT.admins else ""
+        admin_input = st.text_input("Enter Admin Password", type="password")
+        if st.button("🔓 Login"):
+            if log_in(TENANT, admin_user, admin_input):
+                st.rerun()
+            else:
+                st.error("❌ Incorrect password.")
+    else:
+        st.success(f"🛡️ Access granted ({ADMIN}). Viewing all submitted doubts.")
+        doubt_query = st.text_input("🔎 Search doubts", placeholder='e.g. docker, "merge conflict"').strip()
+        if doubt_query:
+            try:
+                results = get_search_index().search_doubts(doubt_query)
+            except Exception as e:
+                st.error(f"❌ Invalid search: {e}")
+            else:
+                st.markdown(f"### 🔎 {len(results)} matching doubts")
+                for _, row in results.iterrows():
+                    badge = "🟡 Active" if row['Status'] == 'active' else "🟢 Resolved"
+                    st.markdown(f"**👤 {row['Name']}** | 📞 {row['Phone']} | {badge}")
+                    st.caption(f"🕒 {row['Timestamp']}")
+                    st.markdown(f"**Doubt:** {row['Doubt']}")
+                    st.markdown("---")
+        active_count = get_doubt_store().count_doubts(DOUBT_ACTIVE)
+        resolved_count = get_doubt_store().count_doubts(DOUBT_RESOLVED)
+        if active_count:
+            st.markdown(f"### 🟡 Active Doubts ({active_count})")
+            doubts_df = load_doubts(page_offset(active_count, "active_page"))
+            for _, row in doubts_df.iterrows():
                 with st.container():
-                    st.markdown(f"**👤 {row['Name']}** | 📞 {row['Phone']}")
+                    assigned = f" | 🧑‍💻 {row['Assignee']}" if row['Assignee'] else ""
+                    st.markdown(f"**👤 {row['Name']}** | 📞 {row['Phone']}{assigned}")
                     st.caption(f"🕒 {row['Timestamp']}")
                     st.markdown(f"**Doubt:** {row['Doubt']}")
-                    if st.button(f"✅ Mark as Resolved", key=f"resolve_{row['Timestamp']}"):
-                        if resolve_doubt(row['Timestamp']):
-                            st.success("Doubt marked as resolved!")
-                            st.rerun()
+                    col1, col2 = st.columns([1, 2])
+                    with col1:
+                        assignee = st.text_input("Assignee", value=row['Assignee'], key=f"assignee_{row['ID']}")
+                    with col2:
+                        note = st.text_input("Resolution note", key=f"note_{row['ID']}")
+                    col1, col2 = st.columns([1, 4])
+                    with col1:
+                        if st.button("🧑‍💻 Assign", key=f"assign_{row['ID']}"):
+                            if assign_doubt(row['ID'], assignee.strip()):
+                                st.rerun()
+                    with col2:
+                        if st.button(f"✅ Mark as Resolved", key=f"resolve_{row['ID']}"):
+                            if resolve_doubt(row['ID'], assignee.strip(), note.strip()):
+                                st.success("Doubt marked as resolved!")
+                                st.rerun()
                 st.markdown("---")
         else:
             st.info("No active doubts submitted yet.")
-        st.markdown("### 🟢 Resolved Doubts")
-        if not resolved_df.empty:
-            for _, row in resolved_df.sort_values('Timestamp', ascending=False).iterrows():
+        st.markdown(f"### 🟢 Resolved Doubts ({resolved_count})")
+        if resolved_count:
+            resolved_df = load_resolved_doubts(page_offset(resolved_count, "resolved_page"))
+            for _, row in resolved_df.iterrows():
                 with st.container():
                     st.markdown(f"**👤 {row['Name']}** | 📞 {row['Phone']}")
-                    st.caption(f"🕒 {row['Timestamp']}")
+                    st.caption(f"🕒 {row['Timestamp']} · resolved {row['Resolved At'] or 'earlier'}"
+                               + (f" by {row['Assignee']}" if row['Assignee'] else ""))
                     st.markdown(f"**Doubt:** {row['Doubt']}")
+                    if row['Resolution Note']:
+                        st.markdown(f"**Resolution:** {row['Resolution Note']}")
                 st.markdown("---")
             # Download button for resolved doubts
-            csv_data = resolved_df.to_csv(index=False)
             st.download_button(
                 label="📥 Download Resolved Doubts as CSV",
-                data=csv_data,
+                data=get_doubt_store().export_resolved,  # read only when clicked
                 file_name=f"resolved_doubts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
+                mime="text/csv",
+                on_click="ignore"
             )
             # Clear all resolved doubts button
             if st.button("🗑️ Clear All Resolved Doubts"):
                 try:
-                    with open(RESOLVED_DOUBTS_FILE, 'w', newline='', encoding='utf-8') as file:
-                        writer = csv.writer(file)
-                        writer.writerow(['Timestamp', 'Name', 'Phone', 'Doubt'])
+                    get_doubt_store().clear_resolved()
                     st.success("All resolved doubts have been cleared.")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Failed to clear resolved doubts: {e}")
         else:
             st.info("No doubts have been marked as resolved yet.")
-    elif admin_input != "":
-        st.error("❌ Incorrect password.")
 
 st.markdown("---")
-st.markdown("**From a MECS TechLead** | Built with ❤️ using Streamlit") 
+st.markdown("**From a MECS TechLead** | Built with ❤️ using Streamlit")
 
+REGISTRY.end_rerun("doubts")
@@ -0,0 +1,167 @@
+import threading
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+import pandas as pd
+
+from storage import StoreListener, normalize_username
+
+
+def _next_workday(day):
+    day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+class _UserStats:
+    __slots__ = ('name', 'team', 'reports', 'first_date', 'last_date', 'streak')
+
+    def __init__(self, name, team):
+        self.name = name
+        self.team = team
+        self.reports = 0
+        self.first_date = None
+        self.last_date = None
+        self.streak = 0
+
+
+class ReportRollup(StoreListener):
+    """Incrementally maintained date x team x user rollup of the report store.
+
+    Built once from the store, then updated from add_report() through the
+    listener hook and from rows other processes appended (picked up by ID in
+    refresh()). Stats are answered from these counters, so their cost
+    depends on the number of teams and users, not on the report history.
+
+    Streaks count consecutive working days (Mon-Fri) with a report.
+    """
+
+    def __init__(self, store):
+        self._lock = threading.Lock()
+        self._rebuild(store)
+
+    def _reset(self):
+        self._total = 0
+        self._last_id = 0
+        self._date_counts = Counter()
+        self._date_team_users = defaultdict(set)
+        self._users = {}
+        self._team_members = defaultdict(set)
+
+    def _rebuild(self, store):
+        self._reset()
+        self._version = store.data_version()
+        self._apply(store.reports_since(0).sort_values(['Date', 'ID']).to_dict('records'))
+
+    def _apply(self, rows):
+        for row in rows:
+            user_key = normalize_username(row['GitLab Username'])
+            report_date = row['Date']
+            team = row['Team']
+            self._total += 1
+            self._last_id = max(self._last_id, int(row['ID']))
+            self._date_counts[report_date] += 1
+            self._date_team_users[(report_date, team)].add(user_key)
+
+            stats = self._users.get(user_key)
+            if stats is None:
+                stats = self._users[user_key] = _UserStats(row['GitLab Username'], team)
+            day = date.fromisoformat(report_date)
+            if stats.first_date is None or day < stats.first_date:
+                stats.first_date = day
+            if stats.last_date is None or day > stats.last_date:
+                # Team and streak follow the user's latest report
+                self._team_members[stats.team].discard(user_key)
+                stats.team = team
+                stats.name = row['GitLab Username']
+                if stats.last_date is not None and _next_workday(stats.last_date) >= day:
+                    stats.streak += 1
+                else:
+                    stats.streak = 1
+                stats.last_date = day
+            self._team_members[stats.team].add(user_key)
+            stats.reports += 1
+
+    # -----------------------------
+    # Store hooks
+    # -----------------------------
+    def reports_added(self, store, rows):
+        # Pull by ID rather than applying `rows` directly so reports other
+        # processes appended just before these are not skipped
+        self.refresh(store)
+
+    def reports_cleared(self, store):
+        with self._lock:
+            self._rebuild(store)
+
+    def refresh(self, store):
+        """Catch up with writes made by other processes"""
+        version = store.data_version()
+        with self._lock:
+            if version == self._version:
+                return
+            if version[0] != self._version[0]:
+                self._rebuild(store)
+            else:
+                self._apply(store.reports_since(self._last_id).to_dict('records'))
+                self._version = version
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def summary(self, day):
+        """Total reports, reports on `day` and distinct users"""
+        with self._lock:
+            return {
+                'total_reports': self._total,
+                'day_reports': self._date_counts.get(day, 0),
+                'active_users': len(self._users),
+            }
+
+    def _roster(self, day, active_days):
+        """Users per team who had started by `day` and reported within `active_days` before it"""
+        day = date.fromisoformat(day)
+        cutoff = day - timedelta(days=active_days)
+        return {
+            team: {
+                user for user in members
+                if self._users[user].first_date <= day and self._users[user].last_date >= cutoff
+            }
+            for team, members in self._team_members.items()
+        }
+
+    def participation(self, day, active_days=14):
+        """Per team: reports on `day`, active members and participation rate"""
+        with self._lock:
+            rows = []
+            for team, members in sorted(self._roster(day, active_days).items()):
+                submitted = len(self._date_team_users.get((day, team), ()))
+                if not members and not submitted:
+                    continue
+                rate = submitted / len(members) * 100 if members else 100.0
+                rows.append({'Team': team, 'Submitted': submitted, 'Members': len(members), 'Participation %': round(rate, 1)})
+        return pd.DataFrame(rows, columns=['Team', 'Submitted', 'Members', 'Participation %'])
+
+    def missing(self, day, active_days=14):
+        """Recently active users without a report on `day`"""
+        with self._lock:
+            rows = [
+                {'GitLab Username': self._users[user].name, 'Team': team, 'Last Report': self._users[user].last_date.isoformat()}
+                for team, members in self._roster(day, active_days).items()
+                for user in members
+                if user not in self._date_team_users.get((day, team), ())
+            ]
+        return pd.DataFrame(rows, columns=['GitLab Username', 'Team', 'Last Report']).sort_values(['Team', 'GitLab Username'])
+
+    def streaks(self, day, top=10):
+        """Longest current streaks as of `day`"""
+        today = date.fromisoformat(day)
+        with self._lock:
+            rows = [
+                {'GitLab Username': stats.name, 'Team': stats.team, 'Streak': stats.streak}
+                for stats in self._users.values()
+                if stats.last_date == today or (stats.last_date < today and _next_workday(stats.last_date) >= today)
+            ]
+        df = pd.DataFrame(rows, columns=['GitLab Username', 'Team', 'Streak'])
+        return df.sort_values('Streak', ascending=False, kind='stable').head(top)
@@ -0,0 +1,219 @@
+import re
+import threading
+
+import pandas as pd
+
+from storage import DOUBT_COLUMNS, REPORT_COLUMNS, StoreListener, connect_sqlite, normalize_username
+
+# Bumped when the layout changes; an older index is dropped and rebuilt.
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS report_text USING fts5(report, comment, tokenize='porter unicode61');
+CREATE TABLE IF NOT EXISTS report_docs (
+    docid INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    team TEXT NOT NULL,
+    username TEXT NOT NULL,
+    username_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_report_docs_timestamp ON report_docs (timestamp);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS doubt_text USING fts5(doubt, tokenize='porter unicode61');
+CREATE TABLE IF NOT EXISTS doubt_docs (
+    docid INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_doubt_docs_timestamp ON doubt_docs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_doubt_docs_status ON doubt_docs (status);
+"""
+
+_TERM = re.compile(r'"([^"]*)"|(\S+)')
+_OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+def to_match_query(text):
+    """Turn user input into a safe FTS5 MATCH expression.
+
+    "quoted text" is a phrase, word* a prefix, AND/OR/NOT pass through as
+    operators; every other word is quoted so punctuation cannot break the
+    query. Terms without an operator between them must all match.
+    """
+    terms = []
+    for phrase, word in _TERM.findall(text):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+        elif word.upper() in _OPERATORS:
+            if terms and terms[-1] not in _OPERATORS:
+                terms.append(word.upper())
+        elif word:
+            prefix = word.endswith('*')
+            word = word.replace('"', '').strip('*')
+            if word:
+                terms.append(f'"{word}"' + ('*' if prefix else ''))
+    while terms and terms[-1] in _OPERATORS:
+        terms.pop()
+    return ' '.join(terms)
+
+
+class SearchIndex(StoreListener):
+    """Inverted index over report text, admin comments and doubts (SQLite FTS5).
+
+    Attached to the report and doubt stores as a listener, so it is updated
+    in the same request as each write. Documents use the report/doubt ID as
+    their rowid, so updates touch a single row. Results are ranked with bm25 and
+    returned in the stores' own column layout.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        if conn.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA_VERSION:
+            conn.executescript(
+                'DROP TABLE IF EXISTS report_text; DROP TABLE IF EXISTS report_docs; '
+                'DROP TABLE IF EXISTS doubt_text; DROP TABLE IF EXISTS doubt_docs;'
+            )
+        conn.executescript(_SCHEMA + f'PRAGMA user_version = {_SCHEMA_VERSION};')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect_sqlite(self.path)
+        return conn
+
+    # -----------------------------
+    # Reports
+    # -----------------------------
+    def _insert_reports(self, conn, rows):
+        for row in rows:
+            report_id = int(row['ID'])
+            conn.execute(
+                'INSERT INTO report_docs (docid, timestamp, team, username, username_key) VALUES (?, ?, ?, ?, ?)',
+                (report_id, row['Timestamp'], row['Team'], row['GitLab Username'],
+                 normalize_username(row['GitLab Username'])),
+            )
+            conn.execute(
+                'INSERT INTO report_text (rowid, report, comment) VALUES (?, ?, ?)',
+                (report_id, row['Standup Report'], row['Comment']),
+            )
+
+    def reports_added(self, store, rows):
+        with self._conn() as conn:
+            self._insert_reports(conn, rows)
+
+    def comments_changed(self, store, comments):
+        with self._conn() as conn:
+            conn.executemany(
+                'UPDATE report_text SET comment = ? WHERE rowid = ?',
+                [(comment, int(report_id)) for report_id, comment in comments.items()],
+            )
+
+    @staticmethod
+    def _clear_reports(conn):
+        conn.execute('DELETE FROM report_text')
+        conn.execute('DELETE FROM report_docs')
+
+    def reports_cleared(self, store):
+        with self._conn() as conn:
+            self._clear_reports(conn)
+
+    def sync_reports(self, store):
+        """Rebuild the report index if it is out of step with `store` (first run, external edits)"""
+        if self._conn().execute('SELECT COUNT(*) FROM report_docs').fetchone()[0] == store.count_reports():
+            return False
+        with self._conn() as conn:
+            # Clear and refill in one transaction, so searches never see an empty index
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute('SELECT COUNT(*) FROM report_docs').fetchone()[0] == store.count_reports():
+                return False
+            self._clear_reports(conn)
+            self._insert_reports(conn, store.load_reports().to_dict('records'))
+        return True
+
+    def _report_filter(self, query, username=None, team=None):
+        clauses, params = ['report_text MATCH ?'], [to_match_query(query)]
+        if username:
+            clauses.append('instr(d.username_key, ?) > 0')
+            params.append(normalize_username(username))
+        if team:
+            clauses.append('d.team = ?')
+            params.append(team)
+        return ' AND '.join(clauses), params
+
+    def search_reports(self, query, username=None, team=None, limit=50, offset=0):
+        """Reports matching `query`, best match first"""
+        if not to_match_query(query):
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        where, params = self._report_filter(query, username, team)
+        sql = (
+            'SELECT d.docid AS "ID", d.timestamp AS "Timestamp", substr(d.timestamp, 1, 10) AS "Date", d.team AS "Team", '
+            'd.username AS "GitLab Username", t.report AS "Standup Report", t.comment AS "Comment" '
+            'FROM report_text t JOIN report_docs d ON d.docid = t.rowid '
+            f'WHERE {where} ORDER BY bm25(report_text, 1.0, 0.5), d.timestamp DESC LIMIT ? OFFSET ?'
+        )
+        return pd.read_sql_query(sql, self._conn(), params=params + [limit, offset])
+
+    def count_reports(self, query, username=None, team=None):
+        if not to_match_query(query):
+            return 0
+        where, params = self._report_filter(query, username, team)
+        sql = f'SELECT COUNT(*) FROM report_text t JOIN report_docs d ON d.docid = t.rowid WHERE {where}'
+        return self._conn().execute(sql, params).fetchone()[0]
+
+    # -----------------------------
+    # Doubts
+    # -----------------------------
+    def _insert_doubts(self, conn, rows, status):
+        for row in rows:
+            doubt_id = int(row['ID'])
+            conn.execute(
+                'INSERT INTO doubt_docs (docid, timestamp, name, phone, status) VALUES (?, ?, ?, ?, ?)',
+                (doubt_id, row['Timestamp'], row['Name'], row['Phone'], status),
+            )
+            conn.execute('INSERT INTO doubt_text (rowid, doubt) VALUES (?, ?)', (doubt_id, row['Doubt']))
+
+    def doubt_added(self, store, row):
+        with self._conn() as conn:
+            self._insert_doubts(conn, [row], 'active')
+
+    def doubts_resolved(self, store, rows):
+        with self._conn() as conn:
+            conn.executemany(
+                "UPDATE doubt_docs SET status = 'resolved' WHERE docid = ?", [(int(row['ID']),) for row in rows]
+            )
+
+    def resolved_doubts_cleared(self, store):
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM doubt_text WHERE rowid IN (SELECT docid FROM doubt_docs WHERE status = 'resolved')"
+            )
+            conn.execute("DELETE FROM doubt_docs WHERE status = 'resolved'")
+
+    def sync_doubts(self, store):
+        """Rebuild the doubt index if it is out of step with `store`"""
+        counts = dict(self._conn().execute('SELECT status, COUNT(*) FROM doubt_docs GROUP BY status').fetchall())
+        if counts.get('active', 0) == store.count_doubts('active') and \
+                counts.get('resolved', 0) == store.count_doubts('resolved'):
+            return False
+        active, resolved = store.load_doubts(), store.load_resolved()
+        with self._conn() as conn:
+            conn.execute('DELETE FROM doubt_text')
+            conn.execute('DELETE FROM doubt_docs')
+            self._insert_doubts(conn, active.to_dict('records'), 'active')
+            self._insert_doubts(conn, resolved.to_dict('records'), 'resolved')
+        return True
+
+    def search_doubts(self, query, limit=50):
+        """Active and resolved doubts matching `query`, best match first, with a Status column"""
+        if not to_match_query(query):
+            return pd.DataFrame(columns=DOUBT_COLUMNS + ['Status'])
+        sql = (
+            'SELECT d.docid AS "ID", d.timestamp AS "Timestamp", d.name AS "Name", d.phone AS "Phone", t.doubt AS "Doubt", '
+            'd.status AS "Status" FROM doubt_text t JOIN doubt_docs d ON d.docid = t.rowid '
+            'WHERE doubt_text MATCH ? ORDER BY bm25(doubt_text), d.timestamp DESC LIMIT ?'
+        )
+        return pd.read_sql_query(sql, self._conn(), params=[to_match_query(query), limit])
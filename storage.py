@@ -0,0 +1,1300 @@
+import csv
+import io
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+REPORT_COLUMNS = ['ID', 'Timestamp', 'Date', 'Team', 'GitLab Username', 'Standup Report', 'Comment']
+DOUBT_COLUMNS = ['ID', 'Timestamp', 'Name', 'Phone', 'Doubt']
+DOUBT_TRACKING_COLUMNS = ['Status', 'Assignee', 'Resolution Note', 'Resolved At']
+DOUBT_ACTIVE = 'active'
+DOUBT_RESOLVED = 'resolved'
+DEFAULT_COMMENT = 'Check back later to view comment 📝'
+DEFAULT_TEAM = 'Not Specified'
+
+logger = logging.getLogger(__name__)
+
+# Version of the report CSV layout; recorded next to the file in
+# "<csv>.version" once migrate_reports_csv() has brought it up to date.
+CSV_SCHEMA_VERSION = 2
+DOUBTS_SCHEMA_VERSION = 1
+
+
+class DuplicateReportError(Exception):
+    """Raised when a user already has a report for that date"""
+
+
+def normalize_username(username):
+    return str(username).strip().lower()
+
+
+def fill_legacy_columns(df):
+    """Add Date/Team/Comment columns missing from files written by older versions (schema 1)"""
+    if 'Date' not in df.columns:
+        try:
+            df['Date'] = pd.to_datetime(df['Timestamp']).dt.strftime('%Y-%m-%d')
+        except Exception:
+            df['Date'] = datetime.now().strftime('%Y-%m-%d')
+    if 'Team' not in df.columns:
+        df.insert(2, 'Team', DEFAULT_TEAM)
+    if 'Comment' not in df.columns:
+        df['Comment'] = DEFAULT_COMMENT
+    return df[[column for column in REPORT_COLUMNS if column in df.columns]]
+
+
+def add_row_ids(df):
+    """Number rows 1..n in file order as their stable ID (schema 2)"""
+    if 'ID' not in df.columns:
+        df.insert(0, 'ID', range(1, len(df) + 1))
+    return df
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on "<path>.lock", shared by threads and processes"""
+    with open(path + '.lock', 'a+') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _PendingWrite:
+    __slots__ = ('item', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GroupCommitter:
+    """Single writer thread that commits queued items in batches.
+
+    `flush(items)` is called with everything queued since the previous flush
+    (up to `max_batch`) and returns one result per item; an Exception in
+    that list is raised in the submitting thread only. During a burst of
+    submissions this turns N lock/fsync cycles into a handful.
+    """
+
+    def __init__(self, flush, max_batch=500):
+        self._flush = flush
+        self._max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='group-committer', daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        pending = _PendingWrite(item)
+        self._queue.put(pending)
+        self._ensure_thread()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def submit_many(self, items):
+        """Queue several items at once; returns their results in order, with
+        rejected items' exceptions in place instead of raised"""
+        pendings = [_PendingWrite(item) for item in items]
+        for pending in pendings:
+            self._queue.put(pending)
+        self._ensure_thread()
+        for pending in pendings:
+            pending.done.wait()
+        return [pending.error if pending.error is not None else pending.result for pending in pendings]
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self._flush([pending.item for pending in batch])
+                for pending, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        pending.error = result
+                    else:
+                        pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+
+def atomic_write(path, write, mode='w'):
+    """Call `write(file)` on a temp file next to `path`, fsync it and rename it into place.
+
+    `mode` is 'w' for UTF-8 text (newlines written as given) or 'wb' for
+    bytes. Readers see either the old file or the complete new one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    text = {} if 'b' in mode else {'newline': '', 'encoding': 'utf-8'}
+    try:
+        with os.fdopen(fd, mode, **text) as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_csv(df, path):
+    """Write `df` as CSV to `path` via atomic_write()"""
+    atomic_write(path, lambda file: df.to_csv(file, index=False))
+
+
+def _read_sequence(path):
+    try:
+        with open(path + '.seq', encoding='utf-8') as file:
+            return int(file.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def allocate_ids(path, count):
+    """Reserve `count` new IDs for the file at `path`; caller holds file_lock(path).
+
+    The last ID handed out is kept in "<path>.seq", so IDs only ever grow,
+    even across clears, and allocation never scans the data file.
+    """
+    last = _read_sequence(path)
+    with open(path + '.seq', 'w', encoding='utf-8') as file:
+        file.write(f"{last + count}\n")
+    return range(last + 1, last + count + 1)
+
+
+def _ids_to_int(df):
+    df['ID'] = pd.to_numeric(df['ID']).astype('int64')
+    return df
+
+
+def _read_schema_version(path):
+    try:
+        with open(path + '.version', encoding='utf-8') as file:
+            return int(file.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _write_schema_version(path, version):
+    with open(path + '.version', 'w', encoding='utf-8') as file:
+        file.write(f"{version}\n")
+
+
+# Each step upgrades the DataFrame from version N-1 to N in memory.
+_CSV_MIGRATIONS = {
+    1: fill_legacy_columns,
+    2: add_row_ids,
+}
+
+
+def upgrade_report_frame(df, version=0):
+    """Apply the in-memory migration steps after `version` to a report DataFrame"""
+    for step in range(version + 1, CSV_SCHEMA_VERSION + 1):
+        df = _CSV_MIGRATIONS[step](df)
+    return df[REPORT_COLUMNS]
+
+
+def migrate_reports_csv(path):
+    """Bring the report CSV up to CSV_SCHEMA_VERSION.
+
+    Meant to run once at startup: all pending steps are applied in memory and
+    the file is rewritten at most once, atomically. Returns the version the
+    file was at before migrating.
+    """
+    with file_lock(path):
+        return _migrate_reports_csv_locked(path)
+
+
+def _migrate_reports_csv_locked(path):
+    version = _read_schema_version(path)
+    if version >= CSV_SCHEMA_VERSION:
+        return version
+    if not os.path.exists(path):
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerow(REPORT_COLUMNS)
+    else:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        original_columns = list(df.columns)
+        df = upgrade_report_frame(df, version)
+        if list(df.columns) != original_columns:
+            atomic_write_csv(df, path)
+        last_id = int(pd.to_numeric(df['ID']).max()) if len(df) else 0
+        if _read_sequence(path) < last_id:
+            allocate_ids(path, last_id - _read_sequence(path))
+    _write_schema_version(path, CSV_SCHEMA_VERSION)
+    return version
+
+
+def migrate_doubts_csv(path, resolved_path):
+    """Give active and resolved doubts IDs from one shared sequence (doubts schema 1)"""
+    with file_lock(path):
+        version = _read_schema_version(path)
+        if version >= DOUBTS_SCHEMA_VERSION:
+            return version
+        frames = {}
+        for file_path in (path, resolved_path):
+            if os.path.exists(file_path):
+                frames[file_path] = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+            else:
+                frames[file_path] = pd.DataFrame(columns=[c for c in DOUBT_COLUMNS if c != 'ID'])
+        for file_path, df in frames.items():
+            if 'ID' not in df.columns:
+                df.insert(0, 'ID', list(allocate_ids(path, len(df))))
+                atomic_write_csv(df[DOUBT_COLUMNS], file_path)
+        _write_schema_version(path, DOUBTS_SCHEMA_VERSION)
+        return version
+
+
+class StoreListener:
+    """Hooks a store calls after a write has been committed.
+
+    Derived indexes (search, rollups, ...) subclass this and override what
+    they need; a failing listener is logged and never fails the write.
+    """
+
+    def reports_added(self, store, rows):
+        pass
+
+    def comments_changed(self, store, comments):
+        pass
+
+    def reports_cleared(self, store):
+        pass
+
+    def doubt_added(self, store, row):
+        pass
+
+    def doubts_resolved(self, store, rows):
+        pass
+
+    def resolved_doubts_cleared(self, store):
+        pass
+
+
+class _Observable:
+    listeners = ()
+
+    def add_listener(self, listener):
+        self.listeners = (*self.listeners, listener)
+        return listener
+
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(self, *args)
+            except Exception:
+                logger.exception("%s failed handling %s", type(listener).__name__, event)
+
+
+def filter_reports(df, username=None, team=None, start_date=None, end_date=None):
+    """Rows of a report DataFrame matching a username substring, exact team and inclusive date range"""
+    if username:
+        df = df[df['GitLab Username'].astype(str).str.lower().str.contains(normalize_username(username), regex=False)]
+    if team:
+        df = df[df['Team'] == team]
+    if start_date:
+        df = df[df['Date'] >= start_date]
+    if end_date:
+        df = df[df['Date'] <= end_date]
+    return df
+
+
+class ReportStore(_Observable):
+    """Interface shared by the report storage backends.
+
+    Rows are addressed by their integer ID, which is assigned on append and
+    never reused. Timestamps are the same "%Y-%m-%d %H:%M:%S" strings that
+    appear in the CSV, so the UI does not care which backend it talks to.
+    Backends implement the underscored write primitives; the public write
+    methods add listener notification on top.
+    """
+
+    def load_reports(self):
+        raise NotImplementedError
+
+    def has_submitted(self, username, date):
+        raise NotImplementedError
+
+    @staticmethod
+    def _new_row(username, team, report, timestamp=None):
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return {
+            'ID': None,
+            'Timestamp': timestamp,
+            'Date': timestamp[:10],
+            'Team': team,
+            'GitLab Username': username,
+            'Standup Report': report,
+            'Comment': DEFAULT_COMMENT,
+        }
+
+    def add_report(self, username, team, report, timestamp=None):
+        """Append a report; raises DuplicateReportError if the user already has one that day"""
+        row = self._new_row(username, team, report, timestamp)
+        row['ID'] = self._append(row)
+        self._notify('reports_added', [row])
+        return row
+
+    def add_reports(self, reports, timestamp=None):
+        """Append (username, team, report) tuples in as few writes as possible.
+
+        Returns one entry per input: the stored row, or the
+        DuplicateReportError that rejected it.
+        """
+        rows = [self._new_row(username, team, report, timestamp) for username, team, report in reports]
+        results = self._append_many(rows)
+        for row, result in zip(rows, results):
+            if not isinstance(result, Exception):
+                row['ID'] = result
+        added = [row for row in rows if row['ID'] is not None]
+        if added:
+            self._notify('reports_added', added)
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, DuplicateReportError):
+                raise result
+        return [result if isinstance(result, Exception) else row for row, result in zip(rows, results)]
+
+    def set_comment(self, report_id, comment):
+        self.set_comments({report_id: comment})
+
+    def set_comments(self, comments):
+        """Save several {report ID: comment} edits in a single write"""
+        self._update_comments(comments)
+        self._notify('comments_changed', comments)
+
+    def clear(self):
+        self._clear()
+        self._notify('reports_cleared')
+
+    def evict(self, before_date, sink):
+        """Move reports dated before `before_date` (all of them if None) out of the store.
+
+        The rows are passed to `sink(df)` under the write lock and removed only
+        once it returns, so `sink` must be safe to repeat. Listeners are not
+        notified: the rows still exist, just somewhere else. Returns the
+        number of rows moved.
+        """
+        raise NotImplementedError
+
+    def _append(self, row):
+        """Persist `row` and return its new ID"""
+        raise NotImplementedError
+
+    def _append_many(self, rows):
+        """Persist `rows`; returns each new ID, or the DuplicateReportError that rejected the row"""
+        results = []
+        for row in rows:
+            try:
+                results.append(self._append(row))
+            except DuplicateReportError as e:
+                results.append(e)
+        return results
+
+    def _update_comments(self, comments):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+    def user_reports(self, username):
+        raise NotImplementedError
+
+    def reports_since(self, report_id):
+        """Reports with an ID above `report_id`, in ID order"""
+        df = self.load_reports()
+        return df.iloc[df['ID'].searchsorted(report_id, side='right'):]
+
+    def data_version(self):
+        """(generation, max ID): the generation changes whenever rows were removed
+        or rewritten, so a derived index can tell an append from a rebuild"""
+        raise NotImplementedError
+
+    def get_report(self, report_id):
+        """The report with this ID as a dict, or None"""
+        df = self.load_reports()
+        if report_id not in df.index:
+            return None
+        return df.loc[report_id].to_dict()
+
+    def _filtered(self, username=None, team=None):
+        return filter_reports(self.load_reports(), username, team)
+
+    def query_reports(self, username=None, team=None, newest_first=True, limit=None, offset=0):
+        """One page of reports, optionally filtered by username substring and exact team"""
+        df = self._filtered(username, team).sort_values('Timestamp', ascending=not newest_first, kind='stable')
+        end = None if limit is None else offset + limit
+        return df.iloc[offset:end]
+
+    def count_reports(self, username=None, team=None):
+        return len(self._filtered(username, team))
+
+    def team_counts(self):
+        """Number of reports per team, largest first"""
+        return self.load_reports()['Team'].value_counts()
+
+    def cache_stats(self):
+        """Hit/miss counters of the cached report loader"""
+        return dict(self._loader_stats)
+
+    def iter_reports(self, start_date=None, end_date=None, team=None, username=None, chunk_size=5000):
+        """Yield the matching reports oldest first as DataFrames of at most `chunk_size` rows.
+
+        Dates are inclusive "%Y-%m-%d" bounds; `username` and `team` filter
+        like query_reports().
+        """
+        df = filter_reports(self.load_reports(), username, team, start_date, end_date)
+        df = df.sort_values('Timestamp', kind='stable')
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+# -----------------------------
+# CSV backend
+# -----------------------------
+def _complete_records_length(data):
+    """Length of the prefix of `data` that ends on a CSV record boundary.
+
+    A newline only ends a record when it is outside a quoted field, i.e. when
+    the number of quote characters seen so far is even ("" escapes keep the
+    parity). Anything after the last boundary is a partially written row.
+    """
+    end = 0
+    quotes = 0
+    pos = 0
+    for line in data.splitlines(keepends=True):
+        pos += len(line)
+        quotes += line.count(b'"')
+        if line.endswith(b'\n') and quotes % 2 == 0:
+            end = pos
+    return end
+
+
+class CsvTail:
+    """Follows an append-only CSV file, parsing only the bytes added since the last poll.
+
+    A rewrite (atomic replace, truncation or an in-place rewrite) is detected
+    from the inode, the size and a fingerprint of the bytes just before the
+    last offset; in that case the whole file is parsed again.
+    """
+
+    _MARK_SIZE = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.offset = 0
+        self._inode = None
+        self._mtime = None
+        self._mark = b''
+
+    def column(self, name):
+        return self.header.index(name) if self.header and name in self.header else None
+
+    def _unchanged_prefix(self, file, stat):
+        if stat.st_ino != self._inode or stat.st_size < self.offset:
+            return False
+        if stat.st_size == self.offset:
+            return stat.st_mtime_ns == self._mtime
+        file.seek(self.offset - len(self._mark))
+        return file.read(len(self._mark)) == self._mark
+
+    def poll(self):
+        """Return (rewritten, rows): rows are the records added since the last poll,
+        or every record in the file when `rewritten` is True."""
+        try:
+            file = open(self.path, 'rb')
+        except FileNotFoundError:
+            rewritten = self.offset > 0 or self.header is not None
+            self.reset()
+            return rewritten, []
+        with file:
+            stat = os.fstat(file.fileno())
+            rewritten = False
+            if self.header is None or not self._unchanged_prefix(file, stat):
+                rewritten = self.header is not None
+                self.reset()
+            if stat.st_size == self.offset:
+                return rewritten, []
+            file.seek(self.offset)
+            data = file.read(stat.st_size - self.offset)
+            end = _complete_records_length(data)
+            if end == 0:
+                return rewritten, []
+            rows = list(csv.reader(io.StringIO(data[:end].decode('utf-8'), newline='')))
+            if self.header is None and rows:
+                self.header = rows.pop(0)
+            self.offset += end
+            self._inode = stat.st_ino
+            self._mtime = stat.st_mtime_ns
+            file.seek(max(0, self.offset - self._MARK_SIZE))
+            self._mark = file.read(min(self.offset, self._MARK_SIZE))
+            return rewritten, rows
+
+
+class SubmissionIndex:
+    """Process-wide set of normalized (username, date) pairs for a report CSV.
+
+    Built once, then kept current by tailing rows appended by this or any
+    other process, so a lookup costs one stat() plus a set probe.
+    """
+
+    def __init__(self, path):
+        self._tail = CsvTail(path)
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        rewritten, rows = self._tail.poll()
+        if rewritten:
+            self._keys = set()
+        if not rows:
+            return
+        user_col = self._tail.column('GitLab Username')
+        date_col = self._tail.column('Date')
+        time_col = self._tail.column('Timestamp')
+        for row in rows:
+            if len(row) != len(self._tail.header):
+                continue
+            date = row[date_col] if date_col is not None else row[time_col][:10]
+            self._keys.add((normalize_username(row[user_col]), date))
+
+    def contains(self, username, date):
+        with self._lock:
+            self._refresh()
+            return (normalize_username(username), date) in self._keys
+
+    def add(self, username, date):
+        with self._lock:
+            self._keys.add((normalize_username(username), date))
+
+
+def _new_loader_stats():
+    # hits: nothing changed; tail_reads: only appended rows were parsed;
+    # misses: full reload (first load or after a rewrite)
+    return {'hits': 0, 'tail_reads': 0, 'misses': 0}
+
+
+def _rows_to_frame(rows, header):
+    df = pd.DataFrame([row for row in rows if len(row) == len(header)], columns=header)
+    if not set(REPORT_COLUMNS) <= set(header):
+        # Not migrated yet (e.g. an old file copied in while running); fill in
+        # memory only, the file itself is only rewritten by migrate_reports_csv()
+        df = upgrade_report_frame(df)
+    df = _ids_to_int(df[REPORT_COLUMNS])
+    # Index by ID so get_report() is a hash lookup
+    df.index = pd.Index(df['ID'].to_numpy())
+    return df
+
+
+class CsvReportStore(ReportStore):
+    """The original single-file layout.
+
+    load_reports() keeps the parsed table and the byte offset it was read up
+    to, so a rerun only parses rows appended since the previous one; the
+    returned DataFrame is shared and must be treated as read-only.
+
+    Every write holds file_lock(path). Appends are group-committed and
+    rewrites (comments, clear) go through a temp file + rename, so readers
+    never see a truncated file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.submissions = SubmissionIndex(path)
+        self._tail = CsvTail(path)
+        self._frame = None
+        self._frame_lock = threading.Lock()
+        self._loader_stats = _new_loader_stats()
+        self._team_counts = Counter()
+        self._generation = 0
+        self._appender = GroupCommitter(self._append_batch)
+
+    def _append_batch(self, rows):
+        results = []
+        with file_lock(self.path):
+            accepted = []
+            batch_keys = set()
+            for position, row in enumerate(rows):
+                username, date = row['GitLab Username'], row['Date']
+                key = (normalize_username(username), date)
+                if key in batch_keys or self.submissions.contains(username, date):
+                    results.append(DuplicateReportError(f"{username} already submitted a report for {date}"))
+                    continue
+                batch_keys.add(key)
+                accepted.append(position)
+                results.append(None)
+            ids = allocate_ids(self.path, len(accepted))
+            with open(self.path, 'a', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                for position, report_id in zip(accepted, ids):
+                    row = dict(rows[position], ID=report_id)
+                    writer.writerow([row[column] for column in REPORT_COLUMNS])
+                    results[position] = report_id
+                file.flush()
+                os.fsync(file.fileno())
+            for username, date in batch_keys:
+                self.submissions.add(username, date)
+        return results
+
+    def _rewrite(self, update):
+        """Apply `update(df)` to the whole file under the lock and swap it in atomically"""
+        with file_lock(self.path):
+            df = _ids_to_int(pd.read_csv(self.path, dtype=str, keep_default_na=False))
+            atomic_write_csv(update(df), self.path)
+
+    def load_reports(self):
+        with self._frame_lock:
+            rewritten, rows = self._tail.poll()
+            header = self._tail.header
+            if header is None:
+                self._loader_stats['misses'] += 1
+                self._generation += 1
+                self._frame = pd.DataFrame(columns=REPORT_COLUMNS)
+                self._team_counts = Counter()
+            elif self._frame is None or rewritten:
+                self._loader_stats['misses'] += 1
+                self._generation += 1
+                self._frame = _rows_to_frame(rows, header)
+                self._team_counts = Counter(self._frame['Team'])
+            elif rows:
+                self._loader_stats['tail_reads'] += 1
+                new_rows = _rows_to_frame(rows, header)
+                self._frame = pd.concat([self._frame, new_rows])
+                self._team_counts.update(new_rows['Team'])
+            else:
+                self._loader_stats['hits'] += 1
+            return self._frame
+
+    def data_version(self):
+        df = self.load_reports()
+        return self._generation, int(df['ID'].iloc[-1]) if len(df) else 0
+
+    def team_counts(self):
+        self.load_reports()
+        with self._frame_lock:
+            counts = dict(self._team_counts.most_common())
+        return pd.Series(counts, name='count', dtype='int64')
+
+    def has_submitted(self, username, date):
+        return self.submissions.contains(username, date)
+
+    def _append(self, row):
+        return self._appender.submit(row)
+
+    def _append_many(self, rows):
+        return self._appender.submit_many(rows)
+
+    def _update_comments(self, comments):
+        def update(df):
+            matched = df['ID'].isin(comments.keys())
+            df.loc[matched, 'Comment'] = df.loc[matched, 'ID'].map(comments)
+            return df
+        self._rewrite(update)
+
+    def user_reports(self, username):
+        df = self.load_reports()
+        if df.empty:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        return df[
+            df['GitLab Username'].astype(str).str.strip().str.lower() == normalize_username(username)
+        ].sort_values('Timestamp', ascending=False)
+
+    def _clear(self):
+        self._rewrite(lambda df: df.iloc[0:0])
+
+    def evict(self, before_date, sink):
+        df = self.load_reports()
+        if df.empty or (before_date is not None and not (df['Date'] < before_date).any()):
+            return 0
+        evicted = 0
+
+        def update(df):
+            nonlocal evicted
+            moved = df['Date'] < before_date if before_date is not None else pd.Series(True, index=df.index)
+            evicted = int(moved.sum())
+            if evicted:
+                sink(df[moved])
+            return df[~moved]
+        self._rewrite(update)
+        return evicted
+
+
+# -----------------------------
+# SQLite backend
+# -----------------------------
+def connect_sqlite(path, timeout=30):
+    """Open a connection in WAL mode; callers keep one per thread"""
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            break
+        except sqlite3.OperationalError as e:
+            # Switching a new file to WAL needs it to itself and fails at once,
+            # without the busy timeout, while another process is doing the same
+            if 'locked' not in str(e) or time.monotonic() > deadline:
+                conn.close()
+                raise
+            time.sleep(0.01)
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def _ever_written(conn, table):
+    """Whether the AUTOINCREMENT `table` has ever held a row.
+
+    Its sqlite_sequence row survives deletes, so a store emptied by a clear
+    is not mistaken for a new one.
+    """
+    return conn.execute('SELECT 1 FROM sqlite_sequence WHERE name = ?', (table,)).fetchone() is not None
+
+
+# Schema steps applied in order; PRAGMA user_version records how many ran.
+_SQLITE_MIGRATIONS = [
+    """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    date TEXT NOT NULL,
+    team TEXT NOT NULL,
+    username TEXT NOT NULL,
+    username_key TEXT NOT NULL,
+    report TEXT NOT NULL,
+    comment TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_user_date ON reports (username_key, date);
+CREATE INDEX IF NOT EXISTS idx_reports_team ON reports (team);
+CREATE INDEX IF NOT EXISTS idx_reports_timestamp ON reports (timestamp);
+
+-- Bumped whenever existing rows change, so cached reads can tell a pure
+-- append (only ids above the cached maximum are new) from a rewrite.
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('revision', 0);
+CREATE TRIGGER IF NOT EXISTS reports_revision_update AFTER UPDATE ON reports
+BEGIN
+    UPDATE store_meta SET value = value + 1 WHERE key = 'revision';
+END;
+CREATE TRIGGER IF NOT EXISTS reports_revision_delete AFTER DELETE ON reports
+BEGIN
+    UPDATE store_meta SET value = value + 1 WHERE key = 'revision';
+END;
+""",
+    # Per-team report counts kept up to date by triggers, so the admin team
+    # statistics never scan the reports table.
+    """
+CREATE TABLE IF NOT EXISTS team_counts (team TEXT PRIMARY KEY, reports INTEGER NOT NULL);
+INSERT OR REPLACE INTO team_counts (team, reports) SELECT team, COUNT(*) FROM reports GROUP BY team;
+CREATE TRIGGER IF NOT EXISTS team_counts_insert AFTER INSERT ON reports
+BEGIN
+    INSERT INTO team_counts (team, reports) VALUES (NEW.team, 1)
+    ON CONFLICT (team) DO UPDATE SET reports = reports + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS team_counts_delete AFTER DELETE ON reports
+BEGIN
+    UPDATE team_counts SET reports = reports - 1 WHERE team = OLD.team;
+END;
+CREATE TRIGGER IF NOT EXISTS team_counts_update AFTER UPDATE OF team ON reports
+BEGIN
+    UPDATE team_counts SET reports = reports - 1 WHERE team = OLD.team;
+    INSERT INTO team_counts (team, reports) VALUES (NEW.team, 1)
+    ON CONFLICT (team) DO UPDATE SET reports = reports + 1;
+END;
+""",
+    # Deletions only (comment edits leave it alone), for data_version()
+    """
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('deletions', 0);
+CREATE TRIGGER IF NOT EXISTS reports_deletions AFTER DELETE ON reports
+BEGIN
+    UPDATE store_meta SET value = value + 1 WHERE key = 'deletions';
+END;
+""",
+]
+
+# SQL column -> CSV column, in CSV order
+_COLUMN_MAP = [
+    ('id', 'ID'),
+    ('timestamp', 'Timestamp'),
+    ('date', 'Date'),
+    ('team', 'Team'),
+    ('username', 'GitLab Username'),
+    ('report', 'Standup Report'),
+    ('comment', 'Comment'),
+]
+_SELECT_COLUMNS = ', '.join(f'{sql} AS "{name}"' for sql, name in _COLUMN_MAP)
+
+
+class SqliteReportStore(ReportStore):
+    """Indexed SQLite store in WAL mode.
+
+    Each thread gets its own connection (Streamlit serves sessions from a
+    thread pool); WAL lets readers proceed while a submission is written.
+    If `legacy_csv` exists and the database has never held a report, its
+    rows are imported once, so switching backends keeps the history.
+
+    load_reports() caches the table keyed on (revision, max id) and only
+    fetches new ids when rows were appended; the returned DataFrame is
+    shared and must be treated as read-only.
+    """
+
+    def __init__(self, path, legacy_csv=None):
+        self.path = path
+        self._local = threading.local()
+        self._frame = None
+        self._frame_key = None
+        self._frame_lock = threading.Lock()
+        self._loader_stats = _new_loader_stats()
+        self._appender = GroupCommitter(self._insert_batch)
+        self._migrate()
+        if legacy_csv and os.path.exists(legacy_csv):
+            self._import_csv(legacy_csv)
+
+    def _migrate(self):
+        conn = self._conn()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target in range(version + 1, len(_SQLITE_MIGRATIONS) + 1):
+            # Every step is idempotent, so a process that read the old version
+            # just before another one migrated can safely repeat it
+            conn.executescript(
+                f"BEGIN IMMEDIATE;\n{_SQLITE_MIGRATIONS[target - 1]}\nPRAGMA user_version = {target};\nCOMMIT;"
+            )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect_sqlite(self.path)
+        return conn
+
+    def _import_csv(self, csv_path):
+        """Copy the legacy CSV in with its IDs, unless the table has ever held a report"""
+        if _ever_written(self._conn(), 'reports'):
+            return
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        if df.empty:
+            return
+        df = upgrade_report_frame(df)
+        rows = [
+            (int(r[0]), r[1], r[2], r[3], r[4], normalize_username(r[4]), r[5], r[6])
+            for r in df.itertuples(index=False, name=None)
+        ]
+        with self._conn() as conn:
+            # Another process may be opening the new database at the same
+            # time; decide under the write lock which one imports
+            conn.execute('BEGIN IMMEDIATE')
+            if _ever_written(conn, 'reports'):
+                return
+            conn.executemany(
+                'INSERT INTO reports (id, timestamp, date, team, username, username_key, report, comment) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+
+    def _query_df(self, where='', params=(), order='timestamp ASC, id ASC'):
+        sql = f'SELECT {_SELECT_COLUMNS} FROM reports {where} ORDER BY {order}'
+        df = pd.read_sql_query(sql, self._conn(), params=params)
+        return df if not df.empty else pd.DataFrame(columns=REPORT_COLUMNS)
+
+    def load_reports(self):
+        with self._frame_lock:
+            conn = self._conn()
+            revision, max_id = conn.execute(
+                "SELECT (SELECT value FROM store_meta WHERE key = 'revision'), "
+                "(SELECT COALESCE(MAX(id), 0) FROM reports)"
+            ).fetchone()
+            cached = self._frame_key
+            if cached is None or cached[0] != revision or max_id < cached[1]:
+                self._loader_stats['misses'] += 1
+                self._frame = self._query_df('WHERE id <= ?', (max_id,))
+                self._frame.index = pd.Index(self._frame['ID'].to_numpy())
+            elif max_id > cached[1]:
+                self._loader_stats['tail_reads'] += 1
+                new_rows = self._query_df('WHERE id > ? AND id <= ?', (cached[1], max_id), order='id ASC')
+                new_rows.index = pd.Index(new_rows['ID'].to_numpy())
+                self._frame = pd.concat([self._frame, new_rows])
+            else:
+                self._loader_stats['hits'] += 1
+            self._frame_key = (revision, max_id)
+            return self._frame
+
+    def has_submitted(self, username, date):
+        row = self._conn().execute(
+            'SELECT 1 FROM reports WHERE username_key = ? AND date = ? LIMIT 1',
+            (normalize_username(username), date),
+        ).fetchone()
+        return row is not None
+
+    def _insert_batch(self, rows):
+        results = []
+        with self._conn() as conn:
+            # Take the write lock before the one-per-day checks, so another
+            # process cannot insert the same user and day in between
+            conn.execute('BEGIN IMMEDIATE')
+            for row in rows:
+                username_key, date = row[4], row[1]
+                exists = conn.execute(
+                    'SELECT 1 FROM reports WHERE username_key = ? AND date = ? LIMIT 1', (username_key, date)
+                ).fetchone()
+                if exists:
+                    results.append(DuplicateReportError(f"{row[3]} already submitted a report for {date}"))
+                    continue
+                cursor = conn.execute(
+                    'INSERT INTO reports (timestamp, date, team, username, username_key, report, comment) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    row,
+                )
+                results.append(cursor.lastrowid)
+        return results
+
+    @staticmethod
+    def _insert_params(row):
+        username = row['GitLab Username']
+        return (
+            row['Timestamp'], row['Date'], row['Team'], username, normalize_username(username),
+            row['Standup Report'], row['Comment'],
+        )
+
+    def _append(self, row):
+        return self._appender.submit(self._insert_params(row))
+
+    def _append_many(self, rows):
+        return self._appender.submit_many([self._insert_params(row) for row in rows])
+
+    def _update_comments(self, comments):
+        with self._conn() as conn:
+            conn.executemany(
+                'UPDATE reports SET comment = ? WHERE id = ?',
+                [(comment, int(report_id)) for report_id, comment in comments.items()],
+            )
+
+    def user_reports(self, username):
+        return self._query_df(
+            'WHERE username_key = ?', (normalize_username(username),), order='timestamp DESC, id DESC'
+        )
+
+    def reports_since(self, report_id):
+        return self._query_df('WHERE id > ?', (int(report_id),), order='id ASC')
+
+    def data_version(self):
+        return self._conn().execute(
+            "SELECT (SELECT value FROM store_meta WHERE key = 'deletions'), "
+            "(SELECT COALESCE(MAX(id), 0) FROM reports)"
+        ).fetchone()
+
+    def get_report(self, report_id):
+        df = self._query_df('WHERE id = ?', (int(report_id),))
+        return df.iloc[0].to_dict() if len(df) else None
+
+    def _filter_sql(self, username=None, team=None):
+        clauses, params = [], []
+        if username:
+            clauses.append('instr(username_key, ?) > 0')
+            params.append(normalize_username(username))
+        if team:
+            clauses.append('team = ?')
+            params.append(team)
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query_reports(self, username=None, team=None, newest_first=True, limit=None, offset=0):
+        where, params = self._filter_sql(username, team)
+        direction = 'DESC' if newest_first else 'ASC'
+        order = f'timestamp {direction}, id {direction}'
+        if limit is not None:
+            order += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        return self._query_df(where, params, order=order)
+
+    def count_reports(self, username=None, team=None):
+        where, params = self._filter_sql(username, team)
+        return self._conn().execute(f'SELECT COUNT(*) FROM reports {where}', params).fetchone()[0]
+
+    def team_counts(self):
+        rows = self._conn().execute(
+            'SELECT team, reports FROM team_counts WHERE reports > 0 ORDER BY reports DESC, team'
+        ).fetchall()
+        return pd.Series(dict(rows), name='count', dtype='int64')
+
+    def _clear(self):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM reports')
+
+    def evict(self, before_date, sink):
+        where, params = ('WHERE timestamp < ?', (before_date,)) if before_date is not None else ('', ())
+        with self._conn() as conn:
+            # Take the write lock up front so nothing lands between read and delete
+            conn.execute('BEGIN IMMEDIATE')
+            rows = self._query_df(where, params)
+            if not rows.empty:
+                sink(rows)
+                conn.execute(f'DELETE FROM reports {where}', params)
+        return len(rows)
+
+    def iter_reports(self, start_date=None, end_date=None, team=None, username=None, chunk_size=5000):
+        # Stream straight off a cursor so an export never holds the whole table
+        where, params = self._filter_sql(username, team)
+        clauses = [where[len('WHERE '):]] if where else []
+        if start_date:
+            clauses.append('timestamp >= ?')
+            params.append(start_date)
+        if end_date:
+            clauses.append('timestamp <= ?')
+            params.append(f'{end_date} 23:59:59')
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        cursor = self._conn().cursor()
+        cursor.execute(f'SELECT {_SELECT_COLUMNS} FROM reports {where} ORDER BY timestamp ASC, id ASC', params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=REPORT_COLUMNS)
+        finally:
+            cursor.close()
+
+
+# -----------------------------
+# Doubts
+# -----------------------------
+# One table replaces the old active/resolved CSV pair; resolving flips `status`.
+_DOUBT_MIGRATIONS = [
+    """
+CREATE TABLE IF NOT EXISTS doubts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    doubt TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active',
+    assignee TEXT NOT NULL DEFAULT '',
+    resolution_note TEXT NOT NULL DEFAULT '',
+    resolved_at TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_doubts_status_timestamp ON doubts (status, timestamp);
+""",
+]
+
+_DOUBT_COLUMN_MAP = [
+    ('id', 'ID'),
+    ('timestamp', 'Timestamp'),
+    ('name', 'Name'),
+    ('phone', 'Phone'),
+    ('doubt', 'Doubt'),
+    ('status', 'Status'),
+    ('assignee', 'Assignee'),
+    ('resolution_note', 'Resolution Note'),
+    ('resolved_at', 'Resolved At'),
+]
+_DOUBT_SELECT = ', '.join(f'{sql} AS "{name}"' for sql, name in _DOUBT_COLUMN_MAP)
+
+
+class SqliteDoubtStore(_Observable):
+    """Active and resolved doubts in one SQLite table with a status column.
+
+    Doubts are indexed by (status, timestamp), so listing a page of either
+    status and resolving one doubt are single indexed statements whatever
+    the size of the backlog. Resolving records who handled the doubt and a
+    note. If the table has never held a doubt, the legacy
+    doubts.csv/resolved_doubts.csv pair is imported once with its IDs.
+    """
+
+    def __init__(self, path, legacy_csv=None, legacy_resolved_csv=None):
+        self.path = path
+        self._local = threading.local()
+        self._migrate()
+        if legacy_csv and legacy_resolved_csv and (os.path.exists(legacy_csv) or os.path.exists(legacy_resolved_csv)):
+            self._import_csv(legacy_csv, legacy_resolved_csv)
+
+    def _migrate(self):
+        conn = self._conn()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target in range(version + 1, len(_DOUBT_MIGRATIONS) + 1):
+            # Idempotent steps, as for reports: another process may repeat them
+            conn.executescript(
+                f"BEGIN IMMEDIATE;\n{_DOUBT_MIGRATIONS[target - 1]}\nPRAGMA user_version = {target};\nCOMMIT;"
+            )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect_sqlite(self.path)
+        return conn
+
+    def _import_csv(self, csv_path, resolved_path):
+        """Copy both legacy CSVs in with their IDs, unless the table has ever held a doubt"""
+        if _ever_written(self._conn(), 'doubts'):
+            return
+        migrate_doubts_csv(csv_path, resolved_path)
+        rows = []
+        for file_path, status in ((csv_path, DOUBT_ACTIVE), (resolved_path, DOUBT_RESOLVED)):
+            if os.path.exists(file_path):
+                df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+                rows += [(int(r[0]), r[1], r[2], r[3], r[4], status) for r in df[DOUBT_COLUMNS].itertuples(index=False, name=None)]
+        with self._conn() as conn:
+            # Another process may have opened the new database at the same time
+            conn.execute('BEGIN IMMEDIATE')
+            if not _ever_written(conn, 'doubts'):
+                conn.executemany(
+                    'INSERT OR IGNORE INTO doubts (id, timestamp, name, phone, doubt, status) VALUES (?, ?, ?, ?, ?, ?)',
+                    rows,
+                )
+
+    def _query_df(self, where='', params=(), order='timestamp DESC, id DESC'):
+        sql = f'SELECT {_DOUBT_SELECT} FROM doubts {where} ORDER BY {order}'
+        df = pd.read_sql_query(sql, self._conn(), params=params)
+        return df if not df.empty else pd.DataFrame(columns=DOUBT_COLUMNS + DOUBT_TRACKING_COLUMNS)
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def add_doubt(self, name, phone, doubt):
+        return self.add_doubts([(name, phone, doubt)])[0]
+
+    def add_doubts(self, doubts):
+        """Insert (name, phone, doubt) tuples in one transaction; returns the stored rows"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        with self._conn() as conn:
+            for name, phone, doubt in doubts:
+                cursor = conn.execute(
+                    'INSERT INTO doubts (timestamp, name, phone, doubt) VALUES (?, ?, ?, ?)',
+                    (timestamp, name, phone, doubt),
+                )
+                rows.append({'ID': cursor.lastrowid, 'Timestamp': timestamp, 'Name': name, 'Phone': phone,
+                             'Doubt': doubt, 'Status': DOUBT_ACTIVE, 'Assignee': '', 'Resolution Note': '',
+                             'Resolved At': ''})
+        for row in rows:
+            self._notify('doubt_added', row)
+        return rows
+
+    def assign(self, doubt_id, assignee):
+        """Set who is handling an active doubt; False if it is not active"""
+        with self._conn() as conn:
+            cursor = conn.execute(
+                'UPDATE doubts SET assignee = ? WHERE id = ? AND status = ?', (assignee, int(doubt_id), DOUBT_ACTIVE)
+            )
+        return cursor.rowcount > 0
+
+    def resolve(self, doubt_id, assignee=None, note=''):
+        """Mark an active doubt resolved; False if there is no such active doubt.
+
+        `assignee` replaces the current one when given.
+        """
+        resolved_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._conn() as conn:
+            cursor = conn.execute(
+                'UPDATE doubts SET status = ?, assignee = COALESCE(?, assignee), resolution_note = ?, resolved_at = ? '
+                'WHERE id = ? AND status = ?',
+                (DOUBT_RESOLVED, assignee or None, note, resolved_at, int(doubt_id), DOUBT_ACTIVE),
+            )
+        if not cursor.rowcount:
+            return False
+        self._notify('doubts_resolved', [self.get_doubt(doubt_id)])
+        return True
+
+    def clear_resolved(self):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM doubts WHERE status = ?', (DOUBT_RESOLVED,))
+        self._notify('resolved_doubts_cleared')
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def get_doubt(self, doubt_id):
+        df = self._query_df('WHERE id = ?', (int(doubt_id),))
+        return df.iloc[0].to_dict() if len(df) else None
+
+    def query_doubts(self, status=None, newest_first=True, limit=None, offset=0):
+        """One page of doubts with the given status (all if None)"""
+        where, params = ('WHERE status = ?', [status]) if status else ('', [])
+        direction = 'DESC' if newest_first else 'ASC'
+        order = f'timestamp {direction}, id {direction}'
+        if limit is not None:
+            order += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        return self._query_df(where, params, order=order)
+
+    def count_doubts(self, status=None):
+        where, params = ('WHERE status = ?', (status,)) if status else ('', ())
+        return self._conn().execute(f'SELECT COUNT(*) FROM doubts {where}', params).fetchone()[0]
+
+    def load_doubts(self):
+        """Every active doubt, newest first"""
+        return self.query_doubts(DOUBT_ACTIVE)
+
+    def load_resolved(self):
+        """Every resolved doubt, newest first"""
+        return self.query_doubts(DOUBT_RESOLVED)
+
+    def export_resolved(self, chunk_size=5000):
+        """The resolved doubts as CSV bytes, read off a cursor in chunks"""
+        buffer = io.StringIO()
+        columns = DOUBT_COLUMNS + DOUBT_TRACKING_COLUMNS
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        cursor = self._conn().cursor()
+        cursor.execute(
+            f'SELECT {_DOUBT_SELECT} FROM doubts WHERE status = ? ORDER BY timestamp ASC, id ASC', (DOUBT_RESOLVED,)
+        )
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+        finally:
+            cursor.close()
+        return buffer.getvalue().encode('utf-8')
+
+
+def open_report_store(backend, csv_file, db_file):
+    """Build the configured backend ("sqlite" or "csv")"""
+    if backend == 'csv':
+        migrate_reports_csv(csv_file)
+        return CsvReportStore(csv_file)
+    if backend == 'sqlite':
+        return SqliteReportStore(db_file, legacy_csv=csv_file)
+    raise ValueError(f"Unknown storage backend: {backend}")
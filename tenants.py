@@ -0,0 +1,150 @@
+import logging
+import os
+import re
+import threading
+import tomllib
+
+from auth import is_password_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEAMS = [f"Team {i}" for i in range(1, 11)]
+_SLUG = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+
+
+class Tenant:
+    """One college or cohort: its name, teams, admin accounts and data directory.
+
+    `admins` maps admin names to auth.hash_password() hashes; a tenant
+    without accounts falls back to the shared plaintext `admin_password`.
+    """
+
+    __slots__ = ('slug', 'name', 'cohort', 'teams', 'admins', 'admin_password', 'data_dir')
+
+    def __init__(self, slug, name, teams, admin_password, data_dir, cohort='', admins=None):
+        self.slug = slug
+        self.name = name
+        self.cohort = cohort
+        self.teams = list(teams)
+        self.admins = dict(admins or {})
+        self.admin_password = admin_password
+        self.data_dir = data_dir
+
+    @property
+    def title(self):
+        return f"{self.name} · {self.cohort}" if self.cohort else self.name
+
+    def path(self, file_name):
+        """`file_name` inside this tenant's data directory (created on first use)"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        return os.path.join(self.data_dir, file_name)
+
+
+class TenantConfig:
+    """Tenants read from a TOML file, parsed once per process and re-read when it changes.
+
+        default = "matrusri"
+
+        [tenants.matrusri]
+        name = "Matrusri"
+        data_dir = "."              # default: tenants/<slug>
+        teams = ["Team 1", "Team 2"]
+
+        [tenants.matrusri.admins]   # default: the app-wide [admins] / admin_password
+        asha = "pbkdf2_sha256$600000$..."   # from `python auth.py`
+
+        [tenants.acme-2026]
+        name = "ACME College"
+        cohort = "Summer 2026"
+
+    Without the file there is a single tenant built from `defaults` (name,
+    teams, admins, admin_password) that keeps its data in the working directory,
+    which is how the app ran before tenants existed. Every read stats the
+    file and a changed file is parsed again. A broken file fails the first
+    load; on a reload it is logged and the last good configuration stays
+    in use.
+    """
+
+    def __init__(self, path, defaults):
+        self.path = path
+        self.defaults = defaults
+        self._lock = threading.Lock()
+        self._identity = None
+        self._config = self._parse(None)  # (tenants, default slug), swapped as one
+        self._reload(strict=True)
+
+    def _parse(self, data):
+        if data is None:
+            tenant = Tenant(
+                'default', self.defaults.get('name', 'Standup'), self.defaults.get('teams', DEFAULT_TEAMS),
+                self.defaults.get('admin_password'), '.', admins=self._admins('default', self.defaults),
+            )
+            return {tenant.slug: tenant}, tenant.slug
+        tenants = {}
+        for slug, entry in data.get('tenants', {}).items():
+            if not _SLUG.match(slug):
+                raise ValueError(f"Invalid tenant id {slug!r}: use lowercase letters, digits, '-' and '_'")
+            teams = entry.get('teams', self.defaults.get('teams', DEFAULT_TEAMS))
+            if not teams or not all(isinstance(team, str) and team for team in teams):
+                raise ValueError(f"Tenant {slug!r} needs a non-empty list of team names")
+            tenants[slug] = Tenant(
+                slug,
+                entry.get('name', slug),
+                teams,
+                entry.get('admin_password', self.defaults.get('admin_password')),
+                entry.get('data_dir', os.path.join('tenants', slug)),
+                entry.get('cohort', ''),
+                self._admins(slug, entry if 'admins' in entry else self.defaults),
+            )
+        if not tenants:
+            raise ValueError("No [tenants.<id>] sections")
+        default = data.get('default', next(iter(tenants)))
+        if default not in tenants:
+            raise ValueError(f"Default tenant {default!r} is not defined")
+        return tenants, default
+
+    @staticmethod
+    def _admins(slug, entry):
+        admins = dict(entry.get('admins', {}))
+        for name, stored in admins.items():
+            if not is_password_hash(stored):
+                raise ValueError(f"Admin {name!r} of tenant {slug!r} needs a password hash from `python auth.py`")
+        return admins
+
+    def _reload(self, strict=False):
+        try:
+            stat = os.stat(self.path)
+            identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            identity = None
+        if identity == self._identity:
+            return
+        with self._lock:
+            if identity == self._identity:
+                return
+            try:
+                if identity is None:
+                    parsed = self._parse(None)
+                else:
+                    with open(self.path, 'rb') as file:
+                        parsed = self._parse(tomllib.load(file))
+            except (OSError, ValueError) as e:  # tomllib.TOMLDecodeError is a ValueError
+                if strict:
+                    raise
+                logger.error("Could not load %s, keeping the current tenants: %s", self.path, e)
+                self._identity = identity
+                return
+            self._config = parsed
+            self._identity = identity
+            logger.info("Loaded %d tenant(s) from %s", len(parsed[0]), self.path if identity else "defaults")
+
+    def tenants(self):
+        """{slug: Tenant}, in file order"""
+        self._reload()
+        return self._config[0]
+
+    def get(self, slug=None):
+        """The tenant `slug`, or the default tenant when it is None or unknown"""
+        self._reload()
+        tenants, default = self._config
+        return tenants.get(slug) or tenants[default]
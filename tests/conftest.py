@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import open_report_store  # noqa: E402
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def open_store(request, tmp_path):
+    """Opens another store on one backend's files in tmp_path, as a second process would"""
+    return lambda: open_report_store(request.param, str(tmp_path / 'reports.csv'), str(tmp_path / 'reports.db'))
+
+
+@pytest.fixture
+def report_store(open_store):
+    return open_store()
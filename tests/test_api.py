@@ -0,0 +1,143 @@
+"""The HTTP API, exercised through a real server on a free port."""
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from api import ApiError, ApiHandler, StandupApi
+
+TOKEN = 'secret-token'
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # The default tenant keeps its files in the working directory
+    monkeypatch.chdir(tmp_path)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ApiHandler)
+    server.daemon_threads = True
+    server.api = StandupApi({'api_token': TOKEN, 'notifications': {'sinks': []}})
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None, token=TOKEN, headers=None):
+    """(status, decoded JSON) of one request on a fresh connection"""
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+    headers = dict(headers or {})
+    if token is not None:
+        headers.setdefault('Authorization', f'Bearer {token}')
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf-8')
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b'null')
+    finally:
+        conn.close()
+
+
+REPORT = {'username': 'jdoe', 'team': 'Team 1', 'report': 'Fixed the login bug'}
+
+
+def test_token_is_required(server):
+    assert _request(server, 'POST', '/reports', REPORT, token=None)[0] == 401
+    assert _request(server, 'POST', '/reports', REPORT, token='wrong')[0] == 401
+    assert _request(server, 'GET', '/reports', token=None)[0] == 401
+    assert _request(server, 'GET', '/health', headers={'Authorization': 'Bearer sécret'})[0] == 401
+
+
+def test_reading_reports_needs_a_token_to_be_configured(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    api = StandupApi({'notifications': {'sinks': []}})
+    assert api.authorized(None)
+    with pytest.raises(ApiError) as error:
+        api.list_reports('')
+    assert error.value.status == 403
+
+
+def test_submit_then_duplicate(server):
+    status, body = _request(server, 'POST', '/reports', REPORT)
+    assert status == 201
+    assert body['status'] == 'created' and body['id'] == 1
+    status, body = _request(server, 'POST', '/reports', dict(REPORT, username='JDOE'))
+    assert status == 409
+    assert body['status'] == 'duplicate'
+
+
+def test_batch_reports_one_result_per_item(server):
+    status, body = _request(server, 'POST', '/reports', {'reports': [
+        REPORT, REPORT, {'username': 'amy', 'report': 'Wrote docs'}, {'username': 'x', 'team': 'Team 99', 'report': 'r'},
+        {'report': 'no user'},
+    ]})
+    assert status == 200
+    assert [result['status'] for result in body['results']] == ['created', 'duplicate', 'created', 'invalid', 'invalid']
+    assert (body['created'], body['rejected']) == (2, 3)
+    status, body = _request(server, 'GET', '/reports?team=Not%20Specified')
+    assert (status, body['total'], body['reports'][0]['GitLab Username']) == (200, 1, 'amy')
+
+
+@pytest.mark.parametrize('body', [
+    b'{not json',
+    json.dumps({'username': 'jdoe', 'team': 'Team 1'}).encode(),
+    json.dumps({'username': 'jdoe', 'team': 'Unknown', 'report': 'r'}).encode(),
+    json.dumps({'reports': []}).encode(),
+    json.dumps(['not', 'an', 'object']).encode(),
+])
+def test_bad_bodies_are_rejected(server, body):
+    status, payload = _request(server, 'POST', '/reports', body)
+    assert status == 400
+    assert 'error' in payload
+
+
+@pytest.mark.parametrize('length', ['abc', '-5'])
+def test_bad_content_length_is_rejected(server, length):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+    try:
+        conn.putrequest('POST', '/reports')
+        conn.putheader('Authorization', f'Bearer {TOKEN}')
+        conn.putheader('Content-Length', length)
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 400
+        assert json.loads(response.read()) == {'error': 'invalid Content-Length'}
+    finally:
+        conn.close()
+
+
+def test_oversized_body_is_rejected(server):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+    try:
+        conn.putrequest('POST', '/reports')
+        conn.putheader('Authorization', f'Bearer {TOKEN}')
+        conn.putheader('Content-Length', str(100 * 1024 * 1024))
+        conn.endheaders()
+        assert conn.getresponse().status == 413
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=-1', 'offset=-1', 'limit=ten'])
+def test_bad_paging_is_rejected(server, query):
+    assert _request(server, 'GET', f'/reports?{query}')[0] == 400
+
+
+def test_list_reports_pages(server):
+    for username in ('a', 'b', 'c'):
+        _request(server, 'POST', '/reports', dict(REPORT, username=username))
+    status, body = _request(server, 'GET', '/reports?limit=2&offset=1')
+    assert status == 200
+    assert body['total'] == 3
+    assert [row['GitLab Username'] for row in body['reports']] == ['b', 'a']
+
+
+def test_doubts_and_unknown_routes(server):
+    status, body = _request(server, 'POST', '/doubts', {'name': 'Asha', 'phone': '98765', 'doubt': 'How?'})
+    assert (status, body['status']) == (201, 'created')
+    assert _request(server, 'POST', '/doubts', {'name': 'Asha'})[0] == 400
+    assert _request(server, 'GET', '/nope')[0] == 404
+    assert _request(server, 'GET', '/reports?tenant=nope')[0] == 404
@@ -0,0 +1,98 @@
+"""TieredReportStore: compaction into monthly partitions, and paging and counts across both tiers."""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from archive import PartitionArchive, TieredReportStore
+from storage import DuplicateReportError
+
+USERS = ['alice', 'bob', 'carol', 'alicia']
+TEAMS = ['Team 1', 'Team 2']
+
+
+def _timestamps():
+    """Six reports a month over three archived months, then six in the current (hot) month"""
+    this_month = datetime.now().strftime('%Y-%m')
+    months = ['2024-01', '2024-02', '2024-03', this_month]
+    return [f"{month}-{day:02d} 09:00:00" for month in months for day in range(1, 7)]
+
+
+@pytest.fixture
+def tiered(report_store, tmp_path):
+    for position, timestamp in enumerate(_timestamps()):
+        report_store.add_report(USERS[position % 4], TEAMS[position % 2], f"report {position}", timestamp)
+    return TieredReportStore(report_store, PartitionArchive(str(tmp_path / 'archive')))
+
+
+def _reference(tiered, username=None, team=None, newest_first=True):
+    df = pd.concat(list(tiered.iter_reports()))
+    if username:
+        df = df[df['GitLab Username'].str.contains(username, regex=False)]
+    if team:
+        df = df[df['Team'] == team]
+    return list(df.sort_values('Timestamp', ascending=not newest_first)['ID'].astype(int))
+
+
+def test_old_months_move_to_the_archive(tiered):
+    assert list(tiered.archive.partitions()) == ['2024-01', '2024-02', '2024-03']
+    assert tiered.hot.count_reports() == 6
+    assert tiered.count_reports() == 24
+    assert tiered.get_report(1)['Standup Report'] == 'report 0'
+
+
+@pytest.mark.parametrize('newest_first', [True, False])
+@pytest.mark.parametrize('page_size', [1, 4, 5, 7, 30])
+def test_pages_cross_tiers_in_timestamp_order(tiered, newest_first, page_size):
+    expected = _reference(tiered, newest_first=newest_first)
+    seen = []
+    for offset in range(0, len(expected) + page_size, page_size):
+        page = tiered.query_reports(newest_first=newest_first, limit=page_size, offset=offset)
+        assert len(page) <= page_size
+        seen += list(page['ID'].astype(int))
+    assert seen == expected
+    assert list(tiered.query_reports(newest_first=newest_first)['ID'].astype(int)) == expected
+
+
+@pytest.mark.parametrize('username, team', [('alice', None), ('ali', None), (None, 'Team 2'), ('bob', 'Team 2')])
+def test_filtered_pages_and_counts(tiered, username, team):
+    expected = _reference(tiered, username, team)
+    assert tiered.count_reports(username, team) == len(expected)
+    seen = []
+    for offset in range(0, len(expected), 4):
+        seen += list(tiered.query_reports(username, team, limit=4, offset=offset)['ID'].astype(int))
+    assert seen == expected
+
+
+def test_team_counts_cover_both_tiers(tiered):
+    assert tiered.team_counts().to_dict() == {'Team 1': 12, 'Team 2': 12}
+
+
+def test_archived_day_still_rejects_a_second_report(tiered):
+    with pytest.raises(DuplicateReportError):
+        tiered.add_report('ALICE', 'Team 1', 'again', '2024-01-01 18:00:00')
+    results = tiered.add_reports([('bob', 'Team 2', 'again'), ('dave', 'Team 1', 'new')], '2024-01-02 18:00:00')
+    assert isinstance(results[0], DuplicateReportError)
+    assert results[1]['GitLab Username'] == 'dave'
+    assert tiered.count_reports() == 25
+
+
+def test_clear_rotates_instead_of_deleting(tiered):
+    tiered.clear()
+    assert tiered.count_reports() == 0
+    assert tiered.archive.partitions() == {}
+    assert tiered.query_reports(limit=10).empty
+
+
+def test_comments_reach_either_tier(tiered):
+    hot_id = int(tiered.hot.load_reports()['ID'].iloc[0])
+    tiered.set_comments({1: 'archived', hot_id: 'hot'})
+    assert tiered.get_report(1)['Comment'] == 'archived'
+    assert tiered.get_report(hot_id)['Comment'] == 'hot'
+
+
+def test_archived_comment_leaves_the_hot_tier_alone(tiered):
+    version = tiered.data_version()
+    tiered.set_comment(1, 'archived only')
+    assert tiered.get_report(1)['Comment'] == 'archived only'
+    assert tiered.data_version() == version
@@ -0,0 +1,91 @@
+"""Admin password checks and signed session tokens."""
+import time
+
+import pytest
+
+import auth
+from auth import SessionSigner, check_login, hash_password, is_password_hash, session_signer, verify_password
+from tenants import Tenant
+
+
+@pytest.fixture
+def tenant(tmp_path):
+    return Tenant('acme', 'ACME', ['Team 1'], 'shared-pw', str(tmp_path),
+                  admins={'asha': hash_password('s3cret', iterations=1000)})
+
+
+def test_password_hashes():
+    stored = hash_password('s3cret', iterations=1000)
+    assert is_password_hash(stored) and not is_password_hash('s3cret')
+    assert verify_password('s3cret', stored)
+    assert not verify_password('S3cret', stored)
+    assert hash_password('s3cret', iterations=1000) != stored  # salted
+
+
+def test_accounts_need_the_right_password(tenant, monkeypatch):
+    monkeypatch.setattr(auth, '_dummy_hash', lambda: hash_password('x', iterations=1000))
+    assert check_login(tenant, ' asha ', 's3cret') == 'asha'
+    assert check_login(tenant, 'asha', 'wrong') is None
+    assert check_login(tenant, 'asha', '') is None
+    assert check_login(tenant, 'nobody', 's3cret') is None
+    # With accounts configured, the shared password no longer works
+    assert check_login(tenant, 'admin', 'shared-pw') is None
+
+
+def test_shared_password_without_accounts(tenant):
+    tenant.admins = {}
+    assert check_login(tenant, '', 'shared-pw') == 'admin'
+    assert check_login(tenant, '', 'wrong') is None
+    assert check_login(tenant, '', '') is None
+    tenant.admin_password = ''
+    assert check_login(tenant, '', '') is None
+
+
+def test_token_is_valid_for_its_own_tenant_only():
+    signer = SessionSigner('secret')
+    token = signer.issue('asha', 'acme')
+    assert signer.verify(token, 'acme') == 'asha'
+    assert signer.verify(token, 'matrusri') is None
+
+
+def test_token_from_another_secret_or_tampered_is_rejected():
+    token = SessionSigner('secret').issue('asha', 'acme')
+    assert SessionSigner('secret').verify(token, 'acme') == 'asha'
+    assert SessionSigner('other-secret').verify(token, 'acme') is None
+    payload, _, signature = token.partition('.')
+    forged = SessionSigner('other-secret').issue('mallory', 'acme').partition('.')[0]
+    assert SessionSigner('secret').verify(f"{forged}.{signature}", 'acme') is None
+    for bad in (None, '', payload, token + 'x', 'é' + token, 'x' * 2000):
+        assert SessionSigner('secret').verify(bad, 'acme') is None
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    signer = SessionSigner('secret', ttl=60)
+    token = signer.issue('asha', 'acme')
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 30)
+    assert signer.verify(token, 'acme') == 'asha'
+    monkeypatch.setattr(time, 'time', lambda: now + 120)
+    assert signer.verify(token, 'acme') is None
+
+
+def test_token_is_invalid_after_logout():
+    signer = SessionSigner('secret')
+    token, other = signer.issue('asha', 'acme'), signer.issue('ravi', 'acme')
+    signer.revoke(token)
+    assert signer.verify(token, 'acme') is None
+    assert signer.verify(other, 'acme') == 'ravi'
+    signer.revoke('garbage')
+    signer.revoke(None)
+
+
+def test_without_a_secret_tokens_end_with_the_process():
+    token = SessionSigner().issue('asha', 'acme')
+    assert SessionSigner().verify(token, 'acme') is None
+
+
+def test_pages_share_one_signer():
+    assert session_signer('secret', 60) is session_signer('secret', 60)
+    assert session_signer('secret', 60) is not session_signer('secret', 120)
+    token = session_signer('shared').issue('asha', 'acme')
+    assert session_signer('shared').verify(token, 'acme') == 'asha'
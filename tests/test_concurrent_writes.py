@@ -0,0 +1,73 @@
+"""Concurrent writes: one report per user and day whichever store it comes through, and no lost comments."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from storage import DuplicateReportError
+
+DAY = '2024-01-02 09:00:00'
+
+
+def test_second_report_the_same_day_is_rejected(report_store):
+    report_store.add_report('alice', 'Team 1', 'first', DAY)
+    with pytest.raises(DuplicateReportError):
+        report_store.add_report('  Alice ', 'Team 2', 'second', '2024-01-02 17:00:00')
+    assert report_store.add_report('alice', 'Team 1', 'next day', '2024-01-03 09:00:00')['ID'] == 2
+    assert report_store.count_reports() == 2
+    assert report_store.has_submitted('ALICE', '2024-01-02')
+    assert not report_store.has_submitted('alice', '2024-01-04')
+
+
+def test_batch_rejects_stored_and_repeated_users(report_store):
+    report_store.add_report('alice', 'Team 1', 'first', DAY)
+    results = report_store.add_reports(
+        [('alice', 'Team 1', 'again'), ('bob', 'Team 1', 'one'), ('BOB', 'Team 2', 'two'), ('carol', 'Team 2', 'x')],
+        DAY,
+    )
+    assert [isinstance(result, DuplicateReportError) for result in results] == [True, False, True, False]
+    assert [results[1]['ID'], results[3]['ID']] == [2, 3]
+    assert sorted(report_store.load_reports()['GitLab Username']) == ['alice', 'bob', 'carol']
+
+
+def test_another_store_on_the_same_files_sees_the_report(report_store, open_store):
+    other = open_store()
+    report_store.add_report('alice', 'Team 1', 'first', DAY)
+    with pytest.raises(DuplicateReportError):
+        other.add_report('alice', 'Team 1', 'second', DAY)
+
+
+def test_racing_stores_accept_each_user_once(report_store, open_store):
+    # Separate store objects on the same files stand in for separate processes
+    stores = [report_store] + [open_store() for _ in range(3)]
+    users = [f"racer-{i}" for i in range(20)]
+
+    def submit(store):
+        accepted = 0
+        for username in users:
+            try:
+                store.add_report(username, 'Team 1', 'race', DAY)
+                accepted += 1
+            except DuplicateReportError:
+                pass
+        return accepted
+
+    with ThreadPoolExecutor(len(stores)) as pool:
+        accepted = sum(pool.map(submit, stores))
+    df = report_store.load_reports()
+    assert accepted == len(df) == len(users)
+    assert df['GitLab Username'].is_unique
+
+
+def test_concurrent_comment_saves_are_all_kept(report_store, open_store):
+    for i in range(20):
+        report_store.add_report(f"user-{i}", 'Team 1', 'r', DAY)
+    stores = [report_store, open_store()]
+
+    def comment(position):
+        store = stores[position % 2]
+        store.set_comment(position + 1, f"reviewed {position + 1}")
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(comment, range(20)))
+    df = open_store().load_reports()
+    assert list(df['Comment']) == [f"reviewed {i}" for i in range(1, 21)]
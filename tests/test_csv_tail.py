@@ -0,0 +1,105 @@
+"""CsvTail and the cached CSV loader: appended rows are read incrementally, rewrites force a full re-read."""
+import os
+
+import pytest
+
+from storage import CsvReportStore, CsvTail, migrate_reports_csv
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'reports.csv'
+    path.write_text('ID,Name\n1,a\n2,b\n', encoding='utf-8')
+    return str(path)
+
+
+def _append(path, text):
+    with open(path, 'a', encoding='utf-8', newline='') as file:
+        file.write(text)
+
+
+def test_first_poll_reads_header_and_rows(path):
+    tail = CsvTail(path)
+    assert tail.poll() == (False, [['1', 'a'], ['2', 'b']])
+    assert tail.header == ['ID', 'Name']
+    assert tail.column('Name') == 1
+    assert tail.column('Missing') is None
+
+
+def test_poll_returns_only_appended_rows(path):
+    tail = CsvTail(path)
+    tail.poll()
+    assert tail.poll() == (False, [])
+    _append(path, '3,c\n')
+    assert tail.poll() == (False, [['3', 'c']])
+
+
+def test_partial_row_waits_for_its_end(path):
+    tail = CsvTail(path)
+    tail.poll()
+    _append(path, '3,"multi\nline')
+    assert tail.poll() == (False, [])
+    _append(path, ' note"\n')
+    assert tail.poll() == (False, [['3', 'multi\nline note']])
+
+
+def test_atomic_replace_is_a_rewrite(path, tmp_path):
+    tail = CsvTail(path)
+    tail.poll()
+    replacement = tmp_path / 'replacement.csv'
+    replacement.write_text('ID,Name\n1,a\n2,b\n3,c\n', encoding='utf-8')
+    os.replace(replacement, path)
+    assert tail.poll() == (True, [['1', 'a'], ['2', 'b'], ['3', 'c']])
+
+
+def test_truncation_is_a_rewrite(path):
+    tail = CsvTail(path)
+    tail.poll()
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('ID,Name\n')
+    assert tail.poll() == (True, [])
+    assert tail.header == ['ID', 'Name']
+
+
+def test_in_place_rewrite_that_grows_is_a_rewrite(path):
+    tail = CsvTail(path)
+    tail.poll()
+    with open(path, 'r+', encoding='utf-8') as file:
+        file.write('ID,Name\n1,x\n2,y\n3,z\n')
+    assert tail.poll() == (True, [['1', 'x'], ['2', 'y'], ['3', 'z']])
+
+
+def test_in_place_rewrite_of_the_same_size_is_a_rewrite(path):
+    tail = CsvTail(path)
+    tail.poll()
+    stat = os.stat(path)
+    with open(path, 'r+', encoding='utf-8') as file:
+        file.write('ID,Name\n1,x\n2,y\n')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert tail.poll() == (True, [['1', 'x'], ['2', 'y']])
+
+
+def test_deleted_file_is_a_rewrite(path):
+    tail = CsvTail(path)
+    tail.poll()
+    os.remove(path)
+    assert tail.poll() == (True, [])
+    assert tail.header is None
+    assert tail.poll() == (False, [])
+
+
+def test_loader_parses_only_appended_rows(tmp_path):
+    path = str(tmp_path / 'reports.csv')
+    migrate_reports_csv(path)
+    store = CsvReportStore(path)
+    writer = CsvReportStore(path)  # another process appending to the same file
+    store.add_report('alice', 'Team 1', 'first', '2024-01-02 09:00:00')
+    assert len(store.load_reports()) == 1
+    writer.add_report('bob', 'Team 1', 'second', '2024-01-02 10:00:00')
+    assert list(store.load_reports()['GitLab Username']) == ['alice', 'bob']
+    store.load_reports()
+    assert store.cache_stats() == {'hits': 1, 'tail_reads': 1, 'misses': 1}
+
+    writer.set_comment(1, 'rewritten')
+    assert store.load_reports().loc[1, 'Comment'] == 'rewritten'
+    assert store.cache_stats()['misses'] == 2
@@ -0,0 +1,83 @@
+"""The SQLite doubt store: one table with a status column, and the import of the legacy CSV pair."""
+import csv
+import io
+import multiprocessing
+import os
+
+import pytest
+
+from storage import DOUBT_ACTIVE, DOUBT_COLUMNS, DOUBT_RESOLVED, DOUBT_TRACKING_COLUMNS, SqliteDoubtStore
+
+ACTIVE_CSV = 'Timestamp,Name,Phone,Doubt\n2024-01-02 09:00:00,Asha,1,How do I rebase?\n2024-01-02 10:00:00,Ravi,2,Which IDE?\n'
+RESOLVED_CSV = 'Timestamp,Name,Phone,Doubt\n2024-01-01 09:00:00,Meena,3,Where is the wiki?\n'
+
+
+@pytest.fixture
+def doubts(tmp_path):
+    store = SqliteDoubtStore(str(tmp_path / 'doubts.db'))
+    store.add_doubts([('Asha', '1', 'How do I rebase?'), ('Ravi', '2', 'Which IDE?'), ('Meena', '3', 'Wiki?')])
+    return store
+
+
+def test_doubts_start_active(doubts):
+    assert doubts.count_doubts() == 3
+    assert doubts.count_doubts(DOUBT_ACTIVE) == 3
+    assert doubts.get_doubt(1)['Status'] == DOUBT_ACTIVE
+    assert doubts.get_doubt(99) is None
+    assert list(doubts.query_doubts(DOUBT_ACTIVE, newest_first=False, limit=2, offset=1)['ID']) == [2, 3]
+
+
+def test_assign_and_resolve(doubts):
+    assert doubts.assign(1, 'lead-a')
+    assert doubts.resolve(1, note='Use git rebase -i')
+    assert not doubts.resolve(1)
+    assert not doubts.assign(1, 'lead-b')
+    resolved = doubts.get_doubt(1)
+    assert (resolved['Status'], resolved['Assignee'], resolved['Resolution Note']) == \
+        (DOUBT_RESOLVED, 'lead-a', 'Use git rebase -i')
+    assert resolved['Resolved At']
+    assert doubts.resolve(2, assignee='lead-b')
+    assert doubts.get_doubt(2)['Assignee'] == 'lead-b'
+    assert list(doubts.load_doubts()['ID']) == [3]
+    assert doubts.count_doubts(DOUBT_RESOLVED) == 2
+
+
+def test_export_and_clear_resolved(doubts):
+    doubts.resolve(1, 'lead-a', 'done')
+    rows = list(csv.reader(io.StringIO(doubts.export_resolved(chunk_size=1).decode('utf-8'))))
+    assert rows[0] == DOUBT_COLUMNS + DOUBT_TRACKING_COLUMNS
+    assert [row[2] for row in rows[1:]] == ['Asha']
+    doubts.clear_resolved()
+    assert doubts.count_doubts() == 2
+    assert doubts.add_doubt('New', '4', '?')['ID'] == 4
+
+
+def _write_legacy(directory):
+    (directory / 'doubts.csv').write_text(ACTIVE_CSV)
+    (directory / 'resolved.csv').write_text(RESOLVED_CSV)
+    return [str(directory / name) for name in ('doubts.db', 'doubts.csv', 'resolved.csv')]
+
+
+def test_legacy_csvs_are_imported_once(tmp_path):
+    paths = _write_legacy(tmp_path)
+    store = SqliteDoubtStore(*paths)
+    assert list(store.load_doubts()['Name']) == ['Ravi', 'Asha']
+    assert list(store.load_resolved()['ID']) == [3]
+    store.resolve(1)
+    store.resolve(2)
+    store.clear_resolved()
+    assert SqliteDoubtStore(*paths).count_doubts() == 0
+
+
+def _open_and_count(directory):
+    store = SqliteDoubtStore(*(os.path.join(directory, name) for name in ('doubts.db', 'doubts.csv', 'resolved.csv')))
+    return store.count_doubts()
+
+
+def test_processes_opening_a_new_database_import_once(tmp_path):
+    with multiprocessing.Pool(4) as pool:
+        for attempt in range(5):
+            directory = tmp_path / str(attempt)
+            directory.mkdir()
+            _write_legacy(directory)
+            assert pool.map(_open_and_count, [str(directory)] * 4) == [3] * 4
@@ -0,0 +1,73 @@
+"""Near-duplicate reports found with MinHash signatures and the LSH index."""
+import numpy as np
+import pytest
+
+from duplicates import NUM_HASHES, DuplicateIndex, minhash, shingles
+
+REPORT = "Fixed the login redirect bug, wrote unit tests for the session middleware and reviewed two merge requests"
+
+
+@pytest.fixture
+def index(report_store, tmp_path):
+    return report_store.add_listener(DuplicateIndex(str(tmp_path / 'duplicates.db'), threshold=0.8))
+
+
+def _add(store, username, report, day):
+    return store.add_report(username, 'Team 1', report, f'2024-01-{day:02d} 10:00:00')['ID']
+
+
+def test_signatures():
+    assert shingles('Fixed the bug') == {'fixed the bug'}
+    assert shingles('🚀 ---') == set()
+    assert minhash('🚀 ---') is None
+    signature = minhash(REPORT)
+    assert signature.shape == (NUM_HASHES,) and signature.dtype == np.uint32
+    assert np.array_equal(signature, minhash(REPORT.upper()))
+    assert (signature == minhash("Planned the sprint with the design team")).mean() < 0.5
+
+
+def test_near_duplicates_by_the_same_user_and_by_others(report_store, index):
+    first = _add(report_store, 'asha', REPORT, 1)
+    again = _add(report_store, 'Asha', REPORT + '.', 2)
+    copied = _add(report_store, 'ravi', REPORT, 3)
+    fresh = _add(report_store, 'ravi', "Planned the sprint with the design team and set up the staging server", 4)
+    found = index.matches([first, again, copied, fresh])
+    assert first not in found and fresh not in found
+    assert [(m['kind'], m['id'], m['username']) for m in found[again]] == [('self', first, 'asha')]
+    # The most recent of equally close reports wins
+    assert {(m['kind'], m['id']) for m in found[copied]} == {('other', again)}
+    assert found[copied][0]['similarity'] == 1.0
+    assert found[copied][0]['timestamp'] == '2024-01-02 10:00:00'
+    assert index.matches([]) == {}
+
+
+def test_threshold(report_store, tmp_path):
+    index = report_store.add_listener(DuplicateIndex(str(tmp_path / 'strict.db'), threshold=1.0))
+    first = _add(report_store, 'asha', REPORT, 1)
+    edited = _add(report_store, 'ravi', REPORT.replace('two merge requests', 'three merge requests'), 2)
+    same = _add(report_store, 'mira', REPORT, 3)
+    found = index.matches([edited, same])
+    assert edited not in found
+    assert [m['id'] for m in found[same]] == [first]
+
+
+def test_sync_reports_rebuilds_only_when_out_of_step(report_store, tmp_path):
+    first = _add(report_store, 'asha', REPORT, 1)
+    _add(report_store, 'asha', '🚀🚀 ---', 2)
+    second = _add(report_store, 'ravi', REPORT, 3)
+    index = DuplicateIndex(str(tmp_path / 'duplicates.db'))
+    assert index.sync_reports(report_store)
+    assert [m['id'] for m in index.matches([second])[second]] == [first]
+    # Reports without words are indexed too, so the counts agree
+    assert not index.sync_reports(report_store)
+    assert not DuplicateIndex(str(tmp_path / 'duplicates.db')).sync_reports(report_store)
+
+
+def test_clearing_the_store_clears_the_index(report_store, index):
+    _add(report_store, 'asha', REPORT, 1)
+    second = _add(report_store, 'ravi', REPORT, 2)
+    report_store.clear()
+    assert index.matches([second]) == {}
+    assert not index.sync_reports(report_store)
+    third = _add(report_store, 'mira', REPORT, 3)
+    assert index.matches([third]) == {}
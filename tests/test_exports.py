@@ -0,0 +1,54 @@
+"""Chunked report exports in every available format."""
+import gzip
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from exports import available_formats, export_file_name, export_reports, write_reports
+from storage import REPORT_COLUMNS
+
+
+def _read(data, fmt):
+    if fmt == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    if fmt == 'csv.gz':
+        data = gzip.decompress(data)
+    return pd.read_csv(io.BytesIO(data), dtype={'ID': 'int64'}, keep_default_na=False)
+
+
+@pytest.fixture
+def filled(report_store):
+    for day in range(1, 6):
+        report_store.add_report('alice', 'Team 1', f'day {day}, with "quotes"\nand a newline', f'2024-01-0{day} 09:00:00')
+        report_store.add_report('bob', 'Team 2', f'day {day}', f'2024-01-0{day} 10:00:00')
+    return report_store
+
+
+@pytest.mark.parametrize('fmt', available_formats())
+def test_export_round_trips_in_chunks(filled, fmt):
+    df = _read(export_reports(filled, fmt, chunk_size=3), fmt)
+    assert list(df.columns) == REPORT_COLUMNS
+    assert list(df['ID']) == list(range(1, 11))
+    assert df.loc[0, 'Standup Report'] == 'day 1, with "quotes"\nand a newline'
+
+
+@pytest.mark.parametrize('fmt', available_formats())
+def test_export_filters(filled, fmt):
+    df = _read(export_reports(filled, fmt, start_date='2024-01-02', end_date='2024-01-03', team='Team 2'), fmt)
+    assert list(df['Standup Report']) == ['day 2', 'day 3']
+
+
+def test_empty_export_still_has_a_header(report_store):
+    assert export_reports(report_store, 'csv') == (','.join(REPORT_COLUMNS) + '\n').encode()
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        write_reports([], 'xlsx', io.BytesIO())
+
+
+def test_file_name():
+    assert export_file_name('standup_reports', 'csv.gz', datetime(2024, 1, 2, 3, 4, 5)) == \
+        'standup_reports_20240102_030405.csv.gz'
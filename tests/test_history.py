@@ -0,0 +1,42 @@
+"""Per-user history cache behind "Your Previous Reports"."""
+import pytest
+
+from history import UserHistoryCache
+
+
+@pytest.fixture
+def cache(report_store):
+    report_store.add_report('alice', 'Team 1', 'first', '2024-01-02 09:00:00')
+    report_store.add_report('bob', 'Team 1', 'other', '2024-01-02 10:00:00')
+    report_store.add_report('alice', 'Team 1', 'second', '2024-01-03 09:00:00')
+    return report_store.add_listener(UserHistoryCache(max_users=2))
+
+
+def test_history_is_newest_first_and_cached(cache, report_store):
+    assert list(cache.reports(report_store, 'ALICE')['Standup Report']) == ['second', 'first']
+    cache.reports(report_store, 'alice')
+    assert cache.stats == {'hits': 1, 'misses': 1}
+
+
+def test_own_submission_and_comments_invalidate(cache, report_store):
+    cache.reports(report_store, 'alice')
+    cache.reports(report_store, 'bob')
+    report_store.add_report('alice', 'Team 1', 'third', '2024-01-04 09:00:00')
+    assert list(cache.reports(report_store, 'alice')['Standup Report']) == ['third', 'second', 'first']
+    report_store.set_comment(1, 'looks good')
+    assert cache.reports(report_store, 'alice').iloc[-1]['Comment'] == 'looks good'
+
+
+def test_appends_by_other_processes_are_picked_up(cache, report_store, open_store):
+    cache.reports(report_store, 'alice')
+    open_store().add_report('alice', 'Team 1', 'elsewhere', '2024-01-05 09:00:00')
+    assert cache.reports(report_store, 'alice').iloc[0]['Standup Report'] == 'elsewhere'
+
+
+def test_clear_and_eviction(cache, report_store):
+    for username in ('alice', 'bob', 'carol'):
+        cache.reports(report_store, username)
+    cache.reports(report_store, 'alice')  # evicted as least recently viewed
+    assert cache.stats == {'hits': 0, 'misses': 4}
+    report_store.clear()
+    assert cache.reports(report_store, 'alice').empty
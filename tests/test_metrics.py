@@ -0,0 +1,32 @@
+"""Operation timings and their Prometheus export."""
+import os
+
+import pytest
+
+from metrics import Metrics
+
+
+def test_observations_fill_buckets_and_flag_slow_operations():
+    metrics = Metrics(slow_ms=100)
+    metrics.observe('load', 0.002)
+    metrics.observe('load', 0.2)
+    with pytest.raises(RuntimeError):
+        with metrics.timer('save'):
+            raise RuntimeError('boom')
+    rows = {row['operation']: row for row in metrics.snapshot()}
+    assert (rows['load']['calls'], rows['load']['slow'], rows['save']['errors']) == (2, 1, 1)
+    assert [op['operation'] for op in metrics.slow_operations()] == ['load']
+    text = metrics.prometheus()
+    assert 'standup_operation_seconds_bucket{operation="load",le="0.0025"} 1\n' in text
+    assert 'standup_operation_seconds_count{operation="load"} 2\n' in text
+    assert 'standup_operation_errors_total{operation="save"} 1\n' in text
+
+
+def test_write_prometheus_replaces_the_file_atomically(tmp_path):
+    metrics = Metrics()
+    metrics.observe('load', 0.01)
+    path = tmp_path / 'standup.prom'
+    path.write_text('stale\n')
+    metrics.write_prometheus(str(path))
+    assert path.read_text(encoding='utf-8') == metrics.prometheus()
+    assert os.listdir(tmp_path) == ['standup.prom']
@@ -0,0 +1,108 @@
+"""Startup migrations of the report and doubt CSVs, and the IDs they assign."""
+import os
+
+import pandas as pd
+
+from storage import (
+    CSV_SCHEMA_VERSION, DEFAULT_COMMENT, DEFAULT_TEAM, REPORT_COLUMNS, CsvReportStore, SqliteReportStore,
+    _read_schema_version, _read_sequence, migrate_doubts_csv, migrate_reports_csv,
+)
+
+NUMBERED_CSV = (
+    'ID,Timestamp,Date,Team,GitLab Username,Standup Report,Comment\n'
+    '1000,2024-01-02 09:00:00,2024-01-02,Team 1,alice,a,c\n'
+    '999,2024-01-03 09:00:00,2024-01-03,Team 1,bob,b,c\n'
+)
+LEGACY_CSV = (
+    'Timestamp,GitLab Username,Standup Report\n'
+    '2024-01-02 09:00:00,alice,first\n'
+    '2024-01-03 09:00:00,bob,second\n'
+    '2024-01-04 09:00:00,alice,third\n'
+)
+
+
+def _read(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def test_legacy_csv_gains_the_current_columns(tmp_path):
+    path = tmp_path / 'reports.csv'
+    path.write_text(LEGACY_CSV, encoding='utf-8')
+    assert migrate_reports_csv(str(path)) == 0
+    df = _read(path)
+    assert list(df.columns) == REPORT_COLUMNS
+    assert list(df['Date']) == ['2024-01-02', '2024-01-03', '2024-01-04']
+    assert set(df['Team']) == {DEFAULT_TEAM}
+    assert set(df['Comment']) == {DEFAULT_COMMENT}
+    assert _read_schema_version(str(path)) == CSV_SCHEMA_VERSION
+
+
+def test_migration_runs_once(tmp_path):
+    path = tmp_path / 'reports.csv'
+    path.write_text(LEGACY_CSV, encoding='utf-8')
+    migrate_reports_csv(str(path))
+    before = os.stat(path)
+    assert migrate_reports_csv(str(path)) == CSV_SCHEMA_VERSION
+    after = os.stat(path)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+def test_missing_csv_is_created_with_the_current_header(tmp_path):
+    path = tmp_path / 'reports.csv'
+    migrate_reports_csv(str(path))
+    assert list(_read(path).columns) == REPORT_COLUMNS
+
+
+def test_reading_an_unmigrated_file_does_not_write_it(tmp_path):
+    path = tmp_path / 'reports.csv'
+    path.write_text(LEGACY_CSV, encoding='utf-8')
+    df = CsvReportStore(str(path)).load_reports()
+    assert list(df.columns) == REPORT_COLUMNS
+    assert list(df['Team']) == [DEFAULT_TEAM] * 3
+    assert path.read_text(encoding='utf-8') == LEGACY_CSV
+    assert not os.path.exists(str(path) + '.version')
+
+
+def test_legacy_rows_are_numbered_in_file_order(tmp_path):
+    path = tmp_path / 'reports.csv'
+    path.write_text(LEGACY_CSV, encoding='utf-8')
+    migrate_reports_csv(str(path))
+    assert list(_read(path)['ID']) == ['1', '2', '3']
+    assert _read_sequence(str(path)) == 3
+    row = CsvReportStore(str(path)).add_report('carol', 'Team 1', 'c', '2024-01-05 09:00:00')
+    assert row['ID'] == 4
+
+
+def test_sequence_starts_after_the_numerically_largest_id(tmp_path):
+    # As strings '999' sorts after '1000'
+    path = tmp_path / 'reports.csv'
+    path.write_text(NUMBERED_CSV, encoding='utf-8')
+    migrate_reports_csv(str(path))
+    assert _read_sequence(str(path)) == 1000
+    row = CsvReportStore(str(path)).add_report('carol', 'Team 1', 'c', '2024-01-04 09:00:00')
+    assert row['ID'] == 1001
+
+
+def test_ids_are_never_reused_after_clear(report_store):
+    ids = [report_store.add_report(f'user{i}', 'Team 1', 'r', '2024-01-02 09:00:00')['ID'] for i in range(3)]
+    assert ids == [1, 2, 3]
+    report_store.clear()
+    assert report_store.add_report('user0', 'Team 1', 'r', '2024-01-02 09:00:00')['ID'] == 4
+
+
+def test_sqlite_import_keeps_csv_ids(tmp_path):
+    csv_path = tmp_path / 'reports.csv'
+    csv_path.write_text(NUMBERED_CSV, encoding='utf-8')
+    store = SqliteReportStore(str(tmp_path / 'reports.db'), legacy_csv=str(csv_path))
+    assert store.get_report(999)['GitLab Username'] == 'bob'
+    assert store.add_report('carol', 'Team 1', 'r', '2024-01-04 09:00:00')['ID'] == 1001
+
+
+def test_doubts_share_one_id_sequence(tmp_path):
+    active, resolved = tmp_path / 'doubts.csv', tmp_path / 'resolved.csv'
+    active.write_text('Timestamp,Name,Phone,Doubt\n2024-01-02 09:00:00,a,1,x\n2024-01-02 10:00:00,b,2,y\n')
+    resolved.write_text('Timestamp,Name,Phone,Doubt\n2024-01-01 09:00:00,c,3,z\n')
+    assert migrate_doubts_csv(str(active), str(resolved)) == 0
+    assert list(_read(active)['ID']) == ['1', '2']
+    assert list(_read(resolved)['ID']) == ['3']
+    assert migrate_doubts_csv(str(active), str(resolved)) == 1
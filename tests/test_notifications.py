@@ -0,0 +1,129 @@
+"""Background notification delivery, its sinks, and the store listener that queues feedback and doubts."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from notifications import (
+    TECHLEADS, LogSink, Notification, NotificationQueue, Notifier, SmtpSink, WebhookSink, build_sinks,
+)
+from storage import DEFAULT_COMMENT, SqliteDoubtStore
+
+
+class RecordingSink:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def send(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('mail server down')
+        self.batches.append([notification.subject for notification in batch])
+
+
+def _queue(*sinks, **options):
+    return NotificationQueue(sinks, linger=options.pop('linger', 0.05), backoff=0, **options)
+
+
+def _notification(i):
+    return Notification('feedback', 'alice', f'subject {i}', 'body')
+
+
+def test_notifications_are_delivered_in_batches():
+    sink = RecordingSink()
+    notifications = _queue(sink, max_batch=3, linger=1)
+    for i in range(5):
+        notifications.put(_notification(i))
+    notifications.join()
+    assert sink.batches == [['subject 0', 'subject 1', 'subject 2'], ['subject 3', 'subject 4']]
+    assert notifications.stats == {'queued': 5, 'delivered': 5, 'failed': 0, 'dropped': 0}
+
+
+def test_failing_sink_is_retried_then_given_up_on():
+    flaky, broken = RecordingSink(failures=2), RecordingSink(failures=99)
+    notifications = _queue(flaky, broken, max_attempts=3)
+    notifications.put(_notification(0))
+    notifications.join()
+    assert flaky.batches == [['subject 0']]
+    assert broken.batches == []
+    assert notifications.stats['delivered'] == 1
+    assert notifications.stats['failed'] == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+
+    class BlockedSink:
+        def send(self, batch):
+            release.wait(5)
+
+    notifications = _queue(BlockedSink(), max_batch=1, max_queued=1)
+    for i in range(4):
+        notifications.put(_notification(i))
+    release.set()
+    notifications.join()
+    assert notifications.stats['dropped'] >= 2
+    assert notifications.stats['queued'] + notifications.stats['dropped'] == 4
+
+
+def test_notifier_queues_feedback_and_doubts(report_store, tmp_path):
+    delivered = []
+
+    class Collect:
+        def put(self, notification):
+            delivered.append(notification)
+
+    notifier = Notifier(Collect())
+    report_store.add_listener(notifier)
+    report_store.add_report('alice', 'Team 1', 'Fixed the login bug', '2024-01-02 09:00:00')
+    report_store.set_comments({1: 'Nice work', 2: 'no such report'})
+    report_store.set_comment(1, DEFAULT_COMMENT)
+    doubts = SqliteDoubtStore(str(tmp_path / 'doubts.db'))
+    doubts.add_listener(notifier)
+    doubts.add_doubt('Asha', '9876543210', 'How do I rebase?')
+
+    assert [(n.kind, n.recipient) for n in delivered] == [('feedback', 'alice'), ('doubt', TECHLEADS)]
+    assert delivered[0].subject == 'Feedback on your standup report for 2024-01-02'
+    assert 'Fixed the login bug' in delivered[0].body
+    assert 'Phone: 9876543210' in delivered[1].body
+
+
+def test_smtp_addresses():
+    sink = SmtpSink(email_domain='example.com', techlead_emails=['lead@example.com'])
+    assert sink._addresses(Notification('feedback', 'alice', 's', 'b')) == ['alice@example.com']
+    assert sink._addresses(Notification('doubt', TECHLEADS, 's', 'b')) == ['lead@example.com']
+    assert SmtpSink()._addresses(Notification('feedback', 'alice', 's', 'b')) == []
+
+
+def test_webhook_posts_the_batch_as_json():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    try:
+        WebhookSink(f'http://127.0.0.1:{server.server_port}/hook').send([_notification(0)])
+    finally:
+        thread.join(5)
+        server.server_close()
+    assert [n['subject'] for n in received[0]['notifications']] == ['subject 0']
+
+
+def test_build_sinks():
+    assert [type(sink) for sink in build_sinks({})] == [LogSink]
+    sinks = build_sinks({'sinks': ['smtp', 'webhook'], 'smtp_port': '1025', 'webhook_url': 'http://hook'})
+    assert [type(sink) for sink in sinks] == [SmtpSink, WebhookSink]
+    assert sinks[0].port == 1025
+    with pytest.raises(ValueError):
+        build_sinks({'sinks': ['pager']})
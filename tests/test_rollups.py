@@ -0,0 +1,57 @@
+"""The incremental report rollup behind Quick Stats: counts, participation, missing users and streaks."""
+import pytest
+
+from rollups import ReportRollup
+
+
+def _add(store, username, team, day):
+    store.add_report(username, team, 'r', f'{day} 09:00:00')
+
+
+@pytest.fixture
+def rollup(report_store):
+    # 2024-01-04 is a Thursday; 2024-01-08 the Monday after
+    for day in ('2024-01-04', '2024-01-05', '2024-01-08'):
+        _add(report_store, 'alice', 'Team 1', day)
+    _add(report_store, 'bob', 'Team 1', '2024-01-04')
+    _add(report_store, 'Bob', 'Team 1', '2024-01-08')
+    _add(report_store, 'carol', 'Team 2', '2024-01-05')
+    return report_store.add_listener(ReportRollup(report_store))
+
+
+def test_summary(rollup):
+    assert rollup.summary('2024-01-08') == {'total_reports': 6, 'day_reports': 2, 'active_users': 3}
+    assert rollup.summary('2024-01-06')['day_reports'] == 0
+
+
+def test_participation_and_missing(rollup):
+    df = rollup.participation('2024-01-08')
+    assert df.to_dict('records') == [
+        {'Team': 'Team 1', 'Submitted': 2, 'Members': 2, 'Participation %': 100.0},
+        {'Team': 'Team 2', 'Submitted': 0, 'Members': 1, 'Participation %': 0.0},
+    ]
+    assert list(rollup.missing('2024-01-08')['GitLab Username']) == ['carol']
+    # Users count only from their first report, and drop out after `active_days` without one
+    assert list(rollup.missing('2024-01-04')['GitLab Username']) == []
+    assert rollup.participation('2024-01-30', active_days=14).empty
+
+
+def test_streaks_skip_weekends(rollup):
+    streaks = rollup.streaks('2024-01-08')
+    # carol's Friday report still counts on Monday; bob missed Friday
+    assert dict(zip(streaks['GitLab Username'], streaks['Streak'])) == {'alice': 3, 'Bob': 1, 'carol': 1}
+    assert list(rollup.streaks('2024-01-09')['GitLab Username']) == ['alice', 'Bob']
+    assert rollup.streaks('2024-01-10').empty
+
+
+def test_refresh_picks_up_other_writers(rollup, open_store):
+    _add(open_store(), 'dave', 'Team 2', '2024-01-08')
+    rollup.refresh(open_store())
+    assert rollup.summary('2024-01-08') == {'total_reports': 7, 'day_reports': 3, 'active_users': 4}
+
+
+def test_listener_updates_and_clear_rebuilds(rollup, report_store):
+    _add(report_store, 'dave', 'Team 2', '2024-01-08')
+    assert rollup.participation('2024-01-08').loc[1, 'Submitted'] == 1
+    report_store.clear()
+    assert rollup.summary('2024-01-08') == {'total_reports': 0, 'day_reports': 0, 'active_users': 0}
@@ -0,0 +1,75 @@
+"""Full-text search over reports, comments and doubts, kept current by store events."""
+import pytest
+
+from search import SearchIndex, to_match_query
+from storage import SqliteDoubtStore
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SearchIndex(str(tmp_path / 'search.db'))
+
+
+@pytest.fixture
+def indexed(report_store, index):
+    report_store.add_listener(index)
+    report_store.add_report('alice', 'Team 1', 'Fixed the login bug in the OAuth flow', '2024-01-02 09:00:00')
+    report_store.add_report('bob', 'Team 2', 'Wrote docs for the login page', '2024-01-02 10:00:00')
+    report_store.add_report('alicia', 'Team 2', 'Refactored the billing service', '2024-01-03 09:00:00')
+    return report_store
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('login bug', '"login" "bug"'),
+    ('"login bug" OR docs', '"login bug" OR "docs"'),
+    ('refact*', '"refact"*'),
+    ('AND login NOT', '"login"'),
+    ('a"b (c)', '"ab" "(c)"'),
+    ('   ', ''),
+])
+def test_match_query_quotes_user_input(text, expected):
+    assert to_match_query(text) == expected
+
+
+def test_reports_are_searchable_as_they_are_added(indexed, index):
+    assert set(index.search_reports('login')['ID']) == {1, 2}
+    assert list(index.search_reports('fixing bugs')['ID']) == [1]  # stemmed
+    assert list(index.search_reports('"login bug"')['ID']) == [1]
+    assert list(index.search_reports('refact*')['GitLab Username']) == ['alicia']
+    assert index.count_reports('login', team='Team 2') == 1
+    assert index.count_reports('login', username='ALI') == 1
+    assert index.search_reports('   ').empty
+    assert index.count_reports('nothing-matches') == 0
+
+
+def test_comments_are_searchable(indexed, index):
+    indexed.set_comment(3, 'Please add the migration plan')
+    assert list(index.search_reports('migration')['ID']) == [3]
+    assert index.search_reports('migration').loc[0, 'Comment'] == 'Please add the migration plan'
+
+
+def test_clear_empties_the_index(indexed, index):
+    indexed.clear()
+    assert index.count_reports('login') == 0
+
+
+def test_sync_rebuilds_only_when_out_of_step(indexed, tmp_path):
+    assert SearchIndex(str(tmp_path / 'search.db')).sync_reports(indexed) is False
+    fresh = SearchIndex(str(tmp_path / 'other.db'))
+    assert fresh.sync_reports(indexed) is True
+    assert fresh.count_reports('login') == 2
+    assert fresh.sync_reports(indexed) is False
+
+
+def test_doubts_are_searchable_with_their_status(tmp_path, index):
+    doubts = SqliteDoubtStore(str(tmp_path / 'doubts.db'))
+    doubts.add_listener(index)
+    first = doubts.add_doubt('Asha', '9876543210', 'How do I rebase onto main?')
+    doubts.add_doubt('Ravi', '9876543211', 'Which Python version do we use?')
+    doubts.resolve(first['ID'], 'lead', 'Use git rebase -i')
+    found = index.search_doubts('rebase')
+    assert list(found['Name']) == ['Asha']
+    assert list(found['Status']) == ['resolved']
+    doubts.clear_resolved()
+    assert index.search_doubts('rebase').empty
+    assert list(index.search_doubts('python')['Status']) == ['active']
@@ -0,0 +1,155 @@
+"""Report storage shared by both backends, and the SQLite store's import of the legacy CSV."""
+import multiprocessing
+import os
+import sqlite3
+
+import pytest
+
+from storage import DEFAULT_COMMENT, REPORT_COLUMNS, SqliteReportStore, SubmissionIndex, _SQLITE_MIGRATIONS
+
+LEGACY_CSV = (
+    'Timestamp,GitLab Username,Standup Report\n'
+    '2024-01-02 09:00:00,alice,first\n'
+    '2024-01-03 09:00:00,bob,second\n'
+    '2024-01-04 09:00:00,alice,third\n'
+)
+
+
+@pytest.fixture
+def filled(report_store):
+    report_store.add_report('alice', 'Team 1', 'first', '2024-01-02 09:00:00')
+    report_store.add_report('Bob', 'Team 2', 'second', '2024-01-02 10:00:00')
+    report_store.add_report('alice', 'Team 1', 'third', '2024-01-03 09:00:00')
+    return report_store
+
+
+def test_reports_round_trip(filled):
+    df = filled.load_reports()
+    assert list(df.columns) == REPORT_COLUMNS
+    assert list(df['ID']) == [1, 2, 3]
+    assert list(df['Date']) == ['2024-01-02', '2024-01-02', '2024-01-03']
+    assert set(df['Comment']) == {DEFAULT_COMMENT}
+    assert filled.get_report(2)['GitLab Username'] == 'Bob'
+    assert filled.get_report(99) is None
+
+
+def test_user_reports_are_newest_first(filled):
+    assert list(filled.user_reports('ALICE')['Standup Report']) == ['third', 'first']
+    assert filled.user_reports('nobody').empty
+
+
+def test_comments_are_saved_by_id(filled):
+    filled.set_comments({1: 'nice', 3: 'more detail please'})
+    df = filled.load_reports()
+    assert list(df['Comment']) == ['nice', DEFAULT_COMMENT, 'more detail please']
+
+
+def test_reports_since_and_clear(filled):
+    assert list(filled.reports_since(1)['ID']) == [2, 3]
+    filled.clear()
+    assert filled.load_reports().empty
+    assert filled.count_reports() == 0
+
+
+def test_evict_hands_old_rows_to_the_sink(filled):
+    moved = []
+    assert filled.evict('2024-01-03', moved.append) == 2
+    assert list(moved[0]['ID']) == [1, 2]
+    assert list(filled.load_reports()['ID']) == [3]
+
+
+def test_sqlite_imports_the_legacy_csv_once(tmp_path):
+    csv_path, db_path = tmp_path / 'reports.csv', str(tmp_path / 'reports.db')
+    csv_path.write_text(LEGACY_CSV, encoding='utf-8')
+    store = SqliteReportStore(db_path, legacy_csv=str(csv_path))
+    df = store.load_reports()
+    assert list(df['ID']) == [1, 2, 3]
+    assert list(df['GitLab Username']) == ['alice', 'bob', 'alice']
+
+    csv_path.write_text(LEGACY_CSV.replace('first', 'changed'), encoding='utf-8')
+    reopened = SqliteReportStore(db_path, legacy_csv=str(csv_path))
+    assert reopened.count_reports() == 3
+    assert reopened.get_report(1)['Standup Report'] == 'first'
+
+
+def test_cleared_sqlite_store_does_not_import_again(tmp_path):
+    csv_path, db_path = tmp_path / 'reports.csv', str(tmp_path / 'reports.db')
+    csv_path.write_text(LEGACY_CSV, encoding='utf-8')
+    SqliteReportStore(db_path, legacy_csv=str(csv_path)).clear()
+    assert SqliteReportStore(db_path, legacy_csv=str(csv_path)).count_reports() == 0
+
+
+def _open_and_count(directory):
+    store = SqliteReportStore(os.path.join(directory, 'reports.db'), os.path.join(directory, 'reports.csv'))
+    return store.count_reports()
+
+
+def test_processes_opening_a_new_database_import_once(tmp_path):
+    rows = ''.join(f'2024-01-{i % 28 + 1:02d} 09:00:00,user{i},report {i}\n' for i in range(2000))
+    with multiprocessing.Pool(4) as pool:
+        for attempt in range(5):
+            directory = tmp_path / str(attempt)
+            directory.mkdir()
+            (directory / 'reports.csv').write_text('Timestamp,GitLab Username,Standup Report\n' + rows)
+            assert pool.map(_open_and_count, [str(directory)] * 4) == [2000] * 4
+
+
+def test_has_submitted_ignores_case_and_spacing(report_store, open_store):
+    report_store.add_report('Alice', 'Team 1', 'first', '2024-01-02 09:00:00')
+    assert report_store.has_submitted(' alice ', '2024-01-02')
+    assert not report_store.has_submitted('alice', '2024-01-03')
+    assert open_store().has_submitted('ALICE', '2024-01-02')
+
+
+def test_submission_index_follows_appends_and_rewrites(tmp_path):
+    path = tmp_path / 'reports.csv'
+    path.write_text(LEGACY_CSV, encoding='utf-8')
+    index = SubmissionIndex(str(path))
+    assert index.contains('Bob', '2024-01-03')  # no Date column yet: taken from the timestamp
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('2024-01-05 09:00:00,carol,appended elsewhere\n')
+    assert index.contains('carol', '2024-01-05')
+    path.write_text('Timestamp,GitLab Username,Standup Report\n', encoding='utf-8')
+    assert not index.contains('alice', '2024-01-02')
+    index.add('dave', '2024-01-06')
+    assert index.contains('DAVE', '2024-01-06')
+
+
+def test_pages_filters_and_counts(report_store):
+    for day in range(1, 11):
+        for minute, (username, team) in enumerate((('alice', 'Team 1'), ('alicia', 'Team 2'), ('bob', 'Team 1'))):
+            report_store.add_report(username, team, f"{username} {day}", f"2024-01-{day:02d} 09:0{minute}:00")
+    assert list(report_store.query_reports(limit=4, offset=2)['Standup Report']) == [
+        'alice 10', 'bob 9', 'alicia 9', 'alice 9',
+    ]
+    oldest = report_store.query_reports(username='bob', newest_first=False, limit=3, offset=1)
+    assert list(oldest['Standup Report']) == ['bob 2', 'bob 3', 'bob 4']
+    assert report_store.query_reports(limit=5, offset=30).empty
+    assert report_store.count_reports() == 30
+    assert report_store.count_reports(username='ALI') == 20
+    assert report_store.count_reports(username='ali', team='Team 2') == 10
+    assert report_store.team_counts().to_dict() == {'Team 1': 20, 'Team 2': 10}
+
+
+def test_sqlite_schema_upgrades_from_an_older_version(tmp_path):
+    db_path = str(tmp_path / 'reports.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript(f"{_SQLITE_MIGRATIONS[0]}\nPRAGMA user_version = 1;")
+    conn.executemany(
+        'INSERT INTO reports (timestamp, date, team, username, username_key, report, comment) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [
+            ('2024-01-02 09:00:00', '2024-01-02', 'Team 1', 'alice', 'alice', 'a', ''),
+            ('2024-01-02 09:00:00', '2024-01-02', 'Team 2', 'bob', 'bob', 'b', ''),
+            ('2024-01-03 09:00:00', '2024-01-03', 'Team 1', 'bob', 'bob', 'c', ''),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    store = SqliteReportStore(db_path)
+    assert store._conn().execute('PRAGMA user_version').fetchone()[0] == len(_SQLITE_MIGRATIONS)
+    assert store.team_counts().to_dict() == {'Team 1': 2, 'Team 2': 1}
+    store.add_report('carol', 'Team 2', 'd', '2024-01-03 10:00:00')
+    store.evict('2024-01-03', lambda rows: None)
+    assert store.team_counts().to_dict() == {'Team 1': 1, 'Team 2': 1}
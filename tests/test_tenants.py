@@ -0,0 +1,101 @@
+"""Tenants from tenants.toml, reloaded when the file changes, and the settings that feed them."""
+import os
+
+import pytest
+
+from auth import hash_password
+from config import Settings, tenant_config
+from tenants import DEFAULT_TEAMS, TenantConfig
+
+DEFAULTS = {'name': 'Matrusri', 'teams': DEFAULT_TEAMS, 'admins': {}, 'admin_password': 'pw'}
+
+TENANTS_TOML = '''
+default = "acme"
+
+[tenants.matrusri]
+name = "Matrusri"
+data_dir = "."
+
+[tenants.acme]
+name = "ACME College"
+cohort = "Summer 2026"
+teams = ["Backend", "Frontend"]
+admin_password = "acme-pw"
+'''
+
+
+def _write(path, text):
+    # Bump the mtime explicitly: rewrites within one clock tick keep it
+    before = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+def test_without_a_file_there_is_one_tenant_in_the_working_directory(tmp_path):
+    config = TenantConfig(str(tmp_path / 'tenants.toml'), DEFAULTS)
+    tenant = config.get()
+    assert list(config.tenants()) == ['default']
+    assert (tenant.title, tenant.teams, tenant.admin_password, tenant.data_dir) == ('Matrusri', DEFAULT_TEAMS, 'pw', '.')
+    assert config.get('unknown') is tenant
+
+
+def test_tenants_from_the_file(tmp_path):
+    path = tmp_path / 'tenants.toml'
+    _write(path, TENANTS_TOML)
+    config = TenantConfig(str(path), DEFAULTS)
+    assert list(config.tenants()) == ['matrusri', 'acme']
+    acme = config.get()
+    assert (acme.slug, acme.title, acme.teams, acme.admin_password) == \
+        ('acme', 'ACME College · Summer 2026', ['Backend', 'Frontend'], 'acme-pw')
+    assert acme.data_dir == os.path.join('tenants', 'acme')
+    matrusri = config.get('matrusri')
+    assert (matrusri.teams, matrusri.admin_password, matrusri.data_dir) == (DEFAULT_TEAMS, 'pw', '.')
+
+
+def test_tenant_paths_create_the_data_directory(tmp_path):
+    config = TenantConfig(str(tmp_path / 'missing.toml'), DEFAULTS)
+    tenant = config.get()
+    tenant.data_dir = str(tmp_path / 'data' / 'acme')
+    assert tenant.path('standup.db') == str(tmp_path / 'data' / 'acme' / 'standup.db')
+    assert os.path.isdir(tenant.data_dir)
+
+
+@pytest.mark.parametrize('text', [
+    '[tenants."Bad Slug"]\nname = "x"\n',
+    '[tenants.acme]\nteams = []\n',
+    'default = "nope"\n[tenants.acme]\nname = "x"\n',
+    '[tenants.acme.admins]\nasha = "plaintext"\n',
+    'default = "acme"\n',
+    'not toml at all [',
+])
+def test_a_broken_file_fails_the_first_load(tmp_path, text):
+    path = tmp_path / 'tenants.toml'
+    _write(path, text)
+    with pytest.raises(ValueError):
+        TenantConfig(str(path), DEFAULTS)
+
+
+def test_changes_are_picked_up_and_broken_edits_ignored(tmp_path):
+    path = tmp_path / 'tenants.toml'
+    _write(path, TENANTS_TOML)
+    config = TenantConfig(str(path), DEFAULTS)
+    _write(path, TENANTS_TOML + '\n[tenants.third]\nname = "Third"\n')
+    assert list(config.tenants()) == ['matrusri', 'acme', 'third']
+    _write(path, '[tenants.acme]\nteams = []\n')
+    assert list(config.tenants()) == ['matrusri', 'acme', 'third']
+    path.unlink()
+    assert list(config.tenants()) == ['default']
+
+
+def test_tenant_admins_must_be_hashes(tmp_path):
+    path = tmp_path / 'tenants.toml'
+    stored = hash_password('s3cret', iterations=1000)
+    _write(path, f'[tenants.acme]\nname = "ACME"\n[tenants.acme.admins]\nasha = "{stored}"\n')
+    assert TenantConfig(str(path), DEFAULTS).get().admins == {'asha': stored}
+
+
+def test_settings_defaults_and_tenant_config(tmp_path):
+    settings = Settings({'tenants_file': str(tmp_path / 'tenants.toml'), 'admin_password': 'pw'})
+    assert (settings.storage_backend, settings.session_hours, settings.api_token) == ('sqlite', 12, None)
+    tenant = tenant_config(settings).get()
+    assert (tenant.name, tenant.admin_password, tenant.teams) == ('Matrusri', 'pw', DEFAULT_TEAMS)
@@ -0,0 +1,91 @@
+"""Streamlit wiring shared by main.py and pages/doubts.py: tenants, cached stores and admin sessions."""
+import streamlit as st
+
+from auth import check_login, session_signer
+from config import (
+    Settings, build_doubt_store, build_duplicate_index, build_report_store, build_search_index, tenant_config,
+)
+from notifications import NotificationQueue, Notifier, build_sinks
+from tenants import Tenant
+
+
+def get_settings():
+    return Settings(st.secrets)
+
+# -----------------------------
+# Tenants
+# -----------------------------
+@st.cache_resource
+def get_tenants():
+    return tenant_config(get_settings())
+
+def current_tenant():
+    """The college/cohort this session works in, picked with ?tenant=<id>"""
+    return get_tenants().get(st.query_params.get("tenant"))
+
+def tenant_selector(tenant):
+    """Sidebar picker that switches ?tenant=; hidden with a single tenant. Returns {slug: Tenant}."""
+    tenants = get_tenants().tenants()
+    if len(tenants) > 1:
+        st.session_state.tenant_choice = tenant.slug
+        st.sidebar.selectbox(
+            "🏫 College / Cohort", list(tenants), key="tenant_choice",
+            format_func=lambda tenant_id: tenants[tenant_id].title,
+            on_change=lambda: st.query_params.update(tenant=st.session_state.tenant_choice)
+        )
+    return tenants
+
+# -----------------------------
+# Stores
+# -----------------------------
+# Per-tenant resources are cached by data directory, so one process serves every tenant
+BY_DATA_DIR = {Tenant: lambda tenant: tenant.data_dir}
+
+@st.cache_resource(hash_funcs=BY_DATA_DIR)
+def open_search_index(tenant):
+    return build_search_index(tenant)
+
+@st.cache_resource(hash_funcs=BY_DATA_DIR)
+def open_duplicates(tenant):
+    return build_duplicate_index(tenant, get_settings())
+
+@st.cache_resource
+def get_notifications():
+    return NotificationQueue(build_sinks(get_settings().notifications))
+
+@st.cache_resource(hash_funcs=BY_DATA_DIR)
+def open_store(tenant):
+    return build_report_store(
+        tenant, get_settings(), open_search_index(tenant), open_duplicates(tenant), Notifier(get_notifications())
+    )
+
+@st.cache_resource(hash_funcs=BY_DATA_DIR)
+def open_doubt_store(tenant):
+    return build_doubt_store(tenant, open_search_index(tenant), Notifier(get_notifications()))
+
+# -----------------------------
+# Admin sessions
+# -----------------------------
+# A signed session token (per tenant) kept in st.session_state, which the
+# pages of one browser session share. It never goes into the URL, where
+# history, copied links and proxy logs would leak it; a new tab logs in again.
+def get_sessions():
+    settings = get_settings()
+    return session_signer(settings.session_secret, settings.session_hours * 3600)
+
+def current_admin(tenant):
+    """The admin logged in to `tenant` in this session, or None"""
+    # Links from before tokens left the URL still carry one; drop it unused
+    st.query_params.pop('session', None)
+    return get_sessions().verify(st.session_state.get('admin_token'), tenant.slug)
+
+def log_in(tenant, username, password):
+    """Check the credentials once and start a session; returns the admin name or None"""
+    admin = check_login(tenant, username, password)
+    if admin:
+        st.session_state.admin_token = get_sessions().issue(admin, tenant.slug)
+    return admin
+
+def log_out():
+    get_sessions().revoke(st.session_state.get('admin_token'))
+    st.session_state.admin_token = None